@@ -0,0 +1,3 @@
+"""
+Standalone benchmarks (run from backend/ with python -m benchmarks.<name>)
+"""
@@ -0,0 +1,74 @@
+"""
+Batched submission benchmark against a fake node
+
+python -m benchmarks.aptos_batching: onboarding a cohort of projects one
+transaction at a time (previous behaviour) vs batched, pipelined submission
+"""
+import asyncio
+import time
+
+from services.aptos_batcher import TransactionBatcher
+from services.aptos_sequence import SequenceNumberManager
+
+
+class FakeNode:
+    """Fixed latency per request, sequence numbers enforced like a mempool"""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.committed = 0
+        self.mempool = set()
+    
+    async def sequence_number(self) -> int:
+        await asyncio.sleep(self.latency)
+        return self.committed
+    
+    async def submit(self, payload, number: int) -> str:
+        await asyncio.sleep(self.latency)
+        if number < self.committed or number in self.mempool:
+            raise RuntimeError("SEQUENCE_NUMBER_TOO_OLD")
+        self.mempool.add(number)
+        while self.committed in self.mempool:
+            self.mempool.remove(self.committed)
+            self.committed += 1
+        return f"0x{number:064x}"
+    
+    async def wait(self, tx_hash: str):
+        await asyncio.sleep(self.latency * 5)  # finality
+
+
+async def serial(node: FakeNode, count: int):
+    """Previous behaviour: fetch sequence number, submit, wait, one by one"""
+    for i in range(count):
+        number = await node.sequence_number()
+        await node.wait(await node.submit(f"project-{i}", number))
+
+
+async def batched(node: FakeNode, count: int) -> TransactionBatcher:
+    manager = SequenceNumberManager(node.sequence_number)
+    batcher = TransactionBatcher(manager, node.submit, window=0.02)
+    hashes = await asyncio.gather(*(batcher.submit(f"project-{i}") for i in range(count)))
+    assert len(set(hashes)) == count
+    return batcher
+
+
+async def benchmark(count: int = 200, latency: float = 0.01):
+    print("Batched Submission Benchmark")
+    print("=" * 50)
+    print(f"{count} create_project calls, {latency * 1000:.0f} ms node latency")
+    
+    node = FakeNode(latency)
+    start = time.perf_counter()
+    await serial(node, count)
+    print(f"serial submit + wait: {time.perf_counter() - start:6.2f}s")
+    
+    node = FakeNode(latency)
+    start = time.perf_counter()
+    batcher = await batched(node, count)
+    elapsed = time.perf_counter() - start
+    assert node.committed == count
+    print(f"batched, pipelined:   {elapsed:6.2f}s  {batcher.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,147 @@
+"""
+Event loop latency while Aptos transactions are in flight, against a local fake node
+
+python -m benchmarks.aptos_offload [deployments] [node latency ms]: latency of a
+cheap endpoint while deployments run, with blocking node calls inside the async
+handler (previous pattern) vs the async Aptos client
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+
+import httpx
+from aptos_sdk.account import Account
+from fastapi import FastAPI
+
+
+def start_fake_node(latency: float) -> ThreadingHTTPServer:
+    """Minimal Aptos REST node: every request takes latency seconds, transactions commit at once"""
+    state = {"sequence_number": 0, "lock": threading.Lock()}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def reply(self, body: Dict[str, Any], status: int = 200):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def do_GET(self):
+            time.sleep(latency)
+            path = self.path.split("?")[0]
+            if path == "/v1/":
+                self.reply({"chain_id": 4})
+            elif path.startswith("/v1/transactions/by_hash/"):
+                tx_hash = path.rsplit("/", 1)[1]
+                self.reply({"type": "user_transaction", "hash": tx_hash, "success": True, "version": "1"})
+            elif path.startswith("/v1/accounts/"):
+                self.reply({"sequence_number": str(state["sequence_number"])})
+            else:
+                self.reply({"message": "not found"}, 404)
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            with state["lock"]:
+                state["sequence_number"] += 1
+            self.reply({"hash": "0x" + uuid.uuid4().hex}, 202)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def blocking_deploy(node_url: str):
+    """Previous pattern: synchronous node round-trips inside an async handler"""
+    with httpx.Client(base_url=node_url, timeout=30) as client:
+        client.get("/accounts/0x1")
+        tx_hash = client.post("/transactions", content=b"signed").json()["hash"]
+        client.get(f"/transactions/by_hash/{tx_hash}")
+
+
+def build_app(mode: str, node_url: str) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+    
+    @app.post("/deploy/{project_id}")
+    async def deploy(project_id: str):
+        if mode == "blocking":
+            blocking_deploy(node_url)
+            return {"success": True}
+        from services.aptos_integration import get_aptos_service
+        service = get_aptos_service()
+        result = await service.create_project(project_id, "Benchmark Bay", 12.5, 80.1, 10.0, 1000, 15.0, 2024)
+        await service.rpc.wait_for_transaction(result["transaction_hash"], poll_interval=0.05)
+        return result
+    
+    return app
+
+
+async def measure(app: FastAPI, deployments: int, probe_interval: float = 0.01) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        latencies: List[float] = []
+        done = asyncio.Event()
+        
+        async def probe():
+            # Probes are due on a fixed schedule; latency counts from the due
+            # time, so a stalled event loop shows up as late answers
+            due = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/health")
+                now = time.perf_counter()
+                latencies.append(now - due)
+                due = max(due + probe_interval, now)
+        
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(client.post(f"/deploy/BENCH-{n}") for n in range(deployments)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "probes": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+if __name__ == "__main__":
+    deployments = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    
+    server = start_fake_node(latency)
+    node_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # Point the shared RPC client at the fake node; a fixed key skips the faucet
+    os.environ["APTOS_NODE_URLS"] = node_url
+    os.environ.setdefault("APTOS_PRIVATE_KEY", str(Account.generate().private_key))
+    
+    print("Aptos Offload Benchmark")
+    print("=" * 50)
+    print(f"{deployments} deployments, {latency * 1000:.0f} ms fake node latency, /health probed every 10 ms")
+    for mode in ("blocking", "async"):
+        stats = asyncio.run(measure(build_app(mode, node_url), deployments))
+        print(
+            f"{mode:>8}: deployments took {stats['elapsed']:6.2f}s, {stats['probes']:4d} probes, "
+            f"/health p50 {stats['p50_ms']:7.1f} ms, p99 {stats['p99_ms']:7.1f} ms, max {stats['max_ms']:7.1f} ms"
+        )
+    server.shutdown()
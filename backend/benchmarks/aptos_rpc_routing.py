@@ -0,0 +1,65 @@
+"""
+Aptos RPC routing check against local stub nodes
+
+python -m benchmarks.aptos_rpc_routing: failover past a node that is down,
+a hedged view read whose first healthy node stalls (tail latency), and the
+committed transaction cache
+"""
+import asyncio
+import time
+
+import httpx
+
+from services.aptos_rpc import AptosRpcClient
+
+stalled = []
+
+
+async def stub_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "down.node":
+        raise httpx.ConnectError("connection refused", request=request)
+    path = request.url.path
+    if path == "/v1/view" and not stalled:
+        stalled.append(request.url.host)
+        await asyncio.sleep(1.0)
+    await asyncio.sleep(0.01)
+    if path == "/v1/":
+        return httpx.Response(200, json={"chain_id": 2})
+    if path.startswith("/v1/accounts/"):
+        return httpx.Response(200, json={"sequence_number": "7"})
+    if path == "/v1/view":
+        return httpx.Response(200, json=[{"project_id": "P1"}])
+    if path.startswith("/v1/transactions/by_hash/"):
+        return httpx.Response(200, json={"type": "user_transaction", "success": True, "version": "42"})
+    return httpx.Response(404, json={"message": "not found"})
+
+
+async def demo():
+    print("Aptos RPC Stub Node Check")
+    print("=" * 50)
+    rpc = AptosRpcClient(
+        ["http://down.node/v1", "http://a.node/v1", "http://b.node/v1"],
+        hedge_delay=0.05,
+        transport=httpx.MockTransport(stub_handler),
+    )
+    
+    assert await rpc.chain_id() == 2
+    print(f"failover past the down node: chain id ok, {rpc.metrics['failovers']} failover(s)")
+    
+    start = time.perf_counter()
+    await rpc.view("0x1::carbon_credit::get_project", [], ["0x1", "P1"])
+    print(f"view read with a 1s stall on {stalled[0]}: answered in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({rpc.metrics['hedge_wins']} hedge win)")
+    
+    for _ in range(100):
+        await rpc.transaction_by_hash("0xabc")
+    print(f"100 lookups of one committed transaction: {rpc.metrics['tx_cache_misses']} RPC, "
+          f"{rpc.metrics['tx_cache_hits']} cache hits")
+    
+    for node in rpc.get_stats()["nodes"]:
+        print(f"   {node}")
+    await rpc.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(demo())
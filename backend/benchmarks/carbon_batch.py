@@ -0,0 +1,46 @@
+"""
+Batch carbon credit calculation benchmark
+
+python -m benchmarks.carbon_batch: the vectorized calculate_carbon_credits_batch
+against the scalar calculate_carbon_credits, checking every row matches
+"""
+import random
+import time
+
+from services.carbon_calculator import CARBON_RATES, calculate_carbon_credits, calculate_carbon_credits_batch
+
+
+if __name__ == "__main__":
+    print("Carbon Credit Batch Calculation Benchmark")
+    print("=" * 50)
+    
+    project_types = list(CARBON_RATES) + ["Unknown"]
+    
+    for size in (10_000, 100_000, 1_000_000):
+        areas = [random.uniform(0.1, 50.0) for _ in range(size)]
+        indices = [random.uniform(0.0, 1.0) for _ in range(size)]
+        types = [random.choice(project_types) for _ in range(size)]
+        durations = [random.randint(1, 30) for _ in range(size)]
+        
+        start = time.perf_counter()
+        scalar_results = [
+            calculate_carbon_credits(a, v, t, d)
+            for a, v, t, d in zip(areas, indices, types, durations)
+        ]
+        scalar_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batch = calculate_carbon_credits_batch(areas, indices, types, durations)
+        batch_time = time.perf_counter() - start
+        
+        # Verify every row matches the scalar function exactly
+        for i, result in enumerate(scalar_results):
+            for key in ("total_carbon_tons", "annual_carbon_tons", "co2_equivalent_tons",
+                        "soil_carbon_tons", "biomass_carbon_tons", "biodiversity_score",
+                        "water_quality_impact", "confidence_level"):
+                assert batch[key][i] == result[key], (key, i, batch[key][i], result[key])
+            assert batch["health_multiplier"][i] == result["project_metrics"]["health_multiplier"]
+            assert batch["base_sequestration_rate"][i] == result["project_metrics"]["base_sequestration_rate"]
+        
+        print(f"{size:>9,} projects: scalar {scalar_time:7.3f}s  batch {batch_time:7.3f}s  "
+              f"speedup {scalar_time / batch_time:6.1f}x")
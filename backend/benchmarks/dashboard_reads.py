@@ -0,0 +1,73 @@
+"""
+Dashboard read benchmark on a scratch SQLite file
+
+python -m benchmarks.dashboard_reads: the previous two-query build vs the
+joined dashboard query vs a DashboardCache hit
+"""
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base, create_db_engine, create_async_db_engine
+from models import Project, CarbonCredit
+from services.dashboard_service import DashboardCache, dashboard_query
+
+PROJECT_COUNT = 10_000
+READS = 2000
+
+
+async def two_queries(db: AsyncSession, project_id: int):
+    """Previous build: the project and its credit record in separate queries"""
+    project = await db.get(Project, project_id)
+    credit = await db.scalar(select(CarbonCredit).where(CarbonCredit.project_id == project_id))
+    return project, credit
+
+
+def populate(path: str):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(Project), [{
+            "id": i, "project_type": "mangrove", "location": f"Site {i}", "area": 10.0, "start_date": now,
+            "end_date": now, "status": "tokenized", "estimated_carbon_credits": 17.2, "created_at": now
+        } for i in range(1, PROJECT_COUNT + 1)])
+        connection.execute(insert(CarbonCredit), [{
+            "project_id": i, "total_credits": 17.2, "available_credits": 17.2,
+            "unit_price": 50.0, "total_value": 860.0
+        } for i in range(1, PROJECT_COUNT + 1)])
+    engine.dispose()
+
+
+async def benchmark(path: str):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    cache = DashboardCache()
+    
+    async def timed(label: str, read):
+        async with AsyncSession(engine) as db:
+            start = time.perf_counter()
+            for i in range(READS):
+                await read(db, i % PROJECT_COUNT + 1)
+                db.expunge_all()  # a fresh session per request, as in get_db
+            elapsed = time.perf_counter() - start
+        print(f"   {label:<32} {elapsed / READS * 1e6:8.0f} us/request")
+    
+    print(f"Dashboard reads: {READS} requests over {PROJECT_COUNT:,} projects")
+    await timed("two queries (previous)", two_queries)
+    await timed("joined query", lambda db, project_id: db.execute(dashboard_query(project_id)))
+    await timed("cache (first pass fills)", cache.get)
+    await timed("cache (warm)", cache.get)
+    print(f"   {cache.get_stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        populate(path)
+        asyncio.run(benchmark(path))
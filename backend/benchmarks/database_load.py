@@ -0,0 +1,169 @@
+"""
+Database engine benchmarks against scratch SQLite files
+
+python -m benchmarks.database_load: mixed read/write load (like concurrent
+uploads and listing reads), default engine vs tuned
+python -m benchmarks.database_load --handlers: requests per second of an
+async handler using a sync Session (previous pattern) vs an AsyncSession
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import create_db_engine, create_async_db_engine
+
+
+def run_load(db_engine, threads: int = 16, duration: float = 5.0, write_ratio: float = 0.2) -> Dict[str, Any]:
+    # models registers its tables on the imported database module's Base
+    models.Base.metadata.create_all(db_engine)
+    session_factory = sessionmaker(bind=db_engine)
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    
+    def worker():
+        while time.perf_counter() < deadline:
+            db = session_factory()
+            try:
+                if random.random() < write_ratio:
+                    db.add(models.Project(
+                        project_type="mangrove",
+                        location="Benchmark Bay",
+                        area=1.0,
+                        start_date=datetime.utcnow(),
+                        end_date=datetime.utcnow(),
+                        description="x" * 500
+                    ))
+                    db.commit()
+                    key = "writes"
+                else:
+                    db.query(models.Project).order_by(models.Project.id.desc()).limit(50).all()
+                    key = "reads"
+            except OperationalError:
+                db.rollback()
+                key = "locked"
+            finally:
+                db.close()
+            with lock:
+                counts[key] += 1
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    db_engine.dispose()
+    return {key: round(value / duration) for key, value in counts.items()}
+
+def run_handlers(directory: str, projects: int = 20_000, requests: int = 2000):
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy import select, func
+    
+    path = f"{directory}/handlers.db"
+    sync_engine = create_db_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(sync_engine)
+    now = datetime.utcnow()
+    with sync_engine.begin() as connection:
+        connection.execute(models.Project.__table__.insert(), [{
+            "project_type": "mangrove", "location": f"Site {i}", "area": 10.0, "start_date": now,
+            "end_date": now, "status": random.choice(("draft", "verified")), "created_at": now
+        } for i in range(projects)])
+    async_db_engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    
+    # round_trip(ms) stands in for the network latency of a database server
+    def add_round_trip(dbapi_connection, connection_record):
+        dbapi_connection.create_function("round_trip", 1, lambda ms: time.sleep(ms / 1000) or 0)
+    
+    sync_engine.dispose()
+    event.listen(sync_engine, "connect", add_round_trip)
+    event.listen(async_db_engine.sync_engine, "connect", add_round_trip)
+    sync_sessions = sessionmaker(bind=sync_engine)
+    async_sessions = async_sessionmaker(async_db_engine, expire_on_commit=False)
+    latency_ms = 0
+    
+    def page_query(project_id: int):
+        # A listing page with its total, like list_projects(include_total=true)
+        verified = select(models.Project).where(models.Project.status == "verified")
+        return (
+            verified.order_by(models.Project.created_at, models.Project.id).limit(20),
+            select(func.count()).select_from(verified.subquery())
+        )
+    
+    app = FastAPI()
+    
+    @app.get("/sync/{project_id}")
+    async def sync_handler(project_id: int):
+        db = sync_sessions()
+        try:
+            statement, count = page_query(project_id)
+            db.execute(select(func.round_trip(latency_ms)))
+            rows = db.scalars(statement).all()
+            db.execute(select(func.round_trip(latency_ms)))
+            return {"rows": len(rows), "total": db.scalar(count)}
+        finally:
+            db.close()
+    
+    @app.get("/async/{project_id}")
+    async def async_handler(project_id: int):
+        async with async_sessions() as db:
+            statement, count = page_query(project_id)
+            await db.execute(select(func.round_trip(latency_ms)))
+            rows = (await db.scalars(statement)).all()
+            await db.execute(select(func.round_trip(latency_ms)))
+            return {"rows": len(rows), "total": await db.scalar(count)}
+    
+    async def load(path_prefix: str, concurrency: int) -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            remaining = iter(range(requests))
+            
+            async def client_loop():
+                for i in remaining:
+                    response = await client.get(f"{path_prefix}/{i % projects + 1}")
+                    assert response.status_code == 200
+            
+            start = time.perf_counter()
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+            return requests / (time.perf_counter() - start)
+    
+    async def main():
+        nonlocal latency_ms
+        print(f"Handler concurrency: {requests} requests, {projects:,} projects")
+        for latency_ms in (0, 2):
+            print(f"   {latency_ms} ms per query round trip" + (" (local SQLite)" if not latency_ms else ""))
+            for concurrency in (1, 16, 128):
+                sync_rps = await load("/sync", concurrency)
+                async_rps = await load("/async", concurrency)
+                print(f"   {concurrency:>5} clients: sync Session {sync_rps:6.0f} req/s   AsyncSession {async_rps:6.0f} req/s")
+        await async_db_engine.dispose()
+    
+    asyncio.run(main())
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    if "--handlers" in sys.argv:
+        with tempfile.TemporaryDirectory() as directory:
+            run_handlers(directory)
+        sys.exit(0)
+    
+    print("SQLite Mixed Read/Write Benchmark")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        # Previous configuration: rollback journal, driver defaults
+        before = create_engine(f"sqlite:///{directory}/before.db", connect_args={"check_same_thread": False})
+        print(f"default engine: {run_load(before)} per second")
+        after = create_db_engine(f"sqlite:///{directory}/after.db")
+        print(f"tuned engine:   {run_load(after)} per second")
@@ -0,0 +1,84 @@
+"""
+Offset vs keyset pagination benchmark on a scratch SQLite file
+
+python -m benchmarks.keyset_pagination [rows]: page 1 vs page 10,000 (100 rows
+per page), offset vs keyset, plus the count estimate vs COUNT(*)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base, create_db_engine, create_async_db_engine
+from models import Project
+from services.pagination import encode_cursor, paginate, estimate_count
+
+PAGE_SIZE = 100
+DEEP_PAGE = 10_000
+
+
+async def timed(fn, repeat: int = 5) -> float:
+    """Median of repeat runs, in ms"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[repeat // 2] * 1000
+
+
+def populate(path: str, row_count: int):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start_date = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for chunk in range(0, row_count, 50_000):
+            connection.execute(insert(Project), [{
+                "id": i + 1, "project_type": "mangrove", "location": f"Site {i}", "area": 10.0,
+                "start_date": start_date, "end_date": start_date, "status": "verified",
+                # Several projects per second, so ties on created_at are common
+                "created_at": datetime.fromtimestamp(start_date.timestamp() + i // 4)
+            } for i in range(chunk, min(chunk + 50_000, row_count))])
+    engine.dispose()
+
+
+async def benchmark(path: str, row_count: int):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    statement = select(Project).where(Project.status == "verified")
+    order = (Project.created_at, Project.id)
+    deep_page = min(DEEP_PAGE, row_count // PAGE_SIZE)
+    
+    async with AsyncSession(engine) as db:
+        async def offset_page(page: int):
+            return (await db.scalars(statement.order_by(*order).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE))).all()
+        
+        # Cursor of the row just before the deep page, as a client walking the pages would hold
+        before = (await db.scalars(statement.order_by(*order).offset((deep_page - 1) * PAGE_SIZE - 1).limit(1))).one()
+        deep_cursor = encode_cursor(before.created_at, before.id)
+        rows, _ = await paginate(db, statement, *order, deep_cursor, PAGE_SIZE)
+        assert rows[0].id == (await offset_page(deep_page))[0].id
+        
+        print(f"Pagination on {row_count:,} projects, {PAGE_SIZE} per page")
+        print("=" * 50)
+        print(f"offset page 1:       {await timed(lambda: offset_page(1)):8.2f} ms")
+        print(f"offset page {deep_page:,}:  {await timed(lambda: offset_page(deep_page)):8.2f} ms")
+        print(f"keyset page 1:       {await timed(lambda: paginate(db, statement, *order, None, PAGE_SIZE)):8.2f} ms")
+        print(f"keyset page {deep_page:,}:  {await timed(lambda: paginate(db, statement, *order, deep_cursor, PAGE_SIZE)):8.2f} ms")
+        count = select(func.count()).select_from(statement.subquery())
+        print(f"COUNT(*):            {await timed(lambda: db.scalar(count)):8.2f} ms")
+        print(f"count estimate:      {await timed(lambda: estimate_count(db, statement)):8.2f} ms  "
+              f"({await estimate_count(db, statement)})")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        populate(path, row_count)
+        asyncio.run(benchmark(path, row_count))
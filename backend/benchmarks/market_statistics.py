@@ -0,0 +1,106 @@
+"""
+Marketplace statistics benchmark on a scratch SQLite file
+
+python -m benchmarks.market_statistics: statistics reads against 200k listings,
+previous COUNT/AVG/SUM queries vs the in-process aggregate, plus a check that
+incremental updates match a full recount
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base, create_db_engine, create_async_db_engine
+from models import MarketListing, CarbonCredit
+from services.market_stats import MarketStatistics, get_market_stats
+
+LISTING_COUNT = 200_000
+READS = 200
+
+
+async def previous_statistics(db: AsyncSession):
+    """Previous endpoint: aggregate queries on every request"""
+    await db.execute(select(func.count(), func.avg(MarketListing.asking_price)).where(MarketListing.status == "active"))
+    await db.scalar(select(func.sum(CarbonCredit.total_credits)))
+
+
+def populate(path: str):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(CarbonCredit), [{
+            "id": i, "project_id": i, "total_credits": 20.0, "available_credits": 20.0,
+            "unit_price": 50.0, "total_value": 1000.0
+        } for i in range(1, LISTING_COUNT // 10 + 1)])
+        connection.execute(insert(MarketListing), [{
+            "carbon_credit_id": i % (LISTING_COUNT // 10) + 1, "asking_price": random.uniform(30, 60),
+            "available_amount": 2.0, "listed_at": now,
+            **({"status": "active", "sold_at": None} if random.random() < 0.1 else
+               {"status": "sold", "sold_at": now - timedelta(hours=random.choice((random.uniform(0, 23), random.uniform(25, 72))))})
+        } for i in range(LISTING_COUNT)])
+    engine.dispose()
+
+
+async def benchmark(path: str):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    # The shared aggregate, so committed changes below are applied to it
+    stats = get_market_stats()
+    
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        start = time.perf_counter()
+        for _ in range(READS):
+            await previous_statistics(db)
+        previous = (time.perf_counter() - start) / READS
+        
+        start = time.perf_counter()
+        await stats.refresh(db)
+        seeded = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(READS):
+            stats.snapshot()
+        aggregate = (time.perf_counter() - start) / READS
+        
+        print(f"Market statistics over {LISTING_COUNT:,} listings")
+        print(f"   COUNT/AVG/SUM per request   {previous * 1e6:10.0f} us")
+        print(f"   aggregate snapshot          {aggregate * 1e6:10.1f} us  (seeded once in {seeded * 1000:.0f} ms)")
+        
+        # Incremental path: new credits, new listings, sales and cancellations
+        credit = CarbonCredit(project_id=1, total_credits=40.0, available_credits=40.0, unit_price=50.0, total_value=2000.0)
+        db.add(credit)
+        await db.flush()
+        listings = [MarketListing(carbon_credit_id=credit.id, asking_price=40.0 + i, available_amount=2.0) for i in range(10)]
+        db.add_all(listings)
+        await db.commit()
+        for listing in listings[:4]:
+            listing.status, listing.sold_at = "sold", datetime.utcnow()
+        listings[4].status = "cancelled"
+        listings[5].asking_price = 99.0
+        await db.commit()
+        nested = await db.begin_nested()
+        listings[6].status = "sold"
+        await db.flush()
+        await nested.rollback()
+        await db.commit()
+        
+        incremental = stats.snapshot()
+        fresh = MarketStatistics()
+        await fresh.refresh(db)
+        expected = fresh.snapshot()
+        for key, value in expected.items():
+            assert abs((incremental[key] or 0) - (value or 0)) < 1e-6, (key, incremental[key], value)
+        print(f"   incremental == recount      {incremental}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        populate(path)
+        asyncio.run(benchmark(path))
@@ -0,0 +1,99 @@
+"""
+Query index benchmark
+Hot queries from main.py and the services against a scratch SQLite database,
+before and after the query indexes (python -m benchmarks.query_indexes [projects])
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select, func, text
+
+from database import Base, create_db_engine
+from models import Project, Verification, BlockchainTransaction, CarbonCredit, MarketListing
+
+
+project_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+query_indexes = [
+    index for model in (Project, Verification, BlockchainTransaction, CarbonCredit, MarketListing)
+    for index in model.__table__.indexes if index.name != f"ix_{model.__tablename__}_id"
+    and index.name != "ix_projects_chain_project_id"
+]
+
+queries = {
+    "list_projects(status=verified)": select(Project).where(Project.status == "verified").offset(0).limit(100),
+    "list_projects(status=verified, skip=5000)": select(Project).where(Project.status == "verified").offset(5000).limit(100),
+    "project verifications": select(Verification).where(Verification.project_id == project_count // 2),
+    "approved verifications": select(Verification).where(
+        Verification.project_id == project_count // 2, Verification.status == "approved"
+    ),
+    "credits of a project": select(CarbonCredit).where(CarbonCredit.project_id == project_count // 2).limit(1),
+    "active listings": select(MarketListing).where(MarketListing.status == "active").offset(2000).limit(100),
+    "market statistics": select(func.count(), func.avg(MarketListing.asking_price)).where(MarketListing.status == "active"),
+}
+
+
+def populate(engine):
+    random.seed(1)
+    now = datetime.utcnow()
+    chunk = 50_000
+    statuses = ["draft"] * 89 + ["verified"] * 1 + ["blockchain_registered"] * 6 + ["tokenized"] * 4
+    with engine.begin() as connection:
+        for start in range(1, project_count + 1, chunk):
+            ids = range(start, min(start + chunk, project_count + 1))
+            connection.execute(insert(Project), [{
+                "id": i, "project_type": "mangrove", "location": f"Site {i}", "area": 10.0,
+                "start_date": now, "end_date": now, "status": random.choice(statuses)
+            } for i in ids])
+            connection.execute(insert(Verification), [{
+                "project_id": i, "verification_type": kind, "verifier_name": "Verifier",
+                "status": random.choice(("pending", "approved", "rejected"))
+            } for i in ids for kind in ("internal", "third_party")])
+        credits = range(1, project_count // 5 + 1)
+        connection.execute(insert(CarbonCredit), [{
+            "id": i, "project_id": i * 5, "total_credits": 100.0, "available_credits": 100.0,
+            "unit_price": 45.0, "total_value": 4500.0
+        } for i in credits])
+        connection.execute(insert(MarketListing), [{
+            "carbon_credit_id": i, "asking_price": random.uniform(30, 60), "available_amount": 100.0,
+            "status": "active" if random.random() < 0.1 else "sold"
+        } for i in credits])
+
+
+def measure(engine, label: str):
+    print(f"\n{label}")
+    with engine.connect() as connection:
+        for name, query in queries.items():
+            compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = "; ".join(row[3] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                connection.execute(query).all()
+                timings.append(time.perf_counter() - start)
+            print(f"   {name:<44} {sorted(timings)[2] * 1000:9.2f} ms   {plan}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        for index in query_indexes:
+            index.drop(engine)
+        
+        start = time.perf_counter()
+        populate(engine)
+        print(f"{project_count:,} projects populated in {time.perf_counter() - start:.1f}s")
+        
+        measure(engine, "Without query indexes")
+        start = time.perf_counter()
+        for index in query_indexes:
+            index.create(engine)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+        print(f"\n{len(query_indexes)} indexes built in {time.perf_counter() - start:.1f}s")
+        measure(engine, "With query indexes")
+        engine.dispose()
@@ -0,0 +1,53 @@
+"""
+Raster band-math benchmark on a synthetic Sentinel-2-like scene
+
+python -m benchmarks.raster_band_math [size]: tiled NDVI/EVI throughput per tile
+size and peak memory, for a size x size three-band scene written to a temp file
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from services.raster_analysis import analyze_scene
+
+
+def write_scene(path: str, size: int):
+    """Write the scene in row stripes so generating it does not need the whole scene in RAM either"""
+    rng = np.random.default_rng(42)
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_1_0(
+            f, {"descr": "<u2", "fortran_order": False, "shape": (3, size, size)}
+        )
+        for low, high in ((200, 800), (300, 1200), (2000, 5000)):  # blue, red, nir
+            for start in range(0, size, 1024):
+                stop = min(size, start + 1024)
+                rng.integers(low, high, (stop - start, size), dtype=np.uint16).tofile(f)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    print("Raster Band-Math Benchmark")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scene.npy")
+        write_scene(path, size)
+        
+        scene_mb = os.path.getsize(path) / 1e6
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        
+        for tile_size in (256, 512, 1024, 2048):
+            start = time.perf_counter()
+            result = analyze_scene(path, area=100.0, tile_size=tile_size)
+            elapsed = time.perf_counter() - start
+            megapixels = result["pixels"] / 1e6
+            print(f"tile {tile_size:>5}: {megapixels:.1f} MP in {elapsed:.2f}s "
+                  f"= {megapixels / elapsed:.1f} MP/s  (NDVI {result['ndvi']}, EVI {result['evi']})")
+        
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Scene size on disk: {scene_mb:.0f} MB")
+        print(f"Peak RSS: {peak_rss:.0f} MB (before analysis: {rss_before:.0f} MB)")
@@ -2,15 +2,16 @@
 Blue Carbon Registry - FastAPI Backend
 Main application entry point
 """
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks, Response, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uvicorn
 from datetime import datetime
 
-from database import engine, get_db, Base
+from database import get_db, init_db, SessionLocal, AsyncSessionLocal, async_engine
 from models import Project, Verification, BlockchainTransaction, CarbonCredit, MarketListing
 from schemas import (
     ProjectCreate, ProjectResponse, VerificationCreate, VerificationResponse,
@@ -19,16 +20,34 @@ from schemas import (
 )
 from services.image_analysis import analyze_satellite_image, analyze_site_image
 from services.carbon_calculator import calculate_carbon_credits
+from services.recalculation_service import get_recalculation_job, MAX_CHUNK_SIZE
+from services.analysis_cache import get_analysis_cache
 from services.blockchain_service import deploy_contract, mint_geonft, create_carbon_tokens
+from services.transaction_tracker import get_transaction_tracker
 from services.verification_service import create_verification_record, update_verification_status
-from services.marketplace_service import create_market_listing, get_market_statistics
+from services.marketplace_service import (
+    create_market_listing, sell_market_listing, cancel_market_listing, get_market_statistics
+)
+from services.market_stats import get_market_stats
+from services.pagination import paginate, estimate_count, MAX_PAGE_SIZE
+from services.dashboard_service import get_dashboard_cache
 from services.aptos_integration import get_aptos_service
-from services.binance_price_service import get_price_service, start_price_updater
+from services.aptos_rpc import get_aptos_rpc, close_aptos_rpc
+from services.aptos_event_listener import get_event_listener
+from services.binance_price_service import get_price_service, start_price_updater, close_price_service
+from services.price_stream import get_price_broadcaster
+from services.price_history_store import get_price_history_store
 import os
 import asyncio
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Run the contract event listener in this process (see .env.example); on by
+# default only once a contract address is configured to listen to
+EVENT_LISTENER_ENABLED = os.getenv(
+    "APTOS_EVENT_LISTENER", "true" if os.getenv("APTOS_MODULE_ADDRESS") else "false"
+).lower() in ("1", "true", "yes")
+
+# Create or migrate database tables
+init_db()
 
 app = FastAPI(
     title="Blue Carbon Registry API",
@@ -43,15 +62,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count-Estimate", "ETag"],
 )
 
 # Startup event - Start price updater
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on startup"""
-    # Start Binance price updater (updates every 1 second)
+    # Push every new price snapshot to streaming clients
+    get_price_service().add_snapshot_listener(get_price_broadcaster().publish)
+    
+    # Record every snapshot in the local price history and roll it up in the background
+    history_store = get_price_history_store()
+    get_price_service().add_snapshot_listener(history_store.append_snapshot)
+    asyncio.create_task(history_store.run())
+    
+    # Confirm submitted blockchain transactions in the background
+    asyncio.create_task(get_transaction_tracker().run())
+    
+    # Project contract events here, so they also invalidate this process's
+    # caches (on-chain project state, dashboards, market statistics)
+    if EVENT_LISTENER_ENABLED:
+        asyncio.create_task(get_event_listener().start())
+    
+    # Seed the marketplace statistics and resync them periodically
+    asyncio.create_task(get_market_stats().run(AsyncSessionLocal))
+    
+    # Start Binance price updater (ticker stream, 1 second REST polling as fallback)
     asyncio.create_task(start_price_updater(interval=1))
-    print("✅ Binance price updater started (1 second intervals)")
+    print("✅ Binance price updater started")
+
+# Shutdown event - Release pooled connections
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close shared HTTP clients on shutdown"""
+    await get_price_history_store().stop()
+    get_transaction_tracker().stop()
+    get_market_stats().stop()
+    if EVENT_LISTENER_ENABLED:
+        get_event_listener().stop()
+    await close_price_service()
+    await close_aptos_rpc()
+    await async_engine.dispose()
 
 # Health check endpoint
 @app.get("/")
@@ -80,7 +132,7 @@ async def create_project(
     description: str = Form(...),
     latitude: Optional[float] = Form(None),
     longitude: Optional[float] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new carbon credit project"""
     try:
@@ -96,37 +148,56 @@ async def create_project(
             status="draft"
         )
         db.add(project)
-        db.commit()
-        db.refresh(project)
+        await db.commit()
+        await db.refresh(project)
         
         return project
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/projects/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: int, db: Session = Depends(get_db)):
+async def get_project(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get project details by ID"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
+async def _paginated(db, response: Response, statement, sort_column, id_column, cursor, limit, skip, include_total) -> list:
+    """Page of statement; the next page's cursor goes in X-Next-Cursor"""
+    try:
+        rows, next_cursor = await paginate(db, statement, sort_column, id_column, cursor, limit, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count-Estimate"] = await estimate_count(db, statement)
+    return rows
+
+
 @app.get("/api/projects", response_model=List[ProjectResponse])
 async def list_projects(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all projects with optional filtering"""
-    query = db.query(Project)
+    """
+    List projects in creation order with optional filtering
+    
+    Pass the X-Next-Cursor response header as cursor to get the next page.
+    """
+    statement = select(Project)
     if status:
-        query = query.filter(Project.status == status)
-    projects = query.offset(skip).limit(limit).all()
-    return projects
+        statement = statement.where(Project.status == status)
+    return await _paginated(db, response, statement, Project.created_at, Project.id, cursor, limit, skip, include_total)
 
 
 # ==================== IMAGE ANALYSIS ENDPOINTS ====================
@@ -135,10 +206,10 @@ async def list_projects(
 async def upload_and_analyze_site_image(
     project_id: int,
     image: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload site image and perform AI analysis"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -158,7 +229,7 @@ async def upload_and_analyze_site_image(
         # Update project with image path
         project.site_image_path = file_path
         project.image_analysis_result = analysis_result
-        db.commit()
+        await db.commit()
         
         return {
             "success": True,
@@ -172,10 +243,10 @@ async def upload_and_analyze_site_image(
 @app.post("/api/analysis/satellite/{project_id}")
 async def analyze_satellite_data(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Analyze satellite data for the project location"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -198,7 +269,7 @@ async def analyze_satellite_data(
         project.satellite_analysis_result = satellite_result
         project.estimated_carbon_credits = carbon_data["total_carbon_tons"]
         project.vegetation_health = satellite_result.get("vegetation_health", "Excellent")
-        db.commit()
+        await db.commit()
         
         return {
             "success": True,
@@ -209,6 +280,39 @@ async def analyze_satellite_data(
         raise HTTPException(status_code=500, detail=f"Satellite analysis failed: {str(e)}")
 
 
+@app.get("/api/analysis/cache-stats")
+async def get_analysis_cache_stats():
+    """Get satellite analysis cache hit/miss metrics"""
+    return get_analysis_cache().get_stats()
+
+
+@app.post("/api/analysis/recalculate")
+async def recalculate_carbon_credits(
+    background_tasks: BackgroundTasks,
+    chunk_size: int = Query(5000, ge=1, le=MAX_CHUNK_SIZE)
+):
+    """Start a bulk re-estimation of carbon credits for all projects"""
+    job = get_recalculation_job()
+    # Claimed here, not in the task, so concurrent requests cannot both start it
+    if not job.claim():
+        raise HTTPException(status_code=409, detail="Recalculation already running")
+    
+    background_tasks.add_task(
+        job.run,
+        SessionLocal,
+        chunk_size=chunk_size,
+        checkpoint_path="recalculation.checkpoint.json",
+        claimed=True
+    )
+    return {"success": True, "message": "Recalculation started"}
+
+
+@app.get("/api/analysis/recalculate/status")
+async def get_recalculation_status():
+    """Get progress of the bulk recalculation job"""
+    return get_recalculation_job().status
+
+
 # ==================== VERIFICATION ENDPOINTS ====================
 
 @app.post("/api/verification/{project_id}", response_model=VerificationResponse)
@@ -217,14 +321,14 @@ async def create_verification(
     verification_type: str = Form(...),  # 'internal', 'third_party', 'legal'
     verifier_name: str = Form(...),
     notes: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a verification record"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    verification = create_verification_record(
+    verification = await create_verification_record(
         db=db,
         project_id=project_id,
         verification_type=verification_type,
@@ -239,10 +343,10 @@ async def create_verification(
 async def approve_verification(
     verification_id: int,
     notes: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Approve a verification"""
-    verification = update_verification_status(
+    verification = await update_verification_status(
         db=db,
         verification_id=verification_id,
         status="approved",
@@ -250,21 +354,21 @@ async def approve_verification(
     )
     
     # Update project status based on verification type
-    project = db.query(Project).filter(Project.id == verification.project_id).first()
+    project = await db.get(Project, verification.project_id)
     if verification.verification_type == "legal":
         project.status = "verified"
-        db.commit()
+        await db.commit()
     
     return {"success": True, "verification": verification}
 
 
 @app.get("/api/verification/project/{project_id}", response_model=List[VerificationResponse])
-async def get_project_verifications(project_id: int, db: Session = Depends(get_db)):
+async def get_project_verifications(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get all verifications for a project"""
-    verifications = db.query(Verification).filter(
+    verifications = await db.scalars(select(Verification).where(
         Verification.project_id == project_id
-    ).all()
-    return verifications
+    ))
+    return verifications.all()
 
 
 # ==================== BLOCKCHAIN ENDPOINTS ====================
@@ -272,10 +376,10 @@ async def get_project_verifications(project_id: int, db: Session = Depends(get_d
 @app.post("/api/blockchain/deploy/{project_id}")
 async def deploy_blockchain_contract(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Deploy smart contract to blockchain"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -297,19 +401,21 @@ async def deploy_blockchain_contract(
             project_id=project_id,
             transaction_hash=contract_result["transaction_hash"],
             contract_address=contract_result["contract_address"],
-            block_number=contract_result["block_number"],
-            gas_used=contract_result["gas_used"],
-            network_fee=contract_result["network_fee"],
+            block_number=contract_result.get("block_number"),
+            gas_used=contract_result.get("gas_used"),
+            network_fee=contract_result.get("network_fee"),
             transaction_type="contract_deployment",
-            status="confirmed"
+            status="pending"  # confirmed by the transaction tracker
         )
         db.add(transaction)
         
         # Update project
         project.blockchain_address = contract_result["contract_address"]
+        project.chain_project_id = f"MANGROVE-{project.id:03d}"
         project.status = "blockchain_registered"
-        db.commit()
-        db.refresh(transaction)
+        await db.commit()
+        await db.refresh(transaction)
+        get_transaction_tracker().notify()
         
         return {
             "success": True,
@@ -317,17 +423,17 @@ async def deploy_blockchain_contract(
             "contract_address": contract_result["contract_address"]
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Blockchain deployment failed: {str(e)}")
 
 
 @app.post("/api/blockchain/mint-geonft/{project_id}")
 async def mint_project_geonft(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mint GeoNFT for the project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -353,18 +459,19 @@ async def mint_project_geonft(
             project_id=project_id,
             transaction_hash=nft_result["transaction_hash"],
             contract_address=project.blockchain_address,
-            block_number=nft_result["block_number"],
-            gas_used=nft_result["gas_used"],
-            network_fee=nft_result["network_fee"],
+            block_number=nft_result.get("block_number"),
+            gas_used=nft_result.get("gas_used"),
+            network_fee=nft_result.get("network_fee"),
             transaction_type="geonft_mint",
-            status="confirmed"
+            status="pending"  # confirmed by the transaction tracker
         )
         db.add(transaction)
         
         # Update project
         project.geonft_id = nft_result["nft_id"]
-        db.commit()
-        db.refresh(transaction)
+        await db.commit()
+        await db.refresh(transaction)
+        get_transaction_tracker().notify()
         
         return {
             "success": True,
@@ -372,20 +479,54 @@ async def mint_project_geonft(
             "transaction": transaction
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"GeoNFT minting failed: {str(e)}")
 
 
+@app.get("/api/blockchain/transactions/{transaction_hash}", response_model=BlockchainTransactionResponse)
+async def get_blockchain_transaction(transaction_hash: str, db: AsyncSession = Depends(get_db)):
+    """Get a transaction record (status moves from pending to confirmed/failed)"""
+    transaction = await db.scalar(select(BlockchainTransaction).where(
+        BlockchainTransaction.transaction_hash == transaction_hash
+    ))
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return transaction
+
+
+@app.get("/api/blockchain/projects")
+async def get_onchain_projects(project_ids: str):
+    """On-chain state for a comma-separated list of registry project ids"""
+    ids = [project_id.strip() for project_id in project_ids.split(",") if project_id.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="project_ids is required")
+    if len(ids) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 project ids per request")
+    return await get_aptos_service().get_projects(ids)
+
+
+@app.get("/api/blockchain/rpc-stats")
+async def get_aptos_rpc_stats():
+    """Aptos node routing, hedging and cache counters"""
+    return get_aptos_rpc().get_stats()
+
+
+@app.get("/api/blockchain/tracker-stats")
+async def get_transaction_tracker_stats():
+    """Confirmation worker counters"""
+    return get_transaction_tracker().get_stats()
+
+
 # ==================== TOKENIZATION ENDPOINTS ====================
 
 @app.post("/api/tokenization/create/{project_id}")
 async def tokenize_carbon_credits(
     project_id: int,
     unit_price: float = Form(45.0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Tokenize carbon credits as ERC-20 tokens"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -420,18 +561,19 @@ async def tokenize_carbon_credits(
             project_id=project_id,
             transaction_hash=token_result["transaction_hash"],
             contract_address=project.blockchain_address,
-            block_number=token_result["block_number"],
-            gas_used=token_result["gas_used"],
-            network_fee=token_result["network_fee"],
+            block_number=token_result.get("block_number"),
+            gas_used=token_result.get("gas_used"),
+            network_fee=token_result.get("network_fee"),
             transaction_type="token_creation",
-            status="confirmed"
+            status="pending"  # confirmed by the transaction tracker
         )
         db.add(transaction)
         
         # Update project
         project.status = "tokenized"
-        db.commit()
-        db.refresh(carbon_credit)
+        await db.commit()
+        await db.refresh(carbon_credit)
+        get_transaction_tracker().notify()
         
         return {
             "success": True,
@@ -444,16 +586,16 @@ async def tokenize_carbon_credits(
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Tokenization failed: {str(e)}")
 
 
 @app.get("/api/tokenization/{project_id}", response_model=CarbonCreditResponse)
-async def get_carbon_credits(project_id: int, db: Session = Depends(get_db)):
+async def get_carbon_credits(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get carbon credit details for a project"""
-    carbon_credit = db.query(CarbonCredit).filter(
+    carbon_credit = await db.scalar(select(CarbonCredit).where(
         CarbonCredit.project_id == project_id
-    ).first()
+    ))
     if not carbon_credit:
         raise HTTPException(status_code=404, detail="Carbon credits not found")
     return carbon_credit
@@ -465,17 +607,17 @@ async def get_carbon_credits(project_id: int, db: Session = Depends(get_db)):
 async def list_on_marketplace(
     project_id: int,
     asking_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List carbon credits on marketplace"""
-    carbon_credit = db.query(CarbonCredit).filter(
+    carbon_credit = await db.scalar(select(CarbonCredit).where(
         CarbonCredit.project_id == project_id
-    ).first()
+    ))
     if not carbon_credit:
         raise HTTPException(status_code=404, detail="Carbon credits not found")
     
     try:
-        listing = create_market_listing(
+        listing = await create_market_listing(
             db=db,
             carbon_credit_id=carbon_credit.id,
             asking_price=asking_price or carbon_credit.unit_price
@@ -486,33 +628,63 @@ async def list_on_marketplace(
             "listing": listing
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/marketplace/listings/{listing_id}/sell")
+async def sell_listing(listing_id: int, db: AsyncSession = Depends(get_db)):
+    """Mark an active listing as sold"""
+    try:
+        listing = await sell_market_listing(db, listing_id)
+        return {
+            "success": True,
+            "listing": listing
+        }
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/marketplace/listings/{listing_id}/cancel")
+async def cancel_listing(listing_id: int, db: AsyncSession = Depends(get_db)):
+    """Withdraw an active listing"""
+    try:
+        listing = await cancel_market_listing(db, listing_id)
+        return {
+            "success": True,
+            "listing": listing
+        }
+    except ValueError as e:
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/marketplace/listings")
 async def get_marketplace_listings(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all marketplace listings"""
-    listings = db.query(MarketListing).filter(
-        MarketListing.status == "active"
-    ).offset(skip).limit(limit).all()
-    
-    return listings
+    """Get active marketplace listings, oldest first (next page via X-Next-Cursor)"""
+    statement = select(MarketListing).where(MarketListing.status == "active")
+    return await _paginated(
+        db, response, statement, MarketListing.listed_at, MarketListing.id, cursor, limit, skip, include_total
+    )
 
 
 @app.get("/api/marketplace/statistics")
-async def get_marketplace_stats(db: Session = Depends(get_db)):
+async def get_marketplace_stats(db: AsyncSession = Depends(get_db)):
     """Get marketplace statistics with real-time Binance pricing"""
-    stats = get_market_statistics(db)
+    stats = await get_market_statistics(db)
     
     # Get real-time market data from Binance
     try:
         price_service = get_price_service()
-        market_data = await price_service.get_carbon_market_data()
+        market_data = (await price_service.get_snapshot()).as_dict()
         
         # Update stats with real-time data
         stats.update({
@@ -525,18 +697,25 @@ async def get_marketplace_stats(db: Session = Depends(get_db)):
             "demand_level": market_data["demand_level"],
             "crypto_influence": market_data["crypto_influence"],
             "last_updated": market_data["last_updated"],
+            "snapshot_version": market_data["snapshot_version"],
         })
     except Exception as e:
         print(f"⚠️  Binance API error: {e}")
     
     return stats
 
+
+@app.get("/api/marketplace/statistics/aggregate-stats")
+async def get_market_aggregate_stats():
+    """Get marketplace statistics aggregate update/resync counters"""
+    return get_market_stats().get_stats()
+
 @app.get("/api/marketplace/live-prices")
 async def get_live_prices():
     """Get real-time prices from Binance"""
     try:
         price_service = get_price_service()
-        market_data = await price_service.get_carbon_market_data()
+        market_data = (await price_service.get_snapshot()).as_dict()
         return {
             "success": True,
             "data": market_data
@@ -547,6 +726,41 @@ async def get_live_prices():
             "error": str(e)
         }
 
+@app.get("/api/marketplace/live-prices/stream")
+async def stream_live_prices():
+    """Stream real-time prices as Server-Sent Events (full snapshot, then changed fields)"""
+    broadcaster = get_price_broadcaster()
+    subscriber = broadcaster.subscribe()
+    return StreamingResponse(
+        broadcaster.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/marketplace/price-history")
+async def get_price_history(
+    resolution: str = "1m",
+    column: str = "carbon_price",
+    limit: int = 100,
+    since: Optional[float] = None
+):
+    """Get price history from the local store (resolution: raw, 1m, 1h or 1d)"""
+    history_store = get_price_history_store()
+    try:
+        if resolution == "raw":
+            data = history_store.get_samples(limit=limit, since=since)
+        else:
+            data = history_store.get_candles(resolution=resolution, column=column, limit=limit, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "success": True,
+        "resolution": resolution,
+        "column": column,
+        "data": data
+    }
+
 @app.get("/api/marketplace/portfolio-value/{carbon_credits}")
 async def get_portfolio_value(carbon_credits: float):
     """Calculate portfolio value with real-time pricing"""
@@ -566,52 +780,48 @@ async def get_portfolio_value(carbon_credits: float):
 
 # ==================== DASHBOARD ENDPOINTS ====================
 
+@app.get("/api/dashboard/cache-stats")
+async def get_dashboard_cache_stats():
+    """Get dashboard response cache hit/miss metrics"""
+    return get_dashboard_cache().get_stats()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @app.get("/api/dashboard/{project_id}")
-async def get_project_dashboard(project_id: int, db: Session = Depends(get_db)):
-    """Get comprehensive dashboard metrics for a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+async def get_project_dashboard(
+    project_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get comprehensive dashboard metrics for a project
     
-    carbon_credit = db.query(CarbonCredit).filter(
-        CarbonCredit.project_id == project_id
-    ).first()
+    Served from the dashboard cache with an ETag; a poll sending the current
+    ETag in If-None-Match gets 304 without a database query.
+    """
+    cache = get_dashboard_cache()
+    # Clients must revalidate, so a changed project is never shown stale
+    headers = {"Cache-Control": "private, no-cache"}
     
-    # Calculate metrics
-    metrics = {
-        "project_overview": {
-            "credits_generated": carbon_credit.total_credits if carbon_credit else 0,
-            "market_value": carbon_credit.total_value if carbon_credit else 0,
-            "project_status": project.status,
-            "monitoring_since": project.created_at.isoformat()
-        },
-        "key_metrics": {
-            "hectares_restored": project.area,
-            "co2_sequestered": project.estimated_carbon_credits * 1000,  # in kg
-            "community_income": carbon_credit.total_value * 0.70 if carbon_credit else 0,
-            "biodiversity_index": 85
-        },
-        "progress": {
-            "restoration_progress": 78,
-            "carbon_sequestration": 65,
-            "community_impact": 92,
-            "biodiversity_recovery": 71
-        },
-        "environmental_health": {
-            "water_quality": "Improved",
-            "vegetation_health": project.vegetation_health or "Excellent",
-            "marine_life": "Recovering"
-        },
-        "community_benefits": {
-            "families_supported": 156,
-            "jobs_created": 12,
-            "training_programs": True,
-            "livelihood_opportunities": True,
-            "women_empowerment": True
-        }
-    }
+    cached = cache.peek(project_id)
+    if cached and _etag_matches(if_none_match, cached[0]):
+        cache.record_not_modified()
+        return Response(status_code=304, headers={**headers, "ETag": cached[0]})
     
-    return metrics
+    dashboard = await cache.get(db, project_id)
+    if dashboard is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    etag, body = dashboard
+    headers["ETag"] = etag
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"""Baseline schema (tables created by Base.metadata.create_all before migrations)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_type", sa.String(100), nullable=False),
+        sa.Column("location", sa.String(200), nullable=False),
+        sa.Column("area", sa.Float(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("status", sa.String(50)),
+        sa.Column("site_image_path", sa.String(500)),
+        sa.Column("image_analysis_result", sa.JSON()),
+        sa.Column("satellite_analysis_result", sa.JSON()),
+        sa.Column("estimated_carbon_credits", sa.Float()),
+        sa.Column("vegetation_health", sa.String(50)),
+        sa.Column("blockchain_address", sa.String(200)),
+        sa.Column("geonft_id", sa.String(200)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_projects_id", "projects", ["id"])
+    
+    op.create_table(
+        "verifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("verification_type", sa.String(50), nullable=False),
+        sa.Column("verifier_name", sa.String(200), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("verified_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_verifications_id", "verifications", ["id"])
+    
+    op.create_table(
+        "blockchain_transactions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("transaction_hash", sa.String(200), nullable=False, unique=True),
+        sa.Column("contract_address", sa.String(200)),
+        sa.Column("block_number", sa.Integer()),
+        sa.Column("gas_used", sa.Integer()),
+        sa.Column("network_fee", sa.Float()),
+        sa.Column("transaction_type", sa.String(50)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_blockchain_transactions_id", "blockchain_transactions", ["id"])
+    
+    op.create_table(
+        "carbon_credits",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("total_credits", sa.Float(), nullable=False),
+        sa.Column("available_credits", sa.Float(), nullable=False),
+        sa.Column("retired_credits", sa.Float()),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.Column("total_value", sa.Float(), nullable=False),
+        sa.Column("token_standard", sa.String(50)),
+        sa.Column("vintage_year", sa.Integer()),
+        sa.Column("registry", sa.String(100)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_carbon_credits_id", "carbon_credits", ["id"])
+    
+    op.create_table(
+        "market_listings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("carbon_credit_id", sa.Integer(), sa.ForeignKey("carbon_credits.id"), nullable=False),
+        sa.Column("asking_price", sa.Float(), nullable=False),
+        sa.Column("available_amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("listed_at", sa.DateTime()),
+        sa.Column("sold_at", sa.DateTime()),
+    )
+    op.create_index("ix_market_listings_id", "market_listings", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("market_listings", "carbon_credits", "blockchain_transactions", "verifications", "projects"):
+        op.drop_index(f"ix_{table}_id", table_name=table)
+        op.drop_table(table)
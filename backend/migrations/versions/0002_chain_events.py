@@ -0,0 +1,65 @@
+"""On-chain project ids and event listener tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created with create_all after these models were added
+    # already have some of this
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    
+    if "chain_project_id" not in {column["name"] for column in inspector.get_columns("projects")}:
+        op.add_column("projects", sa.Column("chain_project_id", sa.String(100)))
+        op.create_index("ix_projects_chain_project_id", "projects", ["chain_project_id"], unique=True)
+    
+    if "event_cursors" not in tables:
+        op.create_table(
+            "event_cursors",
+            sa.Column("event_type", sa.String(50), primary_key=True),
+            sa.Column("next_sequence", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+    
+    if "processed_events" not in tables:
+        op.create_table(
+            "processed_events",
+            sa.Column("event_type", sa.String(50), primary_key=True),
+            sa.Column("sequence_number", sa.Integer(), primary_key=True),
+            sa.Column("version", sa.BigInteger()),
+            sa.Column("processed_at", sa.DateTime()),
+        )
+    
+    if "dead_letter_events" not in tables:
+        op.create_table(
+            "dead_letter_events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("event_type", sa.String(50), nullable=False),
+            sa.Column("sequence_number", sa.Integer(), nullable=False),
+            sa.Column("version", sa.BigInteger()),
+            sa.Column("payload", sa.JSON()),
+            sa.Column("error", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_dead_letter_events_id", "dead_letter_events", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dead_letter_events_id", table_name="dead_letter_events")
+    op.drop_table("dead_letter_events")
+    op.drop_table("processed_events")
+    op.drop_table("event_cursors")
+    op.drop_index("ix_projects_chain_project_id", table_name="projects")
+    with op.batch_alter_table("projects") as batch_op:
+        batch_op.drop_column("chain_project_id")
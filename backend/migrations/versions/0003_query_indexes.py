@@ -0,0 +1,39 @@
+"""Indexes for the status filters and foreign-key lookups of hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    # list_projects: filter by status, page in id order
+    ("ix_projects_status_id", "projects", ["status", "id"]),
+    # Verifications of a project, optionally by status
+    ("ix_verifications_project_id_status", "verifications", ["project_id", "status"]),
+    ("ix_blockchain_transactions_project_id", "blockchain_transactions", ["project_id"]),
+    # Transaction tracker: pending rows in id order
+    ("ix_blockchain_transactions_status_id", "blockchain_transactions", ["status", "id"]),
+    # Event projectors match transactions by ledger version
+    ("ix_blockchain_transactions_block_number", "blockchain_transactions", ["block_number"]),
+    ("ix_carbon_credits_project_id", "carbon_credits", ["project_id"]),
+    # Active listings: count and average price from the index alone
+    ("ix_market_listings_status_asking_price", "market_listings", ["status", "asking_price"]),
+    ("ix_market_listings_carbon_credit_id", "market_listings", ["carbon_credit_id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
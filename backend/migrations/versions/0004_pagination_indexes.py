@@ -0,0 +1,32 @@
+"""Indexes for keyset pagination of projects and listings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_projects_created_at_id", "projects", ["created_at", "id"]),
+    ("ix_projects_status_created_at_id", "projects", ["status", "created_at", "id"]),
+    ("ix_market_listings_status_listed_at_id", "market_listings", ["status", "listed_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    # Superseded by ix_projects_status_created_at_id
+    op.drop_index("ix_projects_status_id", table_name="projects", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_projects_status_id", "projects", ["status", "id"])
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,35 @@
+"""64-bit columns for Aptos ledger versions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Ledger versions are u64 and already past 2**31
+COLUMNS = (
+    ("blockchain_transactions", "block_number"),
+    ("processed_events", "version"),
+    ("dead_letter_events", "version"),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        return  # SQLite integers are 64-bit already
+    for table, column in COLUMNS:
+        op.alter_column(table, column, type_=sa.BigInteger(), existing_type=sa.Integer())
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    for table, column in reversed(COLUMNS):
+        op.alter_column(table, column, type_=sa.Integer(), existing_type=sa.BigInteger())
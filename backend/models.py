@@ -1,7 +1,7 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -9,6 +9,11 @@ from database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # list_projects pages in (created_at, id) order, optionally by status
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        Index("ix_projects_status_created_at_id", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_type = Column(String(100), nullable=False)
@@ -33,6 +38,7 @@ class Project(Base):
     # Blockchain data
     blockchain_address = Column(String(200))
     geonft_id = Column(String(200))
+    chain_project_id = Column(String(100), unique=True, index=True)  # project id in the on-chain registry
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -46,6 +52,10 @@ class Project(Base):
 
 class Verification(Base):
     __tablename__ = "verifications"
+    __table_args__ = (
+        # Verifications of a project, optionally by status (approved requirements)
+        Index("ix_verifications_project_id_status", "project_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -62,12 +72,18 @@ class Verification(Base):
 
 class BlockchainTransaction(Base):
     __tablename__ = "blockchain_transactions"
+    __table_args__ = (
+        Index("ix_blockchain_transactions_project_id", "project_id"),
+        # Transaction tracker: pending rows in id order
+        Index("ix_blockchain_transactions_status_id", "status", "id"),
+        Index("ix_blockchain_transactions_block_number", "block_number"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     transaction_hash = Column(String(200), unique=True, nullable=False)
     contract_address = Column(String(200))
-    block_number = Column(Integer)
+    block_number = Column(BigInteger)  # ledger version (u64) on Aptos
     gas_used = Column(Integer)
     network_fee = Column(Float)
     transaction_type = Column(String(50))  # contract_deployment, geonft_mint, token_creation
@@ -80,6 +96,9 @@ class BlockchainTransaction(Base):
 
 class CarbonCredit(Base):
     __tablename__ = "carbon_credits"
+    __table_args__ = (
+        Index("ix_carbon_credits_project_id", "project_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -101,6 +120,13 @@ class CarbonCredit(Base):
 
 class MarketListing(Base):
     __tablename__ = "market_listings"
+    __table_args__ = (
+        # Active listings: count and average price are answered from the index alone
+        Index("ix_market_listings_status_asking_price", "status", "asking_price"),
+        Index("ix_market_listings_carbon_credit_id", "carbon_credit_id"),
+        # Listing pages in (listed_at, id) order
+        Index("ix_market_listings_status_listed_at_id", "status", "listed_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     carbon_credit_id = Column(Integer, ForeignKey("carbon_credits.id"), nullable=False)
@@ -112,3 +138,32 @@ class MarketListing(Base):
     
     # Relationship
     carbon_credit = relationship("CarbonCredit", back_populates="market_listings")
+
+
+class EventCursor(Base):
+    __tablename__ = "event_cursors"
+    
+    event_type = Column(String(50), primary_key=True)  # project_created, credits_transferred, ...
+    next_sequence = Column(Integer, nullable=False, default=0)  # next event sequence number to process
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ProcessedEvent(Base):
+    __tablename__ = "processed_events"
+    
+    event_type = Column(String(50), primary_key=True)
+    sequence_number = Column(Integer, primary_key=True)
+    version = Column(BigInteger)  # ledger version of the emitting transaction (u64)
+    processed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DeadLetterEvent(Base):
+    __tablename__ = "dead_letter_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)
+    sequence_number = Column(Integer, nullable=False)
+    version = Column(BigInteger)
+    payload = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
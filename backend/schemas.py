@@ -34,6 +34,7 @@ class ProjectResponse(BaseModel):
     vegetation_health: Optional[str]
     blockchain_address: Optional[str]
     geonft_id: Optional[str]
+    chain_project_id: Optional[str] = None
     created_at: datetime
     
     class Config:
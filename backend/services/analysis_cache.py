@@ -0,0 +1,260 @@
+"""
+Satellite analysis cache
+Content-addressed two-tier cache (in-memory LRU + disk) for analysis results,
+keyed by location tile, area footprint and acquisition date window
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+
+def satellite_cache_key(
+    latitude: float,
+    longitude: float,
+    area: float,
+    acquisition_date: Optional[date] = None,
+    tile_degrees: float = 0.01,
+    window_days: int = 5
+) -> str:
+    """
+    Content address for a satellite analysis
+    
+    Coordinates are snapped to a tile grid (0.01 deg is roughly 1 km), the
+    area is rounded to 0.01 ha and the acquisition date is bucketed into
+    windows matching the imagery revisit period, so nearby projects and
+    repeated requests resolve to the same key.
+    """
+    acquisition_date = acquisition_date or datetime.utcnow().date()
+    tile_lat = int((latitude or 0.0) // tile_degrees)
+    tile_lon = int((longitude or 0.0) // tile_degrees)
+    window = acquisition_date.toordinal() // window_days
+    descriptor = f"satellite:v1:{tile_lat}:{tile_lon}:{tile_degrees}:{round(area or 0.0, 2)}:{window}:{window_days}"
+    return hashlib.sha256(descriptor.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier cache with TTL, size-based disk eviction and hit/miss metrics"""
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        memory_entries: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir or os.getenv("SATELLITE_CACHE_DIR", "data/satellite_cache")
+        self.memory_entries = memory_entries or int(os.getenv("SATELLITE_CACHE_MEMORY_ENTRIES", "1024"))
+        self.disk_max_bytes = disk_max_bytes or int(os.getenv("SATELLITE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.ttl = ttl or float(os.getenv("SATELLITE_CACHE_TTL", str(5 * 86400)))
+        
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.disk_bytes: Optional[int] = None  # computed lazily
+        self.disk_lock = threading.RLock()  # disk writes run in worker threads
+        
+        self.metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+    
+    # ==================== MEMORY TIER ====================
+    
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self.memory[key]
+            self.metrics["expired"] += 1
+            return None
+        self.memory.move_to_end(key)
+        return value
+    
+    def _memory_put(self, key: str, value: Dict[str, Any], expires_at: float):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+            self.metrics["memory_evictions"] += 1
+    
+    # ==================== DISK TIER ====================
+    
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+    
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                total += os.path.getsize(os.path.join(root, filename))
+        return total
+    
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry["expires_at"] < time.time():
+            self._disk_remove(path)
+            self.metrics["expired"] += 1
+            return None
+        # Touch so eviction is least-recently-used
+        os.utime(path)
+        return entry["expires_at"], entry["value"]
+    
+    def _disk_remove(self, path: str):
+        with self.disk_lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                if self.disk_bytes is not None:
+                    self.disk_bytes -= size
+            except FileNotFoundError:
+                pass
+    
+    def _disk_put(self, key: str, value: Dict[str, Any], expires_at: float):
+        path = self._path(key)
+        data = json.dumps({"expires_at": expires_at, "value": value})
+        with self.disk_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.disk_bytes is None:
+                self.disk_bytes = self._scan_disk_bytes()
+            if os.path.exists(path):
+                self._disk_remove(path)
+            
+            with open(path + ".tmp", "w") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            self.disk_bytes += len(data.encode())
+            
+            if self.disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+    
+    def _evict_disk(self):
+        """Remove least recently used files until under 90% of the size limit (disk_lock held)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        target = self.disk_max_bytes * 0.9
+        self.disk_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.disk_bytes <= target:
+                break
+            self._disk_remove(path)
+            self.metrics["disk_evictions"] += 1
+    
+    # ==================== PUBLIC API ====================
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look a key up in memory, then on disk (promoting disk hits to memory)"""
+        value = self._memory_get(key)
+        if value is not None:
+            self.metrics["memory_hits"] += 1
+            return value
+        
+        entry = await asyncio.to_thread(self._disk_get, key)
+        if entry is not None:
+            expires_at, value = entry
+            self._memory_put(key, value, expires_at)
+            self.metrics["disk_hits"] += 1
+            return value
+        
+        return None
+    
+    async def put(self, key: str, value: Dict[str, Any]):
+        """Store a value in both tiers"""
+        expires_at = time.time() + self.ttl
+        self._memory_put(key, value, expires_at)
+        try:
+            await asyncio.to_thread(self._disk_put, key, value, expires_at)
+        except OSError as e:
+            print(f"⚠️  Could not write analysis cache entry: {e}")
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached value or compute it once, even for concurrent callers"""
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.metrics["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The computing caller was cancelled, not us: take over
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.get_or_compute(key, compute)
+        
+        # A computation may have finished while we were reading from disk
+        value = self._memory_get(key)
+        if value is not None:
+            self.metrics["memory_hits"] += 1
+            return value
+        
+        self.metrics["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            value = await compute()
+            await self.put(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; avoid "exception never retrieved"
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled: release the waiting callers (one of them recomputes)
+            future.cancel()
+            raise
+        finally:
+            del self.in_flight[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics and tier sizes"""
+        lookups = self.metrics["memory_hits"] + self.metrics["disk_hits"] + self.metrics["misses"]
+        hits = self.metrics["memory_hits"] + self.metrics["disk_hits"]
+        return {
+            **self.metrics,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "memory_entries": len(self.memory),
+            "disk_bytes": self.disk_bytes,
+        }
+
+
+# Global instance
+_analysis_cache = None
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get or create analysis cache instance"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisCache()
+    return _analysis_cache
@@ -0,0 +1,116 @@
+"""
+Batched transaction submission for the Aptos registry account
+Gathers entry function calls over a short window and submits each batch
+pipelined, with a contiguous block of sequence numbers
+"""
+import asyncio
+import os
+from typing import Dict, Any, Callable, Awaitable, List, Optional, Tuple
+
+from .aptos_sequence import SequenceNumberManager
+
+
+class TransactionBatcher:
+    """
+    Coalesces concurrent submissions into pipelined batches
+    
+    Callers await submit(payload) and get back their own transaction hash
+    (or their own exception); a failed transaction does not affect the
+    other transactions of its batch.
+    """
+    
+    def __init__(
+        self,
+        sequence_numbers: SequenceNumberManager,
+        submit_signed: Callable[[Any, int], Awaitable[str]],
+        window: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.sequence_numbers = sequence_numbers
+        self.submit_signed = submit_signed
+        self.window = window if window is not None else float(os.getenv("APTOS_BATCH_WINDOW_MS", "20")) / 1000
+        self.max_batch_size = min(
+            max_batch_size or int(os.getenv("APTOS_BATCH_MAX_SIZE", "50")),
+            sequence_numbers.max_in_flight
+        )
+        
+        self.queue: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+        self.metrics = {
+            "batches": 0,
+            "transactions": 0,
+            "failures": 0,
+            "largest_batch": 0,
+        }
+    
+    async def submit(self, payload) -> str:
+        """Queue a payload for the next batch and wait for its transaction hash"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.append((payload, future))
+        
+        if len(self.queue) >= self.max_batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+        return await future
+    
+    def _flush(self):
+        """Start submitting everything queued so far"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        
+        while self.queue:
+            batch = self.queue[:self.max_batch_size]
+            self.queue = self.queue[self.max_batch_size:]
+            task = asyncio.create_task(self._submit_batch(batch))
+            # Keep a reference until done so the task is not garbage collected
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+    
+    async def _submit_one(self, payload, sequence_number: int) -> str:
+        try:
+            tx_hash = await self.submit_signed(payload, sequence_number)
+        except Exception as e:
+            await self.sequence_numbers.failed(sequence_number, e)
+            raise
+        await self.sequence_numbers.submitted(sequence_number)
+        return tx_hash
+    
+    async def _submit_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Reserve sequence numbers for the batch and submit all of it at once"""
+        try:
+            numbers = await self.sequence_numbers.reserve_many(len(batch))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        results = await asyncio.gather(
+            *(self._submit_one(payload, number) for (payload, _), number in zip(batch, numbers)),
+            return_exceptions=True
+        )
+        
+        self.metrics["batches"] += 1
+        self.metrics["transactions"] += len(batch)
+        self.metrics["largest_batch"] = max(self.metrics["largest_batch"], len(batch))
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # caller went away
+            if isinstance(result, BaseException):
+                self.metrics["failures"] += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch counters"""
+        batches = self.metrics["batches"]
+        return {
+            **self.metrics,
+            "average_batch_size": round(self.metrics["transactions"] / batches, 2) if batches else None,
+            "queued": len(self.queue),
+        }
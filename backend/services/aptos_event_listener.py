@@ -4,48 +4,139 @@ Listens for contract events and processes them
 """
 import asyncio
 import os
-from typing import Dict, Any, List, Callable
+import re
+import time
+from collections import deque
+from typing import Dict, Any, List, Callable, Optional
 from datetime import datetime
 
-try:
-    from aptos_sdk.client import RestClient
-    from aptos_sdk.async_client import RestClient as AsyncRestClient
-    APTOS_AVAILABLE = True
-except ImportError:
-    APTOS_AVAILABLE = False
-    print("⚠️  Aptos SDK not installed. Event listener disabled.")
-    print("   Install with: pip install aptos-sdk")
+from sqlalchemy import insert
+
+from models import (
+    Project, CarbonCredit, BlockchainTransaction, EventCursor, ProcessedEvent, DeadLetterEvent
+)
+from .aptos_rpc import get_aptos_rpc
+from .project_state_cache import get_project_state_cache
+
+EVENT_TYPES = ('project_created', 'project_updated', 'project_deleted', 'credits_transferred')
+
+
+class ProjectNotFound(LookupError):
+    """An event refers to a project whose project_created event has not been applied yet"""
+
+
+class TokenBucket:
+    """Rate limit shared by every poller: rate calls per second on average, bursts up to burst"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.waited = 0.0  # seconds callers spent waiting for a token
+    
+    async def acquire(self):
+        """Wait for a token (callers are served in arrival order)"""
+        if self.rate <= 0:
+            return  # unlimited
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+                await asyncio.sleep(wait)
+
+
+class RpcEventSource:
+    """Registry events read from the chain through the shared RPC client"""
+    
+    def __init__(self, module_address: str, rpc=None):
+        self.module_address = module_address
+        self.rpc = rpc or get_aptos_rpc()
+        self.event_handle = f"{module_address}::registry::EventHandles"
+    
+    def describe(self) -> str:
+        return f"{', '.join(node.url for node in self.rpc.nodes)} ({self.module_address})"
+    
+    async def head(self, event_type: str) -> int:
+        """Number of events emitted so far (the event handle's counter)"""
+        resource = await self.rpc.account_resource(self.module_address, self.event_handle)
+        return int(resource['data'][f"{event_type}_events"]['counter'])
+    
+    async def events(self, event_type: str, start: int, limit: int) -> List[Dict]:
+        """Events with sequence numbers from start, at most limit of them"""
+        return await self.rpc.get_events_by_event_handle(
+            self.module_address,
+            self.event_handle,
+            f"{event_type}_events",
+            start,
+            limit
+        )
 
 
 class AptosEventListener:
     """Listen for and process Aptos contract events"""
     
-    def __init__(self):
-        if not APTOS_AVAILABLE:
-            return
-            
-        self.node_url = os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
+    def __init__(
+        self,
+        source=None,
+        session_factory=None,
+        page_size: Optional[int] = None,
+        catchup_concurrency: Optional[int] = None,
+        rpc_rate: Optional[float] = None
+    ):
         self.module_address = os.getenv("APTOS_MODULE_ADDRESS", "0x1")
-        self.client = RestClient(self.node_url)
-        self.async_client = AsyncRestClient(self.node_url)
-        
-        # Event handlers
-        self.handlers = {
-            'project_created': [],
-            'project_updated': [],
-            'project_deleted': [],
-            'credits_transferred': [],
-        }
+        self.source = source or RpcEventSource(self.module_address)
+        self.session_factory = session_factory
+        self.page_size = page_size or int(os.getenv("APTOS_EVENT_PAGE_SIZE", "100"))
+        self.catchup_concurrency = catchup_concurrency or int(os.getenv("APTOS_EVENT_CATCHUP_CONCURRENCY", "8"))
+        # How long an event waiting for its project is retried before it is dead-lettered
+        self.retry_window = float(os.getenv("APTOS_EVENT_RETRY_WINDOW", "600"))
+        self.retrying_since: Dict[tuple, float] = {}  # (event_type, sequence_number) -> first attempt
         
-        # Track last processed sequence numbers
-        self.last_sequence = {
-            'project_created': 0,
-            'project_updated': 0,
-            'project_deleted': 0,
-            'credits_transferred': 0,
-        }
+        # Idle event types back off from min_interval to max_interval
+        self.min_interval = float(os.getenv("APTOS_EVENT_POLL_MIN_INTERVAL", "1"))
+        self.max_interval = float(os.getenv("APTOS_EVENT_POLL_MAX_INTERVAL", "60"))
+        # One budget for the RPC calls of all event types (0 = unlimited)
+        self.rate_limiter = TokenBucket(
+            rpc_rate if rpc_rate is not None else float(os.getenv("APTOS_EVENT_RPC_RATE", "20"))
+        )
         
+        # Projectors write events to the database inside the page transaction;
+        # handlers are notified (concurrently) once the page is committed
+        self.projectors = {event_type: [] for event_type in EVENT_TYPES}
+        self.handlers = {event_type: [] for event_type in EVENT_TYPES}
+        
+        # Next sequence number to process per event type (persisted in event_cursors)
+        self.next_sequence: Dict[str, int] = {}
+        
+        self.metrics = {
+            event_type: {
+                "processed": 0,
+                "dead_lettered": 0,
+                "waiting": 0,
+                "head": None,
+                "rpc_calls": 0,
+                "poll_interval": None,
+                "catchup_events_per_second": None,
+            }
+            for event_type in EVENT_TYPES
+        }
         self.running = False
+        self.stopped = asyncio.Event()
+    
+    def register_projector(self, event_type: str, projector: Callable):
+        """Register a function (db, event_data) that writes an event to the database"""
+        if event_type in self.projectors:
+            self.projectors[event_type].append(projector)
+        else:
+            print(f"⚠️  Unknown event type: {event_type}")
     
     def register_handler(self, event_type: str, handler: Callable):
         """Register a handler function for an event type"""
@@ -55,91 +146,299 @@ class AptosEventListener:
         else:
             print(f"⚠️  Unknown event type: {event_type}")
     
+    # ==================== CURSORS ====================
+    
+    def _session(self):
+        if self.session_factory is None:
+            from database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+    
+    def load_cursors(self):
+        """Resume from the persisted cursors (or the first event)"""
+        db = self._session()
+        try:
+            cursors = {cursor.event_type: cursor.next_sequence for cursor in db.query(EventCursor).all()}
+        finally:
+            db.close()
+        self.next_sequence = {event_type: cursors.get(event_type, 0) for event_type in EVENT_TYPES}
+    
+    @staticmethod
+    def _save_cursor(db, event_type: str, next_sequence: int):
+        cursor = db.get(EventCursor, event_type)
+        if cursor is None:
+            db.add(EventCursor(event_type=event_type, next_sequence=next_sequence))
+        else:
+            cursor.next_sequence = next_sequence
+    
+    # ==================== PROCESSING ====================
+    
     async def get_events(self, event_type: str, start: int = 0, limit: int = 25) -> List[Dict]:
         """Fetch events from the contract"""
-        try:
-            event_handle = f"{self.module_address}::registry::EventHandles"
-            field_name = f"{event_type}_events"
-            
-            events = await self.async_client.get_events_by_event_handle(
-                self.module_address,
-                event_handle,
-                field_name,
-                start,
-                limit
-            )
-            
-            return events
-        except Exception as e:
-            print(f"❌ Failed to fetch {event_type} events: {e}")
-            return []
+        await self.rate_limiter.acquire()
+        self.metrics[event_type]["rpc_calls"] += 1
+        return await self.source.events(event_type, start, limit)
+    
+    async def get_head(self, event_type: str) -> int:
+        """Number of events emitted so far"""
+        await self.rate_limiter.acquire()
+        self.metrics[event_type]["rpc_calls"] += 1
+        head = await self.source.head(event_type)
+        self.metrics[event_type]["head"] = head
+        return head
+    
+    @staticmethod
+    def _event_data(event_type: str, event: Dict) -> Dict[str, Any]:
+        return {
+            'type': event_type,
+            'data': event.get('data', {}),
+            'version': int(event['version']) if event.get('version') is not None else None,
+            'sequence_number': int(event['sequence_number']),
+            'timestamp': datetime.utcnow().isoformat(),
+        }
+    
+    async def _notify(self, event_type: str, events: List[Dict[str, Any]]):
+        """Run the notification handlers for a committed page concurrently"""
+        handlers = self.handlers.get(event_type, [])
+        if not handlers or not events:
+            return
+        results = await asyncio.gather(
+            *(handler(event_data) for event_data in events for handler in handlers),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"❌ Handler error: {result}")
+    
+    async def process_page(self, event_type: str, events: List[Dict]) -> int:
+        """
+        Project a page of events into the database in one transaction
+        
+        Every event is applied in its own savepoint and recorded in
+        processed_events, so replays are skipped and a failing event is
+        rolled back alone and parked in dead_letter_events instead of
+        stalling the stream. An event whose project is not known yet
+        (ProjectNotFound, the per-type pollers run independently) stops the
+        page there instead: the cursor stays on it and it is retried on the
+        next poll, and dead-lettered only after retry_window seconds. The
+        cursor is committed with the page, so a restart resumes after the
+        last completed event. The database work runs in a worker thread,
+        off the event loop.
+        
+        Returns the number of events consumed (fewer than given if blocked).
+        """
+        start = self.next_sequence[event_type]
+        events = [event for event in events if int(event['sequence_number']) >= start]
+        if not events:
+            return 0
+        
+        applied, dead_lettered, next_sequence = await asyncio.to_thread(self._project_page, event_type, events)
+        consumed = next_sequence - start
+        
+        self.next_sequence[event_type] = next_sequence
+        self.metrics[event_type]["processed"] += consumed
+        self.metrics[event_type]["dead_lettered"] += dead_lettered
+        self.metrics[event_type]["waiting"] = sum(1 for key in self.retrying_since if key[0] == event_type)
+        
+        await self._notify(event_type, applied)
+        return consumed
     
-    async def process_event(self, event_type: str, event: Dict):
-        """Process a single event"""
+    def _project_page(self, event_type: str, events: List[Dict]):
+        """Apply a page in one transaction; returns (applied event data, dead-lettered count, next sequence)"""
+        next_sequence = int(events[-1]['sequence_number']) + 1
+        projectors = self.projectors.get(event_type, [])
+        applied = []
+        processed = []
+        dead_lettered = 0
+        db = self._session()
         try:
-            # Extract event data
-            event_data = {
-                'type': event_type,
-                'data': event.get('data', {}),
-                'version': event.get('version'),
-                'sequence_number': event.get('sequence_number'),
-                'timestamp': datetime.utcnow().isoformat(),
-            }
+            # Writing the cursor first also opens the transaction before the
+            # first savepoint
+            self._save_cursor(db, event_type, next_sequence)
+            db.flush()
             
-            print(f"📨 Processing {event_type} event #{event_data['sequence_number']}")
+            sequence_numbers = [int(event['sequence_number']) for event in events]
+            already_processed = {
+                row.sequence_number for row in db.query(ProcessedEvent.sequence_number).filter(
+                    ProcessedEvent.event_type == event_type,
+                    ProcessedEvent.sequence_number.between(min(sequence_numbers), max(sequence_numbers))
+                )
+            }
             
-            # Call all registered handlers
-            for handler in self.handlers.get(event_type, []):
+            for event in events:
+                event_data = self._event_data(event_type, event)
+                if event_data['sequence_number'] in already_processed:
+                    continue
+                
+                key = (event_type, event_data['sequence_number'])
                 try:
-                    await handler(event_data)
+                    if projectors:
+                        with db.begin_nested():
+                            for projector in projectors:
+                                projector(db, event_data)
+                    applied.append(event_data)
+                    self.retrying_since.pop(key, None)
+                except ProjectNotFound as e:
+                    first_attempt = self.retrying_since.setdefault(key, time.monotonic())
+                    if time.monotonic() - first_attempt < self.retry_window:
+                        # Resume here once the project has been created
+                        next_sequence = event_data['sequence_number']
+                        self._save_cursor(db, event_type, next_sequence)
+                        print(f"⏳ {event_type} event #{next_sequence} waiting: {e}")
+                        break
+                    del self.retrying_since[key]
+                    dead_lettered += 1
+                    print(f"❌ {event_type} event #{event_data['sequence_number']} still waiting after "
+                          f"{self.retry_window:.0f}s, dead-lettered: {e}")
+                    db.add(DeadLetterEvent(
+                        event_type=event_type,
+                        sequence_number=event_data['sequence_number'],
+                        version=event_data['version'],
+                        payload=event_data['data'],
+                        error=str(e)
+                    ))
                 except Exception as e:
-                    print(f"❌ Handler error: {e}")
-            
-            # Update last processed sequence
-            self.last_sequence[event_type] = event_data['sequence_number']
+                    dead_lettered += 1
+                    print(f"❌ {event_type} event #{event_data['sequence_number']} failed, dead-lettered: {e}")
+                    db.add(DeadLetterEvent(
+                        event_type=event_type,
+                        sequence_number=event_data['sequence_number'],
+                        version=event_data['version'],
+                        payload=event_data['data'],
+                        error=str(e)
+                    ))
+                
+                processed.append({
+                    'event_type': event_type,
+                    'sequence_number': event_data['sequence_number'],
+                    'version': event_data['version'],
+                    'processed_at': datetime.utcnow(),
+                })
             
-        except Exception as e:
-            print(f"❌ Failed to process event: {e}")
+            if processed:
+                db.execute(insert(ProcessedEvent), processed)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return applied, dead_lettered, next_sequence
     
-    async def poll_events(self, event_type: str, interval: int = 5):
-        """Poll for new events of a specific type"""
+    async def catch_up(self, event_type: str) -> int:
+        """
+        Drain the backlog up to the current head
+        
+        The range between the cursor and the head is split into pages that
+        are fetched concurrently (a bounded window ahead of processing) and
+        processed strictly in order.
+        """
+        head = await self.get_head(event_type)
+        start = self.next_sequence[event_type]
+        if head <= start:
+            return 0
+        
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        page_starts = iter(range(start, head, self.page_size))
+        
+        def fetch_next(pending: deque):
+            page_start = next(page_starts, None)
+            if page_start is not None:
+                limit = min(self.page_size, head - page_start)
+                pending.append((limit, asyncio.create_task(self.get_events(event_type, page_start, limit))))
+        
+        pending: deque = deque()
+        for _ in range(self.catchup_concurrency):
+            fetch_next(pending)
+        
+        processed = 0
+        try:
+            while pending:
+                limit, task = pending.popleft()
+                events = await task
+                fetch_next(pending)
+                consumed = await self.process_page(event_type, events)
+                processed += consumed
+                if consumed < len(events):
+                    # Blocked on an event waiting for its project; retry on the next poll
+                    break
+                if len(events) < limit:
+                    # The node returned a short page; resume from the cursor next time
+                    break
+        finally:
+            for _, task in pending:
+                task.cancel()
+        
+        elapsed = loop.time() - started_at
+        if elapsed > 0:
+            self.metrics[event_type]["catchup_events_per_second"] = round(processed / elapsed, 1)
+        if processed:
+            print(f"📨 Caught up {processed} {event_type} events (now at #{self.next_sequence[event_type]})")
+        return processed
+    
+    async def poll_once(self, event_type: str) -> int:
+        """Steady-state poll: one page from the cursor, switching to catch-up if it came back full"""
+        events = await self.get_events(event_type, start=self.next_sequence[event_type], limit=self.page_size)
+        processed = await self.process_page(event_type, events)
+        if processed:
+            print(f"📨 Processed {processed} {event_type} events (now at #{self.next_sequence[event_type]})")
+        if self.metrics[event_type]["waiting"]:
+            return processed  # blocked on an event waiting for its project
+        if len(events) >= self.page_size:
+            processed += await self.catch_up(event_type)
+        else:
+            # A short page means we have seen everything emitted so far
+            head = self.metrics[event_type]["head"]
+            self.metrics[event_type]["head"] = max(head or 0, self.next_sequence[event_type])
+        return processed
+    
+    def _next_interval(self, interval: float, processed: int) -> float:
+        """Poll again at once after a full page, back off exponentially while idle"""
+        if processed >= self.page_size:
+            return 0
+        if processed:
+            return self.min_interval
+        return min(max(interval * 2, self.min_interval), self.max_interval)
+    
+    async def poll_events(self, event_type: str):
+        """Catch up on the backlog, then poll for new events of a specific type"""
+        caught_up = False
+        interval = self.min_interval
         while self.running:
             try:
-                # Fetch events starting from last processed
-                start = self.last_sequence[event_type] + 1
-                events = await self.get_events(event_type, start=start, limit=25)
-                
-                # Process new events
-                for event in events:
-                    await self.process_event(event_type, event)
-                
-                # Wait before next poll
-                await asyncio.sleep(interval)
-                
+                if not caught_up:
+                    processed = await self.catch_up(event_type)
+                    caught_up = True
+                else:
+                    processed = await self.poll_once(event_type)
             except Exception as e:
                 print(f"❌ Polling error for {event_type}: {e}")
-                await asyncio.sleep(interval)
+                processed = 0
+            
+            interval = self._next_interval(interval, processed)
+            self.metrics[event_type]["poll_interval"] = interval
+            if interval:
+                try:
+                    await asyncio.wait_for(self.stopped.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
     
-    async def start(self, poll_interval: int = 5):
+    async def start(self, poll_interval: Optional[float] = None):
         """Start listening for all events"""
-        if not APTOS_AVAILABLE:
-            print("⚠️  Aptos SDK not available. Event listener not started.")
-            return
-        
+        if poll_interval is not None:
+            self.min_interval = poll_interval
         print("🎧 Starting Aptos event listener...")
-        print(f"   Node: {self.node_url}")
-        print(f"   Module: {self.module_address}")
-        print(f"   Poll interval: {poll_interval}s")
+        print(f"   Source: {self.source.describe()}")
+        print(f"   Poll interval: {self.min_interval:g}s, backing off to {self.max_interval:g}s when idle")
         
+        await asyncio.to_thread(self.load_cursors)
+        print(f"   Resuming at: {self.next_sequence}")
         self.running = True
+        self.stopped.clear()
         
         # Start polling tasks for each event type
-        tasks = [
-            self.poll_events('project_created', poll_interval),
-            self.poll_events('project_updated', poll_interval),
-            self.poll_events('project_deleted', poll_interval),
-            self.poll_events('credits_transferred', poll_interval),
-        ]
+        tasks = [self.poll_events(event_type) for event_type in EVENT_TYPES]
         
         await asyncio.gather(*tasks)
     
@@ -147,53 +446,172 @@ class AptosEventListener:
         """Stop listening for events"""
         print("🛑 Stopping event listener...")
         self.running = False
+        self.stopped.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cursor position, lag (head - processed) and throughput per event type"""
+        stats = {}
+        for event_type, metrics in self.metrics.items():
+            next_sequence = self.next_sequence.get(event_type)
+            head = metrics["head"]
+            stats[event_type] = {
+                **metrics,
+                "next_sequence": next_sequence,
+                "lag": max(0, head - next_sequence) if head is not None and next_sequence is not None else None,
+            }
+        stats["rate_limit_wait_seconds"] = round(self.rate_limiter.waited, 3)
+        return stats
 
 
-# Example event handlers
-async def handle_project_created(event_data: Dict):
-    """Handle project created event"""
-    data = event_data['data']
-    print(f"✅ New project created:")
-    print(f"   ID: {data.get('project_id')}")
-    print(f"   Owner: {data.get('owner')}")
-    print(f"   Name: {data.get('name')}")
-    print(f"   Credits: {data.get('carbon_credits', 0) / 100} tons")
-    
-    # Here you can:
-    # - Save to database
-    # - Send notifications
-    # - Update analytics
-    # - Trigger other actions
+# Default projectors (run inside the page transaction)
+REGISTRY_PROJECT_ID = re.compile(r"^MANGROVE-(\d+)$")  # ids assigned by /api/blockchain/deploy
 
+# Credit amounts on chain are tons * 100
+CREDIT_SCALE = 100
+DEFAULT_UNIT_PRICE = 45.0
 
-async def handle_project_updated(event_data: Dict):
-    """Handle project updated event"""
-    data = event_data['data']
-    print(f"📝 Project updated:")
-    print(f"   ID: {data.get('project_id')}")
-    print(f"   Field: {data.get('field_updated')}")
+
+def _event_time(event_data: Dict) -> datetime:
+    timestamp = event_data['data'].get('timestamp')
+    return datetime.utcfromtimestamp(int(timestamp)) if timestamp else datetime.utcnow()
+
+
+def _find_project(db, chain_project_id: str) -> Optional[Project]:
+    """Local project registered on chain under chain_project_id"""
+    project = db.query(Project).filter(Project.chain_project_id == chain_project_id).first()
+    if project is None:
+        # Projects deployed before chain ids were stored locally
+        match = REGISTRY_PROJECT_ID.match(chain_project_id)
+        if match:
+            project = db.get(Project, int(match.group(1)))
+            if project is not None and project.chain_project_id is None:
+                project.chain_project_id = chain_project_id
+    return project
+
+
+def _record_transaction(db, project: Project, event_data: Dict, transaction_type: str):
+    """
+    Mark the transaction that emitted an event as confirmed
     
-    # Update database, cache, etc.
+    The events API reports the ledger version but not the hash: a row the
+    transaction tracker already confirmed is matched by version, then the
+    oldest pending row of the same kind for the project, otherwise one is
+    recorded under a version-based key.
+    """
+    version = event_data['version']
+    if version is None:
+        return
+    transaction = db.query(BlockchainTransaction).filter(BlockchainTransaction.block_number == version).first()
+    if transaction is None:
+        transaction = (
+            db.query(BlockchainTransaction)
+            .filter(
+                BlockchainTransaction.project_id == project.id,
+                BlockchainTransaction.transaction_type == transaction_type,
+                BlockchainTransaction.status == "pending"
+            )
+            .order_by(BlockchainTransaction.id)
+            .first()
+        )
+        if transaction is not None:
+            transaction.block_number = version
+    if transaction is None:
+        db.add(BlockchainTransaction(
+            project_id=project.id,
+            transaction_hash=f"version:{version}",
+            contract_address=project.blockchain_address,
+            block_number=version,
+            transaction_type=transaction_type,
+            status="confirmed"
+        ))
+    else:
+        transaction.status = "confirmed"
 
 
-async def handle_project_deleted(event_data: Dict):
-    """Handle project deleted event"""
+def handle_project_created(db, event_data: Dict):
+    """Upsert the project and its credit record"""
     data = event_data['data']
-    print(f"🗑️  Project deleted:")
-    print(f"   ID: {data.get('project_id')}")
+    chain_project_id = str(data['project_id'])
+    credits = int(data.get('carbon_credits', 0)) / CREDIT_SCALE
+    created_at = _event_time(event_data)
+    
+    project = _find_project(db, chain_project_id)
+    if project is None:
+        # Registered on chain by someone else: keep a local record of it
+        project = Project(
+            chain_project_id=chain_project_id,
+            project_type="blue_carbon",
+            location=data.get('location') or data.get('name') or chain_project_id,
+            area=int(data.get('area', 0)) / 100,
+            start_date=created_at,
+            end_date=created_at,
+            description=data.get('name') or "",
+            estimated_carbon_credits=credits,
+            blockchain_address=data.get('owner'),
+            status="blockchain_registered"
+        )
+        db.add(project)
+        db.flush()
+    elif project.status in ("draft", "verified"):
+        project.status = "blockchain_registered"
     
-    # Mark as deleted in database
+    if db.query(CarbonCredit).filter(CarbonCredit.project_id == project.id).first() is None:
+        db.add(CarbonCredit(
+            project_id=project.id,
+            total_credits=credits,
+            available_credits=credits,
+            retired_credits=0.0,
+            unit_price=DEFAULT_UNIT_PRICE,
+            total_value=credits * DEFAULT_UNIT_PRICE,
+            vintage_year=created_at.year,
+            registry="Blue Carbon Network",
+            status="active"
+        ))
+    
+    _record_transaction(db, project, event_data, "contract_deployment")
+
+
+def handle_project_updated(db, event_data: Dict):
+    """Touch the project so readers see it changed"""
+    project = _find_project(db, str(event_data['data']['project_id']))
+    if project is None:
+        raise ProjectNotFound(f"Unknown project {event_data['data']['project_id']}")
+    project.updated_at = _event_time(event_data)
+    _record_transaction(db, project, event_data, "project_update")
 
 
-async def handle_credits_transferred(event_data: Dict):
-    """Handle credits transferred event"""
+def handle_project_deleted(db, event_data: Dict):
+    """Mark the project as deleted"""
+    project = _find_project(db, str(event_data['data']['project_id']))
+    if project is None:
+        # Not created locally yet: dropping the delete would let the later
+        # project_created event bring the project back
+        raise ProjectNotFound(f"Unknown project {event_data['data']['project_id']}")
+    project.status = "deleted"
+    _record_transaction(db, project, event_data, "project_deletion")
+
+
+def handle_credits_transferred(db, event_data: Dict):
+    """Record the transfer against the project's credits"""
     data = event_data['data']
-    print(f"💸 Credits transferred:")
-    print(f"   From: {data.get('from')}")
-    print(f"   To: {data.get('to')}")
-    print(f"   Amount: {data.get('amount', 0) / 100} tons")
+    project = _find_project(db, str(data['project_id']))
+    if project is None:
+        raise ProjectNotFound(f"Unknown project {data['project_id']}")
     
-    # Update balances, notify users, etc.
+    credit = db.query(CarbonCredit).filter(CarbonCredit.project_id == project.id).first()
+    if credit is not None and data.get('from') == project.blockchain_address:
+        # Credits leaving the project owner are no longer available to list
+        amount = int(data.get('amount', 0)) / CREDIT_SCALE
+        credit.available_credits = max(0.0, credit.available_credits - amount)
+    _record_transaction(db, project, event_data, "credit_transfer")
+
+
+# Default handlers (run after the page is committed)
+async def invalidate_project_state(event_data: Dict):
+    """Drop cached on-chain state of the project an event changed"""
+    project_id = event_data['data'].get('project_id')
+    if project_id is not None:
+        get_project_state_cache().invalidate(str(project_id))
 
 
 # Global listener instance
@@ -205,11 +623,16 @@ def get_event_listener() -> AptosEventListener:
     if listener is None:
         listener = AptosEventListener()
         
-        # Register default handlers
-        listener.register_handler('project_created', handle_project_created)
-        listener.register_handler('project_updated', handle_project_updated)
-        listener.register_handler('project_deleted', handle_project_deleted)
-        listener.register_handler('credits_transferred', handle_credits_transferred)
+        # Register default projectors
+        listener.register_projector('project_created', handle_project_created)
+        listener.register_projector('project_updated', handle_project_updated)
+        listener.register_projector('project_deleted', handle_project_deleted)
+        listener.register_projector('credits_transferred', handle_credits_transferred)
+        
+        # Keep cached on-chain project state in step with the chain
+        listener.register_handler('project_updated', invalidate_project_state)
+        listener.register_handler('project_deleted', invalidate_project_state)
+        listener.register_handler('credits_transferred', invalidate_project_state)
     
     return listener
 
@@ -222,7 +645,7 @@ if __name__ == "__main__":
     listener = get_event_listener()
     
     try:
-        asyncio.run(listener.start(poll_interval=5))
+        asyncio.run(listener.start())
     except KeyboardInterrupt:
         print("\n👋 Shutting down...")
         listener.stop()
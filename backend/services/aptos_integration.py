@@ -1,31 +1,114 @@
 """
 Real Aptos blockchain integration using aptos-sdk
 """
-from aptos_sdk.client import RestClient, FaucetClient
 from aptos_sdk.account import Account
-from aptos_sdk.transactions import EntryFunction, TransactionArgument, TransactionPayload
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.authenticator import Authenticator, Ed25519Authenticator
+from aptos_sdk.transactions import EntryFunction, TransactionArgument, TransactionPayload, RawTransaction, SignedTransaction
 from aptos_sdk.type_tag import TypeTag, StructTag
 from aptos_sdk.bcs import Serializer
+import asyncio
+import httpx
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from .aptos_rpc import get_aptos_rpc
+from .aptos_sequence import SequenceNumberManager
+from .aptos_batcher import TransactionBatcher
+from .project_state_cache import get_project_state_cache
+
 
 class AptosBlockchainService:
     """Service for interacting with Aptos blockchain"""
     
     def __init__(self):
-        # Use testnet by default
-        self.node_url = os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
         self.faucet_url = os.getenv("APTOS_FAUCET_URL", "https://faucet.testnet.aptoslabs.com")
         
-        self.client = RestClient(self.node_url)
-        self.faucet_client = FaucetClient(self.faucet_url, self.client)
+        # All node traffic goes through the shared, multi-node RPC client
+        self.rpc = get_aptos_rpc()
+        self.confirmation_timeout = float(os.getenv("APTOS_CONFIRMATION_TIMEOUT", "60"))
+        
+        # Transaction settings (aptos-sdk defaults)
+        self.max_gas_amount = int(os.getenv("APTOS_MAX_GAS_AMOUNT", "100000"))
+        self.gas_unit_price = int(os.getenv("APTOS_GAS_UNIT_PRICE", "100"))
+        self.expiration_ttl = int(os.getenv("APTOS_TX_EXPIRATION_TTL", "600"))
         
         # Load or create account
         self.account = self._load_or_create_account()
         self.module_address = self.account.address()
         
+        # Sequence numbers are allocated locally so submissions from the
+        # registry account can be in flight concurrently
+        self.sequence_numbers = SequenceNumberManager(
+            self._fetch_sequence_number,
+            max_in_flight=int(os.getenv("APTOS_MAX_IN_FLIGHT", "100")),
+            expiration_ttl=self.expiration_ttl
+        )
+        
+        # Calls arriving within a short window are submitted together
+        self.batcher = TransactionBatcher(self.sequence_numbers, self._submit_signed)
+        
+        # On-chain project state, invalidated by listener events and local writes
+        self.project_cache = get_project_state_cache()
+    
+    async def _fetch_sequence_number(self) -> int:
+        """Current on-chain sequence number of the registry account"""
+        return await self.rpc.account_sequence_number(self.account.address())
+    
+    async def _submit_signed(self, payload: EntryFunction, sequence_number: int) -> str:
+        """Sign an entry function call with a sequence number reserved by the batcher and submit it"""
+        raw_txn = RawTransaction(
+            self.account.address(),
+            sequence_number,
+            TransactionPayload(payload),
+            self.max_gas_amount,
+            self.gas_unit_price,
+            int(time.time()) + self.expiration_ttl,
+            await self.rpc.chain_id()
+        )
+        signature = self.account.sign(raw_txn.keyed())
+        authenticator = Authenticator(Ed25519Authenticator(self.account.public_key(), signature))
+        return await self.rpc.submit_bcs_transaction(SignedTransaction(raw_txn, authenticator))
+    
+    async def _submit(self, payload: EntryFunction) -> str:
+        """Submit an entry function call (via the next batch) without waiting for finality"""
+        return await self.batcher.submit(payload)
+    
+    async def _execute(self, payload: EntryFunction) -> str:
+        """Submit an entry function call and wait until it is committed"""
+        tx_hash = await self._submit(payload)
+        await self.rpc.wait_for_transaction(tx_hash, timeout=self.confirmation_timeout)
+        return tx_hash
+    
+    async def get_transaction_status(self, tx_hash: str) -> Dict[str, Any]:
+        """
+        Look up a submitted transaction
+        
+        Returns status "pending" while the transaction is not yet committed
+        (or not yet visible to the node), otherwise "confirmed" or "failed"
+        together with its version, gas used and fee.
+        """
+        try:
+            tx_info = await self.rpc.transaction_by_hash(tx_hash)
+        except Exception as e:
+            return {"transaction_hash": tx_hash, "status": "pending", "error": str(e)}
+        
+        if tx_info.get("type") == "pending_transaction":
+            return {"transaction_hash": tx_hash, "status": "pending"}
+        
+        gas_used = int(tx_info.get("gas_used", 0))
+        gas_unit_price = int(tx_info.get("gas_unit_price", 100))
+        return {
+            "transaction_hash": tx_hash,
+            "status": "confirmed" if tx_info.get("success") else "failed",
+            "block_number": int(tx_info.get("version", 0)),
+            "gas_used": gas_used,
+            "network_fee": gas_used * gas_unit_price / 100_000_000,  # Convert octas to APT
+            "vm_status": tx_info.get("vm_status"),
+        }
+    
     def _load_or_create_account(self) -> Account:
         """Load existing account or create new one"""
         private_key = os.getenv("APTOS_PRIVATE_KEY")
@@ -42,7 +125,12 @@ class AptosBlockchainService:
             
             # Fund account from faucet (testnet only)
             try:
-                self.faucet_client.fund_account(account.address(), 100_000_000)  # 1 APT
+                response = httpx.post(
+                    f"{self.faucet_url}/mint",
+                    params={"amount": 100_000_000, "address": str(account.address())},  # 1 APT
+                    timeout=30
+                )
+                response.raise_for_status()
                 print("Account funded from faucet")
             except Exception as e:
                 print(f"Could not fund account: {e}")
@@ -61,13 +149,7 @@ class AptosBlockchainService:
             )
             
             # Submit transaction
-            signed_txn = self.client.create_bcs_signed_transaction(
-                self.account,
-                TransactionPayload(payload)
-            )
-            
-            tx_hash = self.client.submit_bcs_transaction(signed_txn)
-            self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self._execute(payload)
             
             return {
                 "success": True,
@@ -119,26 +201,19 @@ class AptosBlockchainService:
                 ]
             )
             
-            # Submit transaction
-            signed_txn = self.client.create_bcs_signed_transaction(
-                self.account,
-                TransactionPayload(payload)
-            )
-            
-            tx_hash = self.client.submit_bcs_transaction(signed_txn)
-            self.client.wait_for_transaction(tx_hash)
-            
-            # Get transaction details
-            tx_info = self.client.account_transaction(self.account.address(), tx_hash)
+            # Submit transaction; confirmation is tracked separately
+            tx_hash = await self._submit(payload)
+            self.project_cache.invalidate(project_id)
             
             return {
                 "success": True,
+                "status": "pending",
                 "transaction_hash": tx_hash,
                 "project_id": project_id,
                 "contract_address": str(self.module_address),
-                "block_number": tx_info.get("version", 0),
-                "gas_used": tx_info.get("gas_used", 0),
-                "network_fee": int(tx_info.get("gas_used", 0)) * 100 / 1_000_000,  # Convert to APT
+                "block_number": None,
+                "gas_used": None,
+                "network_fee": None,
                 "timestamp": datetime.utcnow().isoformat()
             }
         except Exception as e:
@@ -147,6 +222,15 @@ class AptosBlockchainService:
                 "error": str(e)
             }
     
+    async def create_projects(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Register a cohort of projects
+        
+        Each item holds create_project keyword arguments; the calls share
+        batches, and every project gets its own result.
+        """
+        return await asyncio.gather(*(self.create_project(**project) for project in projects))
+    
     async def mint_geonft(
         self,
         nft_id: str,
@@ -167,24 +251,17 @@ class AptosBlockchainService:
                 ]
             )
             
-            signed_txn = self.client.create_bcs_signed_transaction(
-                self.account,
-                TransactionPayload(payload)
-            )
-            
-            tx_hash = self.client.submit_bcs_transaction(signed_txn)
-            self.client.wait_for_transaction(tx_hash)
-            
-            tx_info = self.client.account_transaction(self.account.address(), tx_hash)
+            tx_hash = await self._submit(payload)
             
             return {
                 "success": True,
+                "status": "pending",
                 "transaction_hash": tx_hash,
                 "nft_id": nft_id,
                 "project_id": project_id,
-                "block_number": tx_info.get("version", 0),
-                "gas_used": tx_info.get("gas_used", 0),
-                "network_fee": int(tx_info.get("gas_used", 0)) * 100 / 1_000_000,
+                "block_number": None,
+                "gas_used": None,
+                "network_fee": None,
                 "timestamp": datetime.utcnow().isoformat()
             }
         except Exception as e:
@@ -210,21 +287,17 @@ class AptosBlockchainService:
                 [
                     TransactionArgument(self.module_address, Serializer.struct),
                     TransactionArgument(project_id, Serializer.str),
-                    TransactionArgument(to_address, Serializer.struct),
+                    TransactionArgument(AccountAddress.from_str(to_address), Serializer.struct),
                     TransactionArgument(amount_int, Serializer.u64),
                 ]
             )
             
-            signed_txn = self.client.create_bcs_signed_transaction(
-                self.account,
-                TransactionPayload(payload)
-            )
-            
-            tx_hash = self.client.submit_bcs_transaction(signed_txn)
-            self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self._submit(payload)
+            self.project_cache.invalidate(project_id)
             
             return {
                 "success": True,
+                "status": "pending",
                 "transaction_hash": tx_hash,
                 "project_id": project_id,
                 "amount": amount,
@@ -256,16 +329,12 @@ class AptosBlockchainService:
                 ]
             )
             
-            signed_txn = self.client.create_bcs_signed_transaction(
-                self.account,
-                TransactionPayload(payload)
-            )
-            
-            tx_hash = self.client.submit_bcs_transaction(signed_txn)
-            self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self._submit(payload)
+            self.project_cache.invalidate(project_id)
             
             return {
                 "success": True,
+                "status": "pending",
                 "transaction_hash": tx_hash,
                 "project_id": project_id,
                 "amount_retired": amount
@@ -276,24 +345,26 @@ class AptosBlockchainService:
                 "error": str(e)
             }
     
-    def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+    async def _view_project(self, project_id: str) -> Any:
+        """Call the get_project view function"""
+        return await self.rpc.view(
+            f"{self.module_address}::carbon_credit::get_project",
+            [],
+            [str(self.module_address), project_id]
+        )
+    
+    async def get_projects(self, project_ids: List[str]) -> Dict[str, Optional[Any]]:
+        """Get details of many projects (cached; misses fetched concurrently)"""
+        return await self.project_cache.get_many(project_ids, self._view_project)
+    
+    async def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project details from blockchain"""
-        try:
-            # Call view function
-            result = self.client.view_function(
-                f"{self.module_address}::carbon_credit::get_project",
-                [],
-                [self.module_address, project_id]
-            )
-            return result
-        except Exception as e:
-            print(f"Error getting project: {e}")
-            return None
+        return (await self.get_projects([project_id]))[project_id]
     
-    def get_account_balance(self) -> float:
+    async def get_account_balance(self) -> float:
         """Get account APT balance"""
         try:
-            balance = self.client.account_balance(self.account.address())
+            balance = await self.rpc.account_balance(self.account.address())
             return balance / 100_000_000  # Convert to APT
         except Exception as e:
             print(f"Error getting balance: {e}")
@@ -0,0 +1,344 @@
+"""
+Shared Aptos RPC client
+One pooled HTTP client for every Aptos REST call in the backend, routed over
+a list of fullnodes by health and latency, with failover, hedged view reads
+and a TTL cache for immutable transaction lookups
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+
+class AptosRpcError(Exception):
+    """Error response from an Aptos node (status_code None: no node could be asked)"""
+    
+    def __init__(self, status_code: Optional[int], message: str, url: str = ""):
+        super().__init__(f"Aptos node returned {status_code} for {url}: {message}" if status_code is not None else message)
+        self.status_code = status_code
+        self.message = message
+    
+    @property
+    def retryable(self) -> bool:
+        """Server-side or rate-limit errors are worth trying on another node"""
+        return self.status_code is not None and (self.status_code >= 500 or self.status_code == 429)
+
+
+class NodeState:
+    """Routing state of one fullnode"""
+    
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.latency_ewma: Optional[float] = None  # seconds
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.failures = 0
+    
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+    
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+    
+    def record_failure(self, cooldown: float):
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        # Back off exponentially while the node keeps failing
+        self.unhealthy_until = time.monotonic() + min(cooldown * 2 ** (self.consecutive_failures - 1), 300)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class AptosRpcClient:
+    """Pooled, multi-node Aptos REST client"""
+    
+    def __init__(
+        self,
+        node_urls: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if node_urls is None:
+            urls = os.getenv("APTOS_NODE_URLS") or os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
+            node_urls = [url.strip() for url in urls.split(",") if url.strip()]
+        self.nodes = [NodeState(url) for url in node_urls]
+        
+        self.timeout = timeout or float(os.getenv("APTOS_CALL_TIMEOUT", "30"))
+        self.hedge_delay = hedge_delay if hedge_delay is not None else float(os.getenv("APTOS_HEDGE_DELAY_MS", "150")) / 1000
+        self.failure_cooldown = float(os.getenv("APTOS_NODE_COOLDOWN", "5"))
+        self.max_connections = int(os.getenv("APTOS_MAX_CONNECTIONS", "50"))
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._chain_id: Optional[int] = None
+        
+        # Committed transactions never change: cache them by hash
+        self.tx_cache: "OrderedDict[str, tuple]" = OrderedDict()  # hash -> (expires_at, transaction)
+        self.tx_cache_ttl = float(os.getenv("APTOS_TX_CACHE_TTL", "3600"))
+        self.tx_cache_entries = int(os.getenv("APTOS_TX_CACHE_ENTRIES", "10000"))
+        
+        self.metrics = {
+            "requests": 0,
+            "failovers": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "tx_cache_hits": 0,
+            "tx_cache_misses": 0,
+        }
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    # ==================== ROUTING ====================
+    
+    def _ranked_nodes(self) -> List[NodeState]:
+        """Healthy nodes by latency first; unhealthy ones only as a last resort"""
+        def latency(node: NodeState) -> float:
+            return node.latency_ewma if node.latency_ewma is not None else 0.0
+        healthy = sorted((node for node in self.nodes if node.healthy), key=latency)
+        unhealthy = sorted((node for node in self.nodes if not node.healthy), key=lambda node: node.unhealthy_until)
+        return healthy + unhealthy
+    
+    async def _send(self, node: NodeState, method: str, path: str, **kwargs) -> Any:
+        """One request to one node, recording its health"""
+        url = node.url + path
+        self.metrics["requests"] += 1
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            node.record_failure(self.failure_cooldown)
+            raise
+        
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            error = AptosRpcError(response.status_code, message, url)
+            if error.retryable:
+                node.record_failure(self.failure_cooldown)
+            else:
+                node.record_success(time.perf_counter() - start)
+            raise error
+        
+        node.record_success(time.perf_counter() - start)
+        return response.json()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        """Send to the best node, failing over on connection and server errors"""
+        last_error: Optional[Exception] = None
+        for attempt, node in enumerate(self._ranked_nodes()):
+            if attempt:
+                self.metrics["failovers"] += 1
+            try:
+                return await self._send(node, method, path, **kwargs)
+            except AptosRpcError as e:
+                if not e.retryable:
+                    raise
+                last_error = e
+            except httpx.HTTPError as e:
+                last_error = e
+        if last_error is None:
+            raise AptosRpcError(None, "no nodes configured")
+        raise last_error
+    
+    async def _hedged_request(self, method: str, path: str, **kwargs) -> Any:
+        """
+        Read from the best node, and from the next one too if the first has
+        not answered within hedge_delay; the first good answer wins
+        """
+        nodes = self._ranked_nodes()
+        if len(nodes) < 2 or not self.hedge_delay:
+            return await self._request(method, path, **kwargs)
+        
+        primary = asyncio.create_task(self._send(nodes[0], method, path, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done and (primary.exception() is None or not self._retryable(primary.exception())):
+            return primary.result()
+        
+        self.metrics["hedged"] += 1
+        pending = {primary} if not done else set()
+        hedge = asyncio.create_task(self._send(nodes[1], method, path, **kwargs))
+        pending.add(hedge)
+        remaining = nodes[2:]
+        last_error = primary.exception() if done else None
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            self.metrics["hedge_wins"] += 1
+                        return task.result()
+                    if not self._retryable(error):
+                        raise error
+                    last_error = error
+                if not pending and remaining:
+                    self.metrics["failovers"] += 1
+                    pending.add(asyncio.create_task(self._send(remaining.pop(0), method, path, **kwargs)))
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _retryable(error: BaseException) -> bool:
+        return isinstance(error, httpx.HTTPError) or (isinstance(error, AptosRpcError) and error.retryable)
+    
+    # ==================== READS ====================
+    
+    async def chain_id(self) -> int:
+        """Chain id of the network (cached)"""
+        if self._chain_id is None:
+            info = await self._request("GET", "/")
+            self._chain_id = int(info["chain_id"])
+        return self._chain_id
+    
+    async def account_sequence_number(self, address) -> int:
+        """Current sequence number of an account"""
+        account = await self._request("GET", f"/accounts/{address}")
+        return int(account["sequence_number"])
+    
+    async def account_balance(self, address) -> int:
+        """APT balance of an account in octas"""
+        resource = await self._hedged_request(
+            "GET", f"/accounts/{address}/resource/0x1::coin::CoinStore<0x1::aptos_coin::AptosCoin>"
+        )
+        return int(resource["data"]["coin"]["value"])
+    
+    async def account_resource(self, address, resource_type: str) -> Dict[str, Any]:
+        """A resource stored under an account"""
+        return await self._request("GET", f"/accounts/{address}/resource/{resource_type}")
+    
+    async def view(self, function: str, type_arguments: List[str], arguments: List[Any]) -> Any:
+        """Call a view function (hedged)"""
+        return await self._hedged_request(
+            "POST",
+            "/view",
+            json={"function": function, "type_arguments": type_arguments, "arguments": arguments},
+        )
+    
+    async def transaction_by_hash(self, tx_hash: str) -> Dict[str, Any]:
+        """Look up a transaction; committed transactions are served from the TTL cache"""
+        entry = self.tx_cache.get(tx_hash)
+        if entry is not None:
+            expires_at, transaction = entry
+            if expires_at >= time.monotonic():
+                self.tx_cache.move_to_end(tx_hash)
+                self.metrics["tx_cache_hits"] += 1
+                return transaction
+            del self.tx_cache[tx_hash]
+        self.metrics["tx_cache_misses"] += 1
+        
+        transaction = await self._hedged_request("GET", f"/transactions/by_hash/{tx_hash}")
+        if transaction.get("type") != "pending_transaction":
+            self.tx_cache[tx_hash] = (time.monotonic() + self.tx_cache_ttl, transaction)
+            while len(self.tx_cache) > self.tx_cache_entries:
+                self.tx_cache.popitem(last=False)
+        return transaction
+    
+    async def get_events_by_event_handle(
+        self,
+        address,
+        event_handle: str,
+        field_name: str,
+        start: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Events emitted through an event handle field of a resource"""
+        params = {}
+        if start is not None:
+            params["start"] = start
+        if limit is not None:
+            params["limit"] = limit
+        return await self._request("GET", f"/accounts/{address}/events/{event_handle}/{field_name}", params=params)
+    
+    # ==================== WRITES ====================
+    
+    async def submit_bcs_transaction(self, signed_transaction) -> str:
+        """Submit a BCS-encoded signed transaction, returning its hash"""
+        result = await self._request(
+            "POST",
+            "/transactions",
+            content=signed_transaction.bytes(),
+            headers={"Content-Type": "application/x.aptos.signed_transaction+bcs"},
+        )
+        return result["hash"]
+    
+    async def wait_for_transaction(self, tx_hash: str, timeout: float = 60, poll_interval: float = 0.5) -> Dict[str, Any]:
+        """Wait until a transaction is committed; raises if it failed"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                transaction = await self.transaction_by_hash(tx_hash)
+                if transaction.get("type") != "pending_transaction":
+                    if not transaction.get("success"):
+                        raise RuntimeError(f"Transaction {tx_hash} failed: {transaction.get('vm_status')}")
+                    return transaction
+            except AptosRpcError as e:
+                if e.status_code != 404:  # not yet visible to this node
+                    raise
+            if time.monotonic() >= deadline:
+                raise asyncio.TimeoutError(f"Transaction {tx_hash} not committed after {timeout:.0f}s")
+            await asyncio.sleep(poll_interval)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Routing, hedging and cache counters"""
+        return {
+            **self.metrics,
+            "tx_cache_entries": len(self.tx_cache),
+            "nodes": [node.as_dict() for node in self.nodes],
+        }
+
+
+# Global instance
+_aptos_rpc = None
+
+def get_aptos_rpc() -> AptosRpcClient:
+    """Get or create the shared Aptos RPC client"""
+    global _aptos_rpc
+    if _aptos_rpc is None:
+        _aptos_rpc = AptosRpcClient()
+    return _aptos_rpc
+
+
+async def close_aptos_rpc():
+    """Close the shared Aptos RPC client"""
+    if _aptos_rpc is not None:
+        await _aptos_rpc.close()
@@ -0,0 +1,181 @@
+"""
+Sequence number allocation for the Aptos registry account
+Hands out sequence numbers locally so many transactions from the same
+account can be signed and submitted at once instead of one at a time
+"""
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+
+import httpx
+
+from .aptos_rpc import AptosRpcError
+
+# Node errors meaning our local view of the sequence number is wrong
+RESYNC_ERRORS = ("SEQUENCE_NUMBER_TOO_OLD", "SEQUENCE_NUMBER_TOO_NEW", "INVALID_SEQ_NUMBER")
+
+
+def outcome_unknown(error: BaseException) -> bool:
+    """Whether a failed submission may still have reached a node's mempool"""
+    if isinstance(error, AptosRpcError):
+        # 4xx is a definite rejection; a server error or rate limit after
+        # failover says nothing about the nodes tried before
+        return error.retryable
+    # Timeouts and transport errors (the request may have been sent)
+    return isinstance(error, (asyncio.TimeoutError, httpx.HTTPError))
+
+
+class SequenceNumberManager:
+    """
+    In-process sequence number allocator for one account
+    
+    reserve() hands out numbers atomically. Every reservation must end in
+    submitted() or failed(). A number whose submission was definitely
+    rejected is recycled so later, already accepted transactions are not
+    left parked behind a gap. Errors that mean the local counter is wrong
+    (or a submission with an unknown outcome) trigger a resync with the
+    chain once the submissions in flight have returned. The resync recycles
+    every number between the chain's sequence number and the local counter
+    that cannot be waiting in a mempool: rejected (e.g. SEQUENCE_NUMBER_TOO_NEW),
+    or accepted / of unknown outcome but expired since.
+    """
+    
+    def __init__(
+        self,
+        fetch_sequence_number: Callable[[], Awaitable[int]],
+        max_in_flight: int = 100,
+        expiration_ttl: float = 600
+    ):
+        self.fetch_sequence_number = fetch_sequence_number
+        self.max_in_flight = max_in_flight
+        self.expiration_ttl = expiration_ttl
+        
+        self.lock = asyncio.Lock()
+        self.idle = asyncio.Condition(self.lock)
+        self.next_number: Optional[int] = None  # fetched lazily
+        self.free: list = []  # heap of recycled numbers
+        self.in_flight: set = set()
+        self.unknown: Dict[int, float] = {}  # number with unknown outcome -> expiry time
+        # Accepted numbers that may still be in a mempool -> expiry time (in expiry order)
+        self.accepted: "OrderedDict[int, float]" = OrderedDict()
+        self.needs_resync = False
+        self.last_submitted_at = 0.0
+        
+        self.metrics = {
+            "reserved": 0,
+            "submitted": 0,
+            "recycled": 0,
+            "resyncs": 0,
+        }
+    
+    async def _resync(self):
+        """Re-read the account sequence number (caller holds the lock, nothing in flight)"""
+        chain_number = await self.fetch_sequence_number()
+        self.metrics["resyncs"] += 1
+        
+        if self.next_number is None or chain_number > self.next_number:
+            # First use, or another signer used the account
+            self.next_number = chain_number
+        elif chain_number < self.next_number and time.time() - self.last_submitted_at > self.expiration_ttl:
+            # Everything we submitted has expired without committing past chain_number
+            self.next_number = chain_number
+        
+        self.free = [number for number in self.free if number >= chain_number]
+        now = time.time()
+        self._expire_accepted(now)
+        for tracked in (self.accepted, self.unknown):
+            for number, expires_at in list(tracked.items()):
+                if number < chain_number or expires_at <= now:
+                    del tracked[number]  # committed, or expired without committing
+        
+        # Anything else below the counter is not in any mempool: a gap the
+        # chain would wait on forever, so hand it out again
+        pending = set(self.free) | self.in_flight | self.accepted.keys() | self.unknown.keys()
+        for number in range(chain_number, self.next_number):
+            if number not in pending:
+                self.free.append(number)
+                self.metrics["recycled"] += 1
+        heapq.heapify(self.free)
+        self.needs_resync = False
+    
+    def _expire_accepted(self, now: float):
+        while self.accepted and next(iter(self.accepted.values())) <= now:
+            self.accepted.popitem(last=False)
+    
+    async def reserve(self) -> int:
+        """Reserve the next sequence number"""
+        return (await self.reserve_many(1))[0]
+    
+    async def reserve_many(self, count: int) -> List[int]:
+        """Reserve count sequence numbers in one step (recycled numbers first, then contiguous)"""
+        if count > self.max_in_flight:
+            raise ValueError(f"Cannot reserve {count} sequence numbers, at most {self.max_in_flight} may be in flight")
+        async with self.idle:
+            # Resync only once in-flight submissions have returned, and cap
+            # the number of concurrent submissions
+            await self.idle.wait_for(
+                lambda: not (self.needs_resync and self.in_flight) and len(self.in_flight) + count <= self.max_in_flight
+            )
+            if self.next_number is None or self.needs_resync:
+                await self._resync()
+            
+            numbers = []
+            while self.free and len(numbers) < count:
+                numbers.append(heapq.heappop(self.free))
+            while len(numbers) < count:
+                numbers.append(self.next_number)
+                self.next_number += 1
+            self.in_flight.update(numbers)
+            self.metrics["reserved"] += count
+            return numbers
+    
+    async def submitted(self, number: int):
+        """The node accepted the transaction with this number"""
+        async with self.idle:
+            self.in_flight.discard(number)
+            self.last_submitted_at = time.time()
+            self._expire_accepted(self.last_submitted_at)
+            self.accepted[number] = self.last_submitted_at + self.expiration_ttl
+            self.metrics["submitted"] += 1
+            self.idle.notify_all()
+    
+    async def failed(self, number: int, error: Exception):
+        """Submission with this number failed"""
+        async with self.idle:
+            self.in_flight.discard(number)
+            if outcome_unknown(error):
+                # The node may or may not have taken it: find out from the
+                # chain, and look again once it would have expired
+                self.unknown[number] = time.time() + self.expiration_ttl
+                self.last_submitted_at = time.time()
+                self.needs_resync = True
+                asyncio.get_running_loop().call_later(
+                    self.expiration_ttl + 1, lambda: asyncio.ensure_future(self.resync())
+                )
+            elif any(code in str(error) for code in RESYNC_ERRORS):
+                # The counter is off; the number was not taken, so the
+                # resync recycles it if the chain still needs it
+                self.needs_resync = True
+            else:
+                # Rejected outright: reuse the number to fill the gap
+                heapq.heappush(self.free, number)
+                self.metrics["recycled"] += 1
+            self.idle.notify_all()
+    
+    async def resync(self):
+        """Force a resync with the chain before the next reservation"""
+        async with self.idle:
+            self.needs_resync = True
+            self.idle.notify_all()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Allocator counters"""
+        return {
+            **self.metrics,
+            "next_sequence_number": self.next_number,
+            "in_flight": len(self.in_flight),
+            "recycled_pending": len(self.free),
+            "unknown_outcome": len(self.unknown),
+        }
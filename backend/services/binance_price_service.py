@@ -2,31 +2,165 @@
 Binance API Integration for Real-Time Carbon Credit Pricing
 Uses Binance API to get cryptocurrency prices and apply to carbon credits
 """
-import requests
+import httpx
 import asyncio
-from typing import Dict, Any, Optional
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime
 import os
 
+from .binance_stream import BinanceTickerStream, WEBSOCKETS_AVAILABLE
+
+# Symbols used to derive the carbon market data
+DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "APTUSDT"]
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Immutable carbon market data published by the price updater"""
+    version: int
+    data: Dict[str, Any]
+    published_at: float  # time.monotonic() at publication
+    fetch_stats: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was published"""
+        return time.monotonic() - self.published_at
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Copy of the market data annotated with snapshot metadata"""
+        result = dict(self.data)
+        result["snapshot_version"] = self.version
+        result["snapshot_age_seconds"] = round(self.age, 3)
+        return result
+
+
 class BinancePriceService:
     """Service to fetch real-time prices from Binance and calculate carbon credit values"""
     
-    def __init__(self):
-        self.base_url = "https://api.binance.com/api/v3"
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+    ):
+        self.base_url = base_url or os.getenv("BINANCE_API_URL", "https://api.binance.com/api/v3")
         self.base_carbon_price = 45.0  # Base price in USD
         self.price_cache = {}
+        self.ticker_cache: Dict[str, Dict[str, Any]] = {}  # symbol -> 24h stats
         self.last_update = None
         
+        # HTTP client settings (all requests go to a single host, so the
+        # connection limits are effectively per-host limits)
+        self.timeout = timeout or float(os.getenv("BINANCE_TIMEOUT", "5"))
+        self.max_connections = max_connections or int(os.getenv("BINANCE_MAX_CONNECTIONS", "10"))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("BINANCE_MAX_KEEPALIVE_CONNECTIONS", "5")
+        )
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("BINANCE_KEEPALIVE_EXPIRY", "30"))
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Latest published market snapshot (replaced atomically, never mutated)
+        self.snapshot: Optional[MarketSnapshot] = None
+        self.max_snapshot_age = float(os.getenv("MARKET_SNAPSHOT_MAX_AGE", "5"))
+        self._refresh_lock = asyncio.Lock()
+        self.snapshot_listeners: List[Callable[[MarketSnapshot], None]] = []
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+    
+    async def poll_snapshots(self, interval: float, duration: Optional[float] = None):
+        """Refresh the snapshot over REST every interval seconds (forever, or for duration seconds)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration if duration is not None else None
+        
+        while deadline is None or loop.time() < deadline:
+            try:
+                snapshot = await self.refresh_snapshot()
+                stats = snapshot.fetch_stats
+                print(
+                    f"✅ Prices updated at {datetime.utcnow().isoformat()} (snapshot v{snapshot.version}, "
+                    f"{stats.get('requests', 0)} req, {stats.get('bytes', 0)} bytes, "
+                    f"parse {stats.get('parse_ms', 0.0):.2f} ms)"
+                )
+            except Exception as e:
+                print(f"❌ Price update failed: {e}")
+            
+            sleep_for = interval if deadline is None else max(0.0, min(interval, deadline - loop.time()))
+            await asyncio.sleep(sleep_for)
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        fetch_stats: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Perform a GET request on the shared client and decode the JSON body
+        
+        If fetch_stats is given, request count, bytes received and JSON parse
+        time are accumulated into it.
+        """
+        response = await self.client.get(path, params=params)
+        response.raise_for_status()
+        
+        parse_start = time.perf_counter()
+        data = response.json()
+        parse_ms = (time.perf_counter() - parse_start) * 1000
+        
+        if fetch_stats is not None:
+            fetch_stats["requests"] = fetch_stats.get("requests", 0) + 1
+            fetch_stats["bytes"] = fetch_stats.get("bytes", 0) + len(response.content)
+            fetch_stats["parse_ms"] = round(fetch_stats.get("parse_ms", 0.0) + parse_ms, 3)
+        
+        return data
+    
+    @staticmethod
+    def _symbols_param(symbols: list) -> str:
+        """Encode a symbol list the way Binance expects: ["A","B"] without spaces"""
+        return json.dumps(list(symbols), separators=(",", ":"))
+    
+    @staticmethod
+    def _format_ticker_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw /ticker/24hr entry into our market stats format"""
+        return {
+            "symbol": data.get("symbol"),
+            "price": float(data.get("lastPrice", 0)),
+            "price_change": float(data.get("priceChange", 0)),
+            "price_change_percent": float(data.get("priceChangePercent", 0)),
+            "high_24h": float(data.get("highPrice", 0)),
+            "low_24h": float(data.get("lowPrice", 0)),
+            "volume_24h": float(data.get("volume", 0)),
+        }
+    
+    
     async def get_crypto_price(self, symbol: str = "BTCUSDT") -> Optional[float]:
         """Get current cryptocurrency price from Binance"""
         try:
-            url = f"{self.base_url}/ticker/price"
-            params = {"symbol": symbol}
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._get_json("/ticker/price", params={"symbol": symbol})
             price = float(data.get("price", 0))
             
             self.price_cache[symbol] = price
@@ -40,19 +174,16 @@ class BinancePriceService:
     async def get_multiple_prices(self, symbols: list = None) -> Dict[str, float]:
         """Get multiple cryptocurrency prices"""
         if symbols is None:
-            symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "APTUSDT"]
+            symbols = DEFAULT_SYMBOLS
         
         try:
-            url = f"{self.base_url}/ticker/price"
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            
-            all_prices = response.json()
+            # Only request the symbols we need instead of the full exchange table
+            prices = await self._get_json(
+                "/ticker/price",
+                params={"symbols": self._symbols_param(symbols)}
+            )
             
-            result = {}
-            for item in all_prices:
-                if item["symbol"] in symbols:
-                    result[item["symbol"]] = float(item["price"])
+            result = {item["symbol"]: float(item["price"]) for item in prices}
             
             self.price_cache.update(result)
             self.last_update = datetime.utcnow()
@@ -65,27 +196,45 @@ class BinancePriceService:
     async def get_market_stats(self) -> Dict[str, Any]:
         """Get 24h market statistics"""
         try:
-            url = f"{self.base_url}/ticker/24hr"
-            params = {"symbol": "BTCUSDT"}
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            return {
-                "symbol": data.get("symbol"),
-                "price": float(data.get("lastPrice", 0)),
-                "price_change": float(data.get("priceChange", 0)),
-                "price_change_percent": float(data.get("priceChangePercent", 0)),
-                "high_24h": float(data.get("highPrice", 0)),
-                "low_24h": float(data.get("lowPrice", 0)),
-                "volume_24h": float(data.get("volume", 0)),
-            }
+            data = await self._get_json("/ticker/24hr", params={"symbol": "BTCUSDT"})
+            return self._format_ticker_stats(data)
         except Exception as e:
             print(f"❌ Failed to fetch market stats: {e}")
             return {}
     
+    async def get_ticker_stats(
+        self,
+        symbols: list = None,
+        fetch_stats: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get 24h statistics and last price for several symbols in one request
+        
+        Returns a mapping of symbol to market stats. Last prices are also
+        stored in price_cache. Fetch errors are raised, so callers never
+        mistake missing data for a quiet market.
+        """
+        if symbols is None:
+            symbols = DEFAULT_SYMBOLS
+        
+        try:
+            tickers = await self._get_json(
+                "/ticker/24hr",
+                params={"symbols": self._symbols_param(symbols)},
+                fetch_stats=fetch_stats
+            )
+        except Exception as e:
+            print(f"❌ Failed to fetch ticker stats: {e}")
+            raise
+        
+        result = {item["symbol"]: self._format_ticker_stats(item) for item in tickers}
+        
+        self.ticker_cache.update(result)
+        self.price_cache.update({symbol: stats["price"] for symbol, stats in result.items()})
+        self.last_update = datetime.utcnow()
+        
+        return result
+    
     def calculate_carbon_price_with_crypto(self, crypto_price: float, crypto_change_percent: float) -> float:
         """
         Calculate carbon credit price based on REAL crypto market volatility
@@ -105,11 +254,51 @@ class BinancePriceService:
         
         return round(new_carbon_price, 2)
     
-    async def get_carbon_market_data(self) -> Dict[str, Any]:
+    def apply_stream_ticker(self, data: Dict[str, Any]) -> Optional[MarketSnapshot]:
+        """
+        Apply one 24hrTicker message from the Binance stream and publish a new snapshot
+        
+        Stream payloads use single-letter keys (s=symbol, c=last price, p/P=change,
+        h/l=high/low, v=volume); they are mapped to our market stats format.
+        Nothing is published (None) until every tracked symbol has arrived, so
+        the snapshot never mixes real prices with defaults.
+        """
+        stats = self._format_ticker_stats({
+            "symbol": data.get("s"),
+            "lastPrice": data.get("c", 0),
+            "priceChange": data.get("p", 0),
+            "priceChangePercent": data.get("P", 0),
+            "highPrice": data.get("h", 0),
+            "lowPrice": data.get("l", 0),
+            "volume": data.get("v", 0),
+        })
+        symbol = stats["symbol"]
+        self.ticker_cache[symbol] = stats
+        self.price_cache[symbol] = stats["price"]
+        self.last_update = datetime.utcnow()
+        
+        if any(tracked not in self.ticker_cache for tracked in DEFAULT_SYMBOLS):
+            return None
+        market_data = self.build_carbon_market_data(self.ticker_cache, data_source="Binance Real-Time Stream")
+        return self.publish_snapshot(market_data, {"source": "stream", "symbol": symbol})
+    
+    async def get_carbon_market_data(self, fetch_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get comprehensive carbon market data with REAL-TIME crypto influence from Binance"""
-        # Get REAL crypto prices from Binance
-        crypto_prices = await self.get_multiple_prices()
-        btc_stats = await self.get_market_stats()
+        # Get REAL crypto prices and BTC 24h stats from Binance in one round-trip
+        tickers = await self.get_ticker_stats(DEFAULT_SYMBOLS, fetch_stats=fetch_stats)
+        missing = [symbol for symbol in DEFAULT_SYMBOLS if symbol not in tickers]
+        if missing:
+            raise ValueError(f"No ticker data for {', '.join(missing)}")
+        return self.build_carbon_market_data(tickers)
+    
+    def build_carbon_market_data(
+        self,
+        tickers: Dict[str, Dict[str, Any]],
+        data_source: str = "Binance Real-Time API"
+    ) -> Dict[str, Any]:
+        """Derive carbon market data from per-symbol 24h ticker stats"""
+        btc_stats = tickers.get("BTCUSDT", {})
+        crypto_prices = {symbol: stats["price"] for symbol, stats in tickers.items()} or self.price_cache
         
         # Extract REAL market data
         btc_price = btc_stats.get("price", crypto_prices.get("BTCUSDT", 45000.0))
@@ -173,24 +362,81 @@ class BinancePriceService:
                 "bnb_price": round(crypto_prices.get("BNBUSDT", 0), 2),
                 "apt_price": round(crypto_prices.get("APTUSDT", 0), 4),
             },
-            "data_source": "Binance Real-Time API",
+            "data_source": data_source,
             "last_updated": datetime.utcnow().isoformat(),
         }
     
+    def add_snapshot_listener(self, listener: Callable[[MarketSnapshot], None]):
+        """Register a callback invoked with every newly published snapshot"""
+        self.snapshot_listeners.append(listener)
+    
+    def publish_snapshot(
+        self,
+        market_data: Dict[str, Any],
+        fetch_stats: Optional[Dict[str, Any]] = None
+    ) -> MarketSnapshot:
+        """Publish freshly computed market data as the new snapshot"""
+        version = self.snapshot.version + 1 if self.snapshot else 1
+        self.snapshot = MarketSnapshot(
+            version=version,
+            data=market_data,
+            published_at=time.monotonic(),
+            fetch_stats=fetch_stats or {},
+        )
+        
+        for listener in self.snapshot_listeners:
+            try:
+                listener(self.snapshot)
+            except Exception as e:
+                print(f"❌ Snapshot listener error: {e}")
+        
+        return self.snapshot
+    
+    async def refresh_snapshot(self) -> MarketSnapshot:
+        """Fetch market data from Binance and publish it as a snapshot (raises if the fetch fails)"""
+        fetch_stats = {"requests": 0, "bytes": 0, "parse_ms": 0.0}
+        market_data = await self.get_carbon_market_data(fetch_stats=fetch_stats)
+        return self.publish_snapshot(market_data, fetch_stats)
+    
+    async def get_snapshot(self, max_age: Optional[float] = None) -> MarketSnapshot:
+        """
+        Get the latest market snapshot without touching the network when possible
+        
+        Snapshots younger than max_age are returned as-is. Older (or missing)
+        snapshots trigger a single shared refresh; if that refresh fails the
+        stale snapshot (with its original age) is served rather than failing
+        the request.
+        """
+        if max_age is None:
+            max_age = self.max_snapshot_age
+        
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.age <= max_age:
+            return snapshot
+        
+        async with self._refresh_lock:
+            # Another request may have refreshed while we were waiting
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.age <= max_age:
+                return snapshot
+            try:
+                return await self.refresh_snapshot()
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                print(f"⚠️  Serving stale market snapshot v{snapshot.version}: {e}")
+                return snapshot
+    
     async def get_price_history(self, symbol: str = "BTCUSDT", interval: str = "1h", limit: int = 24) -> list:
         """Get historical price data (klines)"""
         try:
-            url = f"{self.base_url}/klines"
             params = {
                 "symbol": symbol,
                 "interval": interval,
                 "limit": limit
             }
             
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._get_json("/klines", params=params)
             
             # Format data
             history = []
@@ -211,7 +457,7 @@ class BinancePriceService:
     
     async def calculate_portfolio_value(self, carbon_credits: float) -> Dict[str, Any]:
         """Calculate portfolio value with real-time pricing"""
-        market_data = await self.get_carbon_market_data()
+        market_data = (await self.get_snapshot()).as_dict()
         current_price = market_data["current_price"]
         
         total_value = carbon_credits * current_price
@@ -238,22 +484,35 @@ def get_price_service() -> BinancePriceService:
     return _price_service
 
 
+async def close_price_service():
+    """Release the price service's pooled HTTP connections"""
+    if _price_service is not None:
+        await _price_service.close()
+
+
 # Background price updater
-async def start_price_updater(interval: int = 60):
-    """Background task to update prices periodically"""
+async def start_price_updater(interval: int = 60, mode: Optional[str] = None, transport=None):
+    """
+    Background task to keep the market snapshot up to date
+    
+    mode "stream" (default) keeps one long-lived ticker stream connection and
+    falls back to REST polling every interval seconds while it is down;
+    mode "poll" only polls the REST API.
+    """
     service = get_price_service()
+    mode = mode or os.getenv("PRICE_INGESTION_MODE", "stream")
     
     print("🔄 Starting price updater...")
-    print(f"   Update interval: {interval}s")
     
-    while True:
-        try:
-            await service.get_carbon_market_data()
-            print(f"✅ Prices updated at {datetime.utcnow().isoformat()}")
-        except Exception as e:
-            print(f"❌ Price update failed: {e}")
-        
-        await asyncio.sleep(interval)
+    if mode == "stream" and (transport is not None or WEBSOCKETS_AVAILABLE):
+        print("   Mode: ticker stream (REST fallback)")
+        stream = BinanceTickerStream(service, DEFAULT_SYMBOLS, transport=transport, poll_interval=interval)
+        await stream.run()
+    else:
+        if mode == "stream":
+            print("⚠️  websockets not installed - falling back to REST polling")
+        print(f"   Update interval: {interval}s")
+        await service.poll_snapshots(interval)
 
 
 if __name__ == "__main__":
@@ -289,5 +548,7 @@ if __name__ == "__main__":
         portfolio = await service.calculate_portfolio_value(2.3)
         print(f"   Total Value: ${portfolio['total_value']}")
         print(f"   24h Change: ${portfolio['change_24h']} ({portfolio['change_percent']}%)")
+        
+        await service.close()
     
     asyncio.run(test())
@@ -0,0 +1,132 @@
+"""
+Binance ticker stream ingestion
+Keeps one long-lived streaming connection and feeds ticker updates into the price service
+"""
+import asyncio
+import json
+import os
+import random
+from typing import AsyncIterator, Optional
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+
+class WebSocketTransport:
+    """Default transport: Binance combined streams over WebSocket"""
+    
+    async def messages(self, url: str) -> AsyncIterator[str]:
+        """Yield raw text messages until the connection closes"""
+        async with websockets.connect(url, ping_interval=20, ping_timeout=20, close_timeout=5) as ws:
+            async for message in ws:
+                yield message
+
+
+class BinanceTickerStream:
+    """
+    Ingest 24h ticker updates from a streaming connection
+    
+    Any object with an async generator method messages(url) can be used as
+    the transport, which lets tests replace Binance with a local fake stream.
+    """
+    
+    def __init__(
+        self,
+        service,
+        symbols: list,
+        url: Optional[str] = None,
+        transport=None,
+        poll_interval: float = 1,
+        max_failures: Optional[int] = None,
+        base_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        self.service = service
+        self.symbols = symbols
+        self.url = url or os.getenv("BINANCE_STREAM_URL", "wss://stream.binance.com:9443/stream")
+        self.transport = transport or WebSocketTransport()
+        self.poll_interval = poll_interval
+        self.max_failures = max_failures or int(os.getenv("PRICE_STREAM_MAX_FAILURES", "5"))
+        self.base_backoff = base_backoff or float(os.getenv("PRICE_STREAM_BASE_BACKOFF", "1"))
+        self.max_backoff = max_backoff or float(os.getenv("PRICE_STREAM_MAX_BACKOFF", "60"))
+        
+        self.running = False
+        self.failures = 0
+        self.messages_received = 0
+    
+    @property
+    def stream_url(self) -> str:
+        """Combined stream URL for all symbols"""
+        streams = "/".join(f"{symbol.lower()}@ticker" for symbol in self.symbols)
+        return f"{self.url}?streams={streams}"
+    
+    def backoff_delay(self) -> float:
+        """Exponential backoff with equal jitter (half fixed, half random), based on consecutive failures"""
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** max(0, self.failures - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+    
+    def handle_message(self, message: str):
+        """Apply one stream message to the price service"""
+        payload = json.loads(message)
+        # Combined streams wrap the event as {"stream": ..., "data": {...}}
+        data = payload.get("data", payload)
+        if data.get("e") == "24hrTicker" and data.get("s") in self.symbols:
+            self.service.apply_stream_ticker(data)
+    
+    async def consume(self) -> int:
+        """Consume messages until the connection closes; returns the number received"""
+        received = 0
+        async for message in self.transport.messages(self.stream_url):
+            try:
+                self.handle_message(message)
+            except Exception as e:
+                print(f"❌ Bad price stream message: {e}")
+                continue
+            received += 1
+            self.messages_received += 1
+            if received == 1:
+                # The connection is healthy again
+                self.failures = 0
+            if not self.running:
+                break
+        return received
+    
+    async def run(self):
+        """Stream prices forever, reconnecting with backoff and polling REST while disconnected"""
+        self.running = True
+        # Seed every symbol from REST; the stream only sends symbols that change
+        try:
+            await self.service.refresh_snapshot()
+        except Exception as e:
+            print(f"⚠️  Initial price snapshot failed: {e}")
+        print(f"🔌 Connecting to price stream: {self.stream_url}")
+        
+        while self.running:
+            try:
+                await self.consume()
+                print("⚠️  Price stream closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Price stream error: {e}")
+            
+            if not self.running:
+                break
+            
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                # Stream looks unavailable - poll for the full backoff ceiling before retrying
+                delay = self.max_backoff
+                print(f"⚠️  Price stream unavailable, polling REST for {delay:.0f}s")
+            else:
+                delay = self.backoff_delay()
+                print(f"🔄 Reconnecting price stream in {delay:.1f}s (polling REST meanwhile)")
+            
+            await self.service.poll_snapshots(self.poll_interval, duration=delay)
+    
+    def stop(self):
+        """Stop streaming after the current message"""
+        self.running = False
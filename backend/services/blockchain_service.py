@@ -250,8 +250,20 @@ async def create_carbon_tokens(
 async def verify_transaction(transaction_hash: str) -> Dict[str, Any]:
     """
     Verify a blockchain transaction
+    Queries Aptos for real transaction hashes, mock hashes confirm immediately
     """
-    # In production, query blockchain for transaction status
+    # Real Aptos hashes are 32 bytes (0x + 64 hex characters)
+    if USE_REAL_APTOS and len(transaction_hash) == 66:
+        try:
+            aptos_service = get_aptos_service()
+            result = await aptos_service.get_transaction_status(transaction_hash)
+            result["verified"] = result["status"] == "confirmed"
+            return result
+        except Exception as e:
+            print(f"⚠️  Could not query transaction {transaction_hash}: {e}")
+            return {"transaction_hash": transaction_hash, "status": "pending", "verified": False}
+    
+    # Mock verification (fallback)
     return {
         "transaction_hash": transaction_hash,
         "status": "confirmed",
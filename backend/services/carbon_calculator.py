@@ -2,9 +2,15 @@
 Carbon credit calculation service
 Based on scientific methodologies and standards
 """
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
 import math
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 
 # Carbon sequestration rates (tons CO2 per hectare per year)
 CARBON_RATES = {
@@ -79,6 +85,97 @@ def calculate_carbon_credits(
     }
 
 
+def _round_like_python(values: "np.ndarray", ndigits: int) -> "np.ndarray":
+    """
+    Round an array exactly like Python's built-in round()
+    
+    np.round scales, rounds and unscales, which can disagree with round()
+    when the scaled value sits right at a .5 tie. Those rare elements are
+    re-rounded with round() so batch results match the scalar function.
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * (10.0 ** ndigits)
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(v), ndigits) for v in values[ties]]
+    return rounded
+
+
+def calculate_carbon_credits_batch(
+    area: Sequence[float],
+    vegetation_index: Sequence[float],
+    project_type: Sequence[str],
+    project_duration_years: Any = 1
+) -> Dict[str, "np.ndarray"]:
+    """
+    Vectorized calculate_carbon_credits over many projects at once
+    
+    Args:
+        area: Project areas in hectares
+        vegetation_index: NDVI or vegetation health index (0-1) per project
+        project_type: Type of restoration project per project
+        project_duration_years: Duration per project, or one value for all
+    
+    Returns:
+        Dictionary of columns (NumPy arrays of equal length), one per scalar
+        result field; project_metrics fields are flattened with their names.
+        Values are identical to calling calculate_carbon_credits per project.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy is required for batch carbon calculations: pip install numpy")
+    
+    area = np.asarray(area, dtype=np.float64)
+    vegetation_index = np.asarray(vegetation_index, dtype=np.float64)
+    duration = np.broadcast_to(np.asarray(project_duration_years, dtype=np.float64), area.shape)
+    
+    # Factorize project types (hash lookup, cheaper than sorting strings)
+    # so rates and categories are looked up once per distinct type
+    type_index: Dict[str, int] = {}
+    type_codes = np.fromiter(
+        (type_index.setdefault(t, len(type_index)) for t in project_type),
+        dtype=np.intp,
+        count=len(area)
+    )
+    types = list(type_index)
+    base_rate = np.array([CARBON_RATES.get(t, 2.0) for t in types], dtype=np.float64)[type_codes]
+    
+    # Same operations, in the same order, as the scalar function
+    health_multiplier = 0.5 + (vegetation_index * 0.5)
+    annual_carbon = area * base_rate * health_multiplier
+    total_carbon = annual_carbon * duration
+    soil_carbon = total_carbon * 0.4
+    biomass_carbon = total_carbon * 0.6
+    co2_equivalent = total_carbon * 3.67
+    biodiversity_score = np.minimum(100, np.trunc(vegetation_index * 100 + area * 5)).astype(np.int64)
+    
+    # Water quality impact per project type group
+    is_blue_carbon = np.array(
+        [t in ["Mangrove Restoration", "Wetland Restoration", "Coastal Restoration"] for t in types],
+        dtype=bool
+    )[type_codes]
+    is_forest = np.array([t in ["Forest Restoration", "Agroforestry"] for t in types], dtype=bool)[type_codes]
+    water_quality_impact = np.select(
+        [is_blue_carbon & (area > 1.0), is_blue_carbon, is_forest],
+        ["Highly Positive", "Positive", "Moderate"],
+        default="Low"
+    ).astype(object)
+    
+    return {
+        "total_carbon_tons": _round_like_python(total_carbon, 2),
+        "annual_carbon_tons": _round_like_python(annual_carbon, 2),
+        "co2_equivalent_tons": _round_like_python(co2_equivalent, 2),
+        "soil_carbon_tons": _round_like_python(soil_carbon, 2),
+        "biomass_carbon_tons": _round_like_python(biomass_carbon, 2),
+        "biodiversity_score": biodiversity_score,
+        "water_quality_impact": water_quality_impact,
+        "confidence_level": _round_like_python(vegetation_index * 100, 1),
+        "area_hectares": area,
+        "vegetation_health_index": vegetation_index,
+        "base_sequestration_rate": base_rate,
+        "health_multiplier": _round_like_python(health_multiplier, 2),
+    }
+
+
 def calculate_water_quality_impact(area: float, project_type: str) -> str:
     """
     Calculate water quality impact based on project
@@ -0,0 +1,251 @@
+"""
+Project dashboard service
+Builds dashboard metrics from one joined query and keeps the rendered
+response per project, with an ETag, until a row behind it changes
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import Project, CarbonCredit, Verification, BlockchainTransaction
+
+# Columns the dashboard needs, project and its (first) credit record in one row
+DASHBOARD_COLUMNS = (
+    Project.status,
+    Project.area,
+    Project.estimated_carbon_credits,
+    Project.vegetation_health,
+    Project.created_at,
+    CarbonCredit.total_credits,
+    CarbonCredit.total_value,
+)
+
+
+def dashboard_query(project_id: int):
+    return (
+        select(*DASHBOARD_COLUMNS)
+        .outerjoin(CarbonCredit, CarbonCredit.project_id == Project.id)
+        .where(Project.id == project_id)
+        .order_by(CarbonCredit.id)
+        .limit(1)
+    )
+
+
+def build_dashboard_metrics(row) -> Dict[str, Any]:
+    """Dashboard payload from a dashboard_query row"""
+    has_credits = row.total_credits is not None
+    return {
+        "project_overview": {
+            "credits_generated": row.total_credits if has_credits else 0,
+            "market_value": row.total_value if has_credits else 0,
+            "project_status": row.status,
+            "monitoring_since": row.created_at.isoformat()
+        },
+        "key_metrics": {
+            "hectares_restored": row.area,
+            "co2_sequestered": (row.estimated_carbon_credits or 0) * 1000,  # in kg
+            "community_income": row.total_value * 0.70 if has_credits else 0,
+            "biodiversity_index": 85
+        },
+        "progress": {
+            "restoration_progress": 78,
+            "carbon_sequestration": 65,
+            "community_impact": 92,
+            "biodiversity_recovery": 71
+        },
+        "environmental_health": {
+            "water_quality": "Improved",
+            "vegetation_health": row.vegetation_health or "Excellent",
+            "marine_life": "Recovering"
+        },
+        "community_benefits": {
+            "families_supported": 156,
+            "jobs_created": 12,
+            "training_programs": True,
+            "livelihood_opportunities": True,
+            "women_empowerment": True
+        }
+    }
+
+
+class DashboardCache:
+    """Rendered dashboard (body and ETag) per project, LRU with a TTL"""
+    
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "10000"))
+        # Changes made by other processes (e.g. a standalone event listener)
+        # are only picked up when the entry expires
+        self.ttl = ttl or float(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+        
+        self.lock = threading.Lock()  # commits also arrive from worker threads
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()  # project_id -> (expires_at, etag, body)
+        self.generations: Dict[int, int] = {}  # bumped on invalidation
+        self.epoch = 0  # bumped when everything is invalidated
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "invalidations": 0,
+        }
+    
+    def peek(self, project_id: int) -> Optional[Tuple[str, bytes]]:
+        """Cached (etag, body) for a project, if fresh"""
+        with self.lock:
+            return self._cached(project_id)
+    
+    def _cached(self, project_id: int) -> Optional[Tuple[str, bytes]]:
+        entry = self.entries.get(project_id)
+        if entry is None:
+            return None
+        expires_at, etag, body = entry
+        if expires_at < time.monotonic():
+            del self.entries[project_id]
+            return None
+        self.entries.move_to_end(project_id)
+        return etag, body
+    
+    def record_not_modified(self):
+        """Count a 304 answered from the cache"""
+        with self.lock:
+            self.metrics["hits"] += 1
+            self.metrics["not_modified"] += 1
+    
+    def invalidate(self, project_id: int):
+        """Forget a project's dashboard (a row behind it changed)"""
+        with self.lock:
+            self.entries.pop(project_id, None)
+            self.generations[project_id] = self.generations.get(project_id, 0) + 1
+            self.metrics["invalidations"] += 1
+    
+    def clear(self):
+        """Forget every cached dashboard"""
+        with self.lock:
+            self.entries.clear()
+            self.epoch += 1
+            self.metrics["invalidations"] += 1
+    
+    async def get(self, db: AsyncSession, project_id: int) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) for a project's dashboard, None if the project does not exist"""
+        with self.lock:
+            cached = self._cached(project_id)
+            if cached is not None:
+                self.metrics["hits"] += 1
+                return cached
+            self.metrics["misses"] += 1
+            generation = (self.epoch, self.generations.get(project_id, 0))
+        
+        row = (await db.execute(dashboard_query(project_id))).first()
+        if row is None:
+            return None
+        
+        body = json.dumps(build_dashboard_metrics(row), separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self.lock:
+            # Do not cache a result that an invalidation raced past
+            if (self.epoch, self.generations.get(project_id, 0)) == generation:
+                self.entries[project_id] = (time.monotonic() + self.ttl, etag, body)
+                self.entries.move_to_end(project_id)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return etag, body
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        with self.lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": round(self.metrics["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self.entries),
+            }
+
+
+# Global instance
+_dashboard_cache = None
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get or create dashboard cache instance"""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        _dashboard_cache = DashboardCache()
+    return _dashboard_cache
+
+
+# ==================== INVALIDATION ====================
+
+# Tables a dashboard is built from, with the column naming their project
+DASHBOARD_SOURCES = {
+    Project: "id",
+    CarbonCredit: "project_id",
+    Verification: "project_id",
+    BlockchainTransaction: "project_id",
+}
+
+
+def _changed_project_ids(session: Session) -> set:
+    project_ids = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        key = DASHBOARD_SOURCES.get(type(instance))
+        if key:
+            project_ids.add(getattr(instance, key))
+    project_ids.discard(None)
+    return project_ids
+
+
+def invalidate_dashboards(project_ids=None):
+    """Drop the given projects' dashboards (every dashboard if None)"""
+    cache = get_dashboard_cache()
+    if project_ids is None:
+        cache.clear()
+        return
+    for project_id in project_ids:
+        cache.invalidate(project_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dashboard_changes(session: Session, flush_context):
+    """Remember which dashboards a flush touched (any session, sync or async)"""
+    session.info.setdefault("dashboard_projects", set()).update(_changed_project_ids(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_dashboard_changes(orm_execute_state):
+    """Remember which dashboards a bulk UPDATE/DELETE touched (these skip the flush)"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    key = DASHBOARD_SOURCES.get(mapper.class_) if mapper is not None else None
+    if key is None:
+        return
+    
+    session = orm_execute_state.session
+    parameters = orm_execute_state.parameters
+    # Bulk UPDATE by primary key names each row; a WHERE clause could match any
+    if isinstance(parameters, list) and all(key in row for row in parameters):
+        session.info.setdefault("dashboard_projects", set()).update(row[key] for row in parameters)
+    else:
+        session.info["dashboard_all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboards(session: Session):
+    """Drop touched dashboards once the change is visible to other sessions"""
+    project_ids = session.info.pop("dashboard_projects", set())
+    if session.info.pop("dashboard_all", False):
+        invalidate_dashboards()
+    elif project_ids:
+        invalidate_dashboards(project_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dashboard_changes(session: Session):
+    session.info.pop("dashboard_projects", None)
+    session.info.pop("dashboard_all", None)
@@ -1,11 +1,19 @@
 """
 Image analysis service using AI/ML for vegetation and carbon assessment
 """
+import asyncio
 import random
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, date
+from typing import Dict, Any, Optional
 import os
 
+from .analysis_cache import get_analysis_cache, satellite_cache_key
+from .raster_analysis import analyze_scene, find_scene
+
+# Cache key granularity: tile size in degrees and imagery revisit window in days
+SATELLITE_TILE_DEGREES = float(os.getenv("SATELLITE_CACHE_TILE_DEGREES", "0.01"))
+SATELLITE_WINDOW_DAYS = int(os.getenv("SATELLITE_CACHE_WINDOW_DAYS", "5"))
+
 
 async def analyze_site_image(image_path: str) -> Dict[str, Any]:
     """
@@ -32,14 +40,45 @@ async def analyze_site_image(image_path: str) -> Dict[str, Any]:
     return analysis_result
 
 
-async def analyze_satellite_image(latitude: float, longitude: float, area: float) -> Dict[str, Any]:
+async def analyze_satellite_image(
+    latitude: float,
+    longitude: float,
+    area: float,
+    acquisition_date: Optional[date] = None
+) -> Dict[str, Any]:
     """
     Analyze satellite imagery for the given coordinates
+    Results are cached per location tile, area and acquisition date window,
+    so repeated and overlapping analyses are served without recomputation
+    """
+    key = satellite_cache_key(
+        latitude,
+        longitude,
+        area,
+        acquisition_date,
+        tile_degrees=SATELLITE_TILE_DEGREES,
+        window_days=SATELLITE_WINDOW_DAYS
+    )
+    return await get_analysis_cache().get_or_compute(
+        key,
+        lambda: _compute_satellite_analysis(latitude, longitude, area)
+    )
+
+
+async def _compute_satellite_analysis(latitude: float, longitude: float, area: float) -> Dict[str, Any]:
+    """
+    Compute satellite analysis for the given coordinates (uncached)
     In production, this would integrate with:
     - Google Earth Engine API
     - Sentinel Hub API
     - NASA MODIS data
+    Local scenes (see raster_analysis.find_scene) are analyzed with the
+    band-math pipeline; otherwise the analysis is simulated.
     """
+    scene_path = find_scene(latitude, longitude, tile_degrees=SATELLITE_TILE_DEGREES)
+    if scene_path:
+        return await _analyze_local_scene(scene_path, area)
+    
     # Simulate satellite data analysis
     # In production, you would:
     # 1. Fetch satellite imagery from APIs (Sentinel-2, Landsat, etc.)
@@ -49,16 +88,7 @@ async def analyze_satellite_image(latitude: float, longitude: float, area: float
     # 5. Estimate biomass
     
     vegetation_index = round(random.uniform(0.70, 0.85), 2)
-    
-    # Determine vegetation health based on NDVI
-    if vegetation_index >= 0.75:
-        vegetation_health = "Excellent"
-    elif vegetation_index >= 0.60:
-        vegetation_health = "Good"
-    elif vegetation_index >= 0.40:
-        vegetation_health = "Fair"
-    else:
-        vegetation_health = "Poor"
+    vegetation_health = get_vegetation_health(vegetation_index)
     
     satellite_result = {
         "vegetation_index": vegetation_index,
@@ -80,6 +110,43 @@ async def analyze_satellite_image(latitude: float, longitude: float, area: float
     return satellite_result
 
 
+async def _analyze_local_scene(scene_path: str, area: float) -> Dict[str, Any]:
+    """Run NDVI/EVI band math on a local multi-band scene"""
+    # CPU-bound NumPy work runs in a thread so the event loop stays responsive
+    indices = await asyncio.to_thread(analyze_scene, scene_path, area)
+    vegetation_index = round(indices["ndvi"], 2)
+    
+    return {
+        "vegetation_index": vegetation_index,
+        "vegetation_health": get_vegetation_health(vegetation_index),
+        "ndvi": indices["ndvi"],
+        "ndvi_std": indices["ndvi_std"],
+        "evi": indices["evi"],
+        "biomass_estimate": indices["biomass_estimate"],
+        "canopy_cover": indices["canopy_cover"],
+        "valid_pixel_fraction": indices["valid_pixel_fraction"],
+        "last_updated": datetime.utcnow().isoformat(),
+        "data_source": "Sentinel-2",
+        "scene": os.path.basename(scene_path),
+        # Pixels masked out as nodata are mostly cloud/cloud shadow
+        "cloud_coverage": round(1 - indices["valid_pixel_fraction"], 2)
+    }
+
+
+def get_vegetation_health(vegetation_index: float) -> str:
+    """
+    Determine vegetation health based on NDVI
+    """
+    if vegetation_index >= 0.75:
+        return "Excellent"
+    elif vegetation_index >= 0.60:
+        return "Good"
+    elif vegetation_index >= 0.40:
+        return "Fair"
+    else:
+        return "Poor"
+
+
 def calculate_image_quality_score(image_path: str) -> float:
     """
     Calculate image quality score
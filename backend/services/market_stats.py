@@ -0,0 +1,242 @@
+"""
+Marketplace statistics aggregate
+Counters for active listings, issued credits and trades, kept current from
+committed ORM changes so the statistics endpoint never scans a table
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import MarketListing, CarbonCredit
+
+WINDOW = timedelta(hours=24)
+
+
+class MarketStatistics:
+    """In-process market aggregate, seeded from the database and updated per commit"""
+    
+    def __init__(self, resync_interval: Optional[float] = None):
+        # Commits made by other processes only show up after a resync
+        self.resync_interval = resync_interval or float(os.getenv("MARKET_STATS_RESYNC_INTERVAL", "300"))
+        
+        self.lock = threading.Lock()  # commits also arrive from worker threads
+        self.loaded = False
+        self.version = 0  # bumped on every applied change
+        self.running = False
+        self.wakeup = asyncio.Event()
+        
+        self.active_listings = 0
+        self.active_price_sum = 0.0
+        self.total_credits = 0.0
+        self.total_transactions = 0
+        # Trades in the rolling window: (sold_at, amount), oldest first
+        self.trades: deque = deque()
+        self.volume_24h = 0.0
+        
+        self.metrics = {
+            "reads": 0,
+            "updates": 0,
+            "resyncs": 0,
+            "resyncs_discarded": 0,
+        }
+    
+    def apply(self, changes: List[Dict[str, Any]]):
+        """Add the deltas of one committed transaction"""
+        with self.lock:
+            for delta in changes:
+                self.active_listings += delta["active_listings"]
+                self.active_price_sum += delta["active_price_sum"]
+                self.total_credits += delta["total_credits"]
+                for sold_at, amount in delta["trades"]:
+                    self.total_transactions += 1
+                    self.trades.append((sold_at, amount))
+                    self.volume_24h += amount
+            if self.active_listings == 0:
+                self.active_price_sum = 0.0  # no float drift left behind
+            self.version += 1
+            self.metrics["updates"] += 1
+    
+    def _expire_trades(self, now: datetime):
+        cutoff = now - WINDOW
+        while self.trades and self.trades[0][0] < cutoff:
+            _, amount = self.trades.popleft()
+            self.volume_24h -= amount
+        if not self.trades:
+            self.volume_24h = 0.0
+    
+    async def refresh(self, db: AsyncSession):
+        """Recompute the aggregate from the database"""
+        version = self.version
+        since = datetime.utcnow() - WINDOW
+        
+        active_listings, active_price_sum = (await db.execute(
+            select(func.count(), func.sum(MarketListing.asking_price)).where(MarketListing.status == "active")
+        )).one()
+        total_credits = await db.scalar(select(func.sum(CarbonCredit.total_credits)))
+        total_transactions = await db.scalar(select(func.count()).where(MarketListing.status == "sold"))
+        trades = (await db.execute(
+            select(MarketListing.sold_at, MarketListing.available_amount)
+            .where(MarketListing.status == "sold", MarketListing.sold_at >= since)
+            .order_by(MarketListing.sold_at)
+        )).all()
+        
+        with self.lock:
+            # A commit applied meanwhile may or may not be in what was read
+            if self.loaded and self.version != version:
+                self.metrics["resyncs_discarded"] += 1
+                return
+            self.active_listings = active_listings
+            self.active_price_sum = active_price_sum or 0.0
+            self.total_credits = total_credits or 0.0
+            self.total_transactions = total_transactions
+            self.trades = deque((sold_at, amount) for sold_at, amount in trades)
+            self.volume_24h = sum(amount for _, amount in self.trades)
+            self.loaded = True
+            self.version += 1
+            self.metrics["resyncs"] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current aggregate values"""
+        with self.lock:
+            self._expire_trades(datetime.utcnow())
+            self.metrics["reads"] += 1
+            return {
+                "active_listings": self.active_listings,
+                "average_price": self.active_price_sum / self.active_listings if self.active_listings else None,
+                "total_credits": self.total_credits,
+                "total_transactions": self.total_transactions,
+                "transactions_24h": len(self.trades),
+                "volume_24h": self.volume_24h,
+            }
+    
+    async def run(self, session_factory):
+        """Resync from the database until stopped"""
+        self.running = True
+        while self.running:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db)
+            except Exception as e:
+                print(f"❌ Market statistics resync failed: {e}")
+            
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.resync_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+    
+    def stop(self):
+        """Stop the background resync"""
+        self.running = False
+        self.wakeup.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Update/resync counters"""
+        return {**self.metrics, "loaded": self.loaded, "running": self.running, "trades_in_window": len(self.trades)}
+
+
+# Global instance
+_market_stats = None
+
+def get_market_stats() -> MarketStatistics:
+    """Get or create market statistics instance"""
+    global _market_stats
+    if _market_stats is None:
+        _market_stats = MarketStatistics()
+    return _market_stats
+
+
+# ==================== CHANGE TRACKING ====================
+
+def _before_after(instance, key: str):
+    """(value before the pending change, value after it) for an attribute"""
+    history = inspect(instance).attrs[key].history
+    after = getattr(instance, key)
+    if history.deleted:
+        return history.deleted[0], after
+    return after, after
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load the old value when these are set on an expired instance, so the
+# change can be told apart from the state it replaces
+for _attribute in (MarketListing.status, MarketListing.asking_price, CarbonCredit.total_credits):
+    event.listen(_attribute, "set", _load_previous_value, active_history=True)
+
+
+def _listing_delta(listing: MarketListing, delta: Dict[str, Any], added: bool, removed: bool):
+    status_before, status_after = _before_after(listing, "status")
+    price_before, price_after = _before_after(listing, "asking_price")
+    status_after = status_after or "active"  # column default
+    
+    was_active = not added and status_before == "active"
+    is_active = not removed and status_after == "active"
+    delta["active_listings"] += int(is_active) - int(was_active)
+    delta["active_price_sum"] += (price_after if is_active else 0.0) - (price_before if was_active else 0.0)
+    if not removed and status_after == "sold" and (added or status_before != "sold"):
+        delta["trades"].append((listing.sold_at or datetime.utcnow(), listing.available_amount or 0.0))
+
+
+def _credit_delta(credit: CarbonCredit, delta: Dict[str, Any], added: bool, removed: bool):
+    before, after = _before_after(credit, "total_credits")
+    delta["total_credits"] += (0.0 if removed else after or 0.0) - (0.0 if added else before or 0.0)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_market_changes(session: Session, flush_context, instances):
+    """Turn a flush's listing and credit changes into aggregate deltas"""
+    delta = {"active_listings": 0, "active_price_sum": 0.0, "total_credits": 0.0, "trades": []}
+    touched = False
+    for instances, added, removed in (
+        (session.new, True, False),
+        (session.dirty, False, False),
+        (session.deleted, False, True),
+    ):
+        for instance in instances:
+            if isinstance(instance, MarketListing):
+                _listing_delta(instance, delta, added, removed)
+                touched = True
+            elif isinstance(instance, CarbonCredit):
+                _credit_delta(instance, delta, added, removed)
+                touched = True
+    if touched:
+        # Tagged with the savepoint (if any), so rolling it back drops the delta
+        session.info.setdefault("market_deltas", []).append((session.get_nested_transaction(), delta))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_market_changes(session: Session):
+    """Apply a committed transaction's deltas"""
+    deltas = session.info.pop("market_deltas", None)
+    if deltas:
+        get_market_stats().apply([delta for _, delta in deltas])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_market_changes(session: Session, previous_transaction):
+    """Drop deltas flushed inside a rolled-back transaction or savepoint"""
+    deltas = session.info.get("market_deltas")
+    if not deltas:
+        return
+    if not previous_transaction.nested:
+        session.info.pop("market_deltas", None)
+        return
+    
+    def rolled_back(transaction) -> bool:
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+    
+    session.info["market_deltas"] = [entry for entry in deltas if not rolled_back(entry[0])]
@@ -1,24 +1,22 @@
 """
 Marketplace service for carbon credit trading
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import MarketListing, CarbonCredit, Project
+from services.market_stats import get_market_stats
 from datetime import datetime
 from typing import Dict, Any
 
 
-def create_market_listing(
-    db: Session,
+async def create_market_listing(
+    db: AsyncSession,
     carbon_credit_id: int,
     asking_price: float
 ) -> MarketListing:
     """
     Create a new marketplace listing
     """
-    carbon_credit = db.query(CarbonCredit).filter(
-        CarbonCredit.id == carbon_credit_id
-    ).first()
+    carbon_credit = await db.get(CarbonCredit, carbon_credit_id)
     
     if not carbon_credit:
         raise ValueError("Carbon credit not found")
@@ -34,33 +32,66 @@ def create_market_listing(
     )
     
     db.add(listing)
-    db.commit()
-    db.refresh(listing)
+    await db.commit()
+    await db.refresh(listing)
     return listing
 
 
-def get_market_statistics(db: Session) -> Dict[str, Any]:
+async def sell_market_listing(db: AsyncSession, listing_id: int) -> MarketListing:
     """
-    Get marketplace statistics
+    Complete the sale of an active listing
     """
-    # Get active listings
-    active_listings = db.query(MarketListing).filter(
-        MarketListing.status == "active"
-    ).count()
+    listing = await db.get(MarketListing, listing_id)
+    
+    if not listing:
+        raise ValueError("Listing not found")
+    
+    if listing.status != "active":
+        raise ValueError(f"Listing is {listing.status}")
     
-    # Calculate average price
-    avg_price = db.query(func.avg(MarketListing.asking_price)).filter(
-        MarketListing.status == "active"
-    ).scalar() or 45.0
+    carbon_credit = await db.get(CarbonCredit, listing.carbon_credit_id)
+    carbon_credit.available_credits = max(0.0, carbon_credit.available_credits - listing.available_amount)
+    
+    listing.status = "sold"
+    listing.sold_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(listing)
+    return listing
+
+
+async def cancel_market_listing(db: AsyncSession, listing_id: int) -> MarketListing:
+    """
+    Withdraw an active listing from the marketplace
+    """
+    listing = await db.get(MarketListing, listing_id)
     
-    # Calculate total volume (mock data for now)
-    total_volume = 12450.0
+    if not listing:
+        raise ValueError("Listing not found")
+    
+    if listing.status != "active":
+        raise ValueError(f"Listing is {listing.status}")
+    
+    listing.status = "cancelled"
+    await db.commit()
+    await db.refresh(listing)
+    return listing
+
+
+async def get_market_statistics(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Get marketplace statistics
+    """
+    # Maintained per commit; only the first call in a process reads the tables
+    market_stats = get_market_stats()
+    if not market_stats.loaded:
+        await market_stats.refresh(db)
+    aggregate = market_stats.snapshot()
     
-    # Total transactions
-    total_transactions = 1247
+    avg_price = aggregate["average_price"] or 45.0
+    active_listings = aggregate["active_listings"]
+    total_credits = aggregate["total_credits"]
     
     # Market cap
-    total_credits = db.query(func.sum(CarbonCredit.total_credits)).scalar() or 0
     market_cap = total_credits * avg_price
     
     # Market demand calculation
@@ -71,8 +102,9 @@ def get_market_statistics(db: Session) -> Dict[str, Any]:
         "price_change_24h": 0.00,
         "market_demand": demand_percentage,
         "demand_level": "High" if demand_percentage > 70 else "Medium",
-        "volume_24h": total_volume,
-        "total_transactions": total_transactions,
+        "volume_24h": round(aggregate["volume_24h"], 2),
+        "transactions_24h": aggregate["transactions_24h"],
+        "total_transactions": aggregate["total_transactions"],
         "average_price": round(avg_price, 2),
         "market_cap": round(market_cap, 2),
         "active_listings": active_listings,
@@ -81,7 +113,7 @@ def get_market_statistics(db: Session) -> Dict[str, Any]:
 
 
 def calculate_market_interest(
-    db: Session,
+    db: AsyncSession,
     listing_id: int
 ) -> Dict[str, Any]:
     """
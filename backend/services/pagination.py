@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination
+Pages are read in (sort column, id) order and continue after the last row
+of the previous page, so a deep page costs the same as the first one and
+rows inserted meanwhile never shift or repeat results
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Select, select, func, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Row counts above this are reported as an estimate ("<cap>+") on SQLite
+COUNT_ESTIMATE_CAP = int(os.getenv("PAGINATION_COUNT_CAP", "10000"))
+# Largest page a list endpoint serves
+MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", "1000"))
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Opaque cursor for the position after a row"""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Position encoded by encode_cursor (ValueError if the cursor is malformed)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of statement's rows in (sort_column, id_column) order
+    
+    Returns the rows and the cursor for the next page (None on the last page).
+    skip (offset paging, for older clients) only applies without a cursor.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # Row-value comparison, so the (sort, id) index serves it as a range scan
+        statement = statement.where(tuple_(sort_column, id_column) > tuple_(sort_value, row_id))
+    statement = statement.order_by(sort_column, id_column)
+    if skip and not cursor:
+        statement = statement.offset(skip)
+    
+    # One extra row tells whether another page follows
+    rows = (await db.scalars(statement.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+async def estimate_count(db: AsyncSession, statement: Select) -> str:
+    """
+    Cheap row count for statement, without a full COUNT(*)
+    
+    PostgreSQL reports the planner's estimate; elsewhere rows are counted up
+    to COUNT_ESTIMATE_CAP and larger results are reported as "<cap>+".
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql":
+        compiled = statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        return str(int(plan[0]["Plan"]["Plan Rows"]))
+    
+    bounded = statement.with_only_columns(text("1")).order_by(None).limit(COUNT_ESTIMATE_CAP + 1).subquery()
+    count = await db.scalar(select(func.count()).select_from(bounded))
+    return f"{COUNT_ESTIMATE_CAP}+" if count > COUNT_ESTIMATE_CAP else str(count)
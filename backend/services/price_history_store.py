@@ -0,0 +1,391 @@
+"""
+Local time-series store for carbon market prices
+Keeps recent samples in an in-memory ring buffer, persists them in compact
+columnar chunks and rolls them up into 1m/1h/1d OHLC candles. Raw chunks are
+pruned after the retention period; the candles are persisted separately so
+they keep their own (longer) retention
+"""
+import asyncio
+import os
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+# Columns recorded for every sample (timestamp is stored separately)
+COLUMNS = ("carbon_price", "btc_price", "eth_price", "bnb_price", "apt_price")
+
+# Rollup resolutions in seconds and how many candles to keep for each
+RESOLUTIONS = {
+    "1m": 60,
+    "1h": 3600,
+    "1d": 86400,
+}
+ROLLUP_RETENTION = {
+    "1m": 7 * 24 * 60,   # one week of minutes
+    "1h": 90 * 24,       # ninety days of hours
+    "1d": 5 * 365,       # five years of days
+}
+
+# Chunk file layout: magic, sample count, then one float64 column after another
+CHUNK_MAGIC = b"CPH1"
+CHUNK_HEADER = struct.Struct("<4sI")
+# Rollup file layout: magic, candle count, timestamp of the last sample folded
+# in, then the bucket starts and the candles (4 values per column) as float64
+ROLLUP_MAGIC = b"CPR1"
+ROLLUP_HEADER = struct.Struct("<4sId")
+
+
+class PriceHistoryStore:
+    """Append-only price history with background OHLC rollups"""
+    
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        capacity: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.data_dir = data_dir or os.getenv("PRICE_HISTORY_DIR", "data/price_history")
+        self.capacity = capacity or int(os.getenv("PRICE_HISTORY_CAPACITY", "86400"))
+        self.chunk_size = chunk_size or int(os.getenv("PRICE_HISTORY_CHUNK_SIZE", "3600"))
+        self.retention_days = float(os.getenv("PRICE_HISTORY_RETENTION_DAYS", "30"))
+        
+        # Ring buffer: one preallocated array per column
+        self.timestamps = array("d", bytes(8 * self.capacity))
+        self.columns = {name: array("d", bytes(8 * self.capacity)) for name in COLUMNS}
+        self.count = 0  # total samples ever appended (monotonic sequence)
+        
+        # Samples not yet persisted / not yet rolled up (sequence numbers)
+        self.persisted_seq = 0
+        self.rolled_seq = 0
+        
+        # resolution -> bucket start -> [open, high, low, close] * len(COLUMNS)
+        self.rollups: Dict[str, "OrderedDict[int, List[float]]"] = {
+            resolution: OrderedDict() for resolution in RESOLUTIONS
+        }
+        # Timestamp of the last sample folded into each resolution
+        self.rolled_until: Dict[str, float] = {resolution: 0.0 for resolution in RESOLUTIONS}
+        self.running = False
+        self.persist_lock = threading.Lock()  # one writer of chunk and rollup files at a time
+    
+    # ==================== INGESTION ====================
+    
+    def append(self, timestamp: float, values: Dict[str, float]):
+        """Append one sample (O(1), no I/O)"""
+        index = self.count % self.capacity
+        self.timestamps[index] = timestamp
+        for name in COLUMNS:
+            self.columns[name][index] = float(values.get(name) or 0.0)
+        self.count += 1
+    
+    def append_snapshot(self, snapshot):
+        """Snapshot listener: record the carbon price and its crypto inputs"""
+        data = snapshot.data
+        influence = data.get("crypto_influence", {})
+        self.append(time.time(), {
+            "carbon_price": data.get("current_price"),
+            "btc_price": influence.get("btc_price"),
+            "eth_price": influence.get("eth_price"),
+            "bnb_price": influence.get("bnb_price"),
+            "apt_price": influence.get("apt_price"),
+        })
+    
+    def _oldest_seq(self) -> int:
+        """Sequence number of the oldest sample still in the ring buffer"""
+        return max(0, self.count - self.capacity)
+    
+    def _sample(self, seq: int):
+        """Timestamp and column values of a buffered sample"""
+        index = seq % self.capacity
+        return self.timestamps[index], [self.columns[name][index] for name in COLUMNS]
+    
+    # ==================== ROLLUPS ====================
+    
+    def _add_to_rollups(self, timestamp: float, values: List[float]):
+        """Fold one sample into every rollup resolution"""
+        for resolution, seconds in RESOLUTIONS.items():
+            if timestamp <= self.rolled_until[resolution]:
+                continue  # already in the persisted candles
+            self.rolled_until[resolution] = timestamp
+            buckets = self.rollups[resolution]
+            bucket = int(timestamp // seconds) * seconds
+            candle = buckets.get(bucket)
+            if candle is None:
+                candle = []
+                for value in values:
+                    candle.extend((value, value, value, value))
+                buckets[bucket] = candle
+                while len(buckets) > ROLLUP_RETENTION[resolution]:
+                    buckets.popitem(last=False)
+            else:
+                for i, value in enumerate(values):
+                    base = i * 4
+                    if value > candle[base + 1]:
+                        candle[base + 1] = value
+                    if value < candle[base + 2]:
+                        candle[base + 2] = value
+                    candle[base + 3] = value
+    
+    def roll_up(self) -> int:
+        """Fold samples appended since the last call into the rollups"""
+        start = max(self.rolled_seq, self._oldest_seq())
+        end = self.count
+        for seq in range(start, end):
+            timestamp, values = self._sample(seq)
+            self._add_to_rollups(timestamp, values)
+        self.rolled_seq = end
+        return end - start
+    
+    # ==================== PERSISTENCE ====================
+    
+    def _chunk_path(self, first_timestamp: float) -> str:
+        return os.path.join(self.data_dir, f"chunk_{int(first_timestamp * 1000):015d}.bin")
+    
+    def flush(self, force: bool = False) -> int:
+        """Write complete chunks (or everything pending, if force) to disk"""
+        written = 0
+        self.persisted_seq = max(self.persisted_seq, self._oldest_seq())
+        
+        while self.count - self.persisted_seq >= self.chunk_size or (force and self.count > self.persisted_seq):
+            start = self.persisted_seq
+            end = min(self.count, start + self.chunk_size)
+            
+            timestamps = array("d")
+            columns = {name: array("d") for name in COLUMNS}
+            for seq in range(start, end):
+                timestamp, values = self._sample(seq)
+                timestamps.append(timestamp)
+                for name, value in zip(COLUMNS, values):
+                    columns[name].append(value)
+            
+            os.makedirs(self.data_dir, exist_ok=True)
+            path = self._chunk_path(timestamps[0])
+            with open(path + ".tmp", "wb") as f:
+                f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(timestamps)))
+                timestamps.tofile(f)
+                for name in COLUMNS:
+                    columns[name].tofile(f)
+            os.replace(path + ".tmp", path)
+            
+            self.persisted_seq = end
+            written += end - start
+        return written
+    
+    def prune(self) -> int:
+        """Delete chunk files older than the retention period"""
+        if not os.path.isdir(self.data_dir):
+            return 0
+        
+        cutoff_ms = (time.time() - self.retention_days * 86400) * 1000
+        removed = 0
+        for filename in os.listdir(self.data_dir):
+            if not (filename.startswith("chunk_") and filename.endswith(".bin")):
+                continue
+            if int(filename[len("chunk_"):-len(".bin")]) < cutoff_ms:
+                os.remove(os.path.join(self.data_dir, filename))
+                removed += 1
+        return removed
+    
+    def _rollup_path(self, resolution: str) -> str:
+        return os.path.join(self.data_dir, f"rollup_{resolution}.bin")
+    
+    def rollup_snapshot(self) -> Dict[str, tuple]:
+        """Copy of the candles for save_rollups (call on the thread that rolls up)"""
+        # Candle lists are copied: the open buckets keep changing meanwhile
+        return {
+            resolution: (
+                self.rolled_until[resolution],
+                [(bucket, list(candle)) for bucket, candle in buckets.items()]
+            )
+            for resolution, buckets in self.rollups.items()
+        }
+    
+    def save_rollups(self, snapshot: Dict[str, tuple]):
+        """Write a rollup_snapshot to disk, one file per resolution"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for resolution, (rolled_until, candles) in snapshot.items():
+            buckets = array("d", (bucket for bucket, _ in candles))
+            values = array("d")
+            for _, candle in candles:
+                values.extend(candle)
+            path = self._rollup_path(resolution)
+            with open(path + ".tmp", "wb") as f:
+                f.write(ROLLUP_HEADER.pack(ROLLUP_MAGIC, len(buckets), rolled_until))
+                buckets.tofile(f)
+                values.tofile(f)
+            os.replace(path + ".tmp", path)
+    
+    def load_rollups(self):
+        """Read persisted candles back into the rollups"""
+        width = len(COLUMNS) * 4
+        for resolution in RESOLUTIONS:
+            path = self._rollup_path(resolution)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    magic, count, rolled_until = ROLLUP_HEADER.unpack(f.read(ROLLUP_HEADER.size))
+                    if magic != ROLLUP_MAGIC:
+                        raise ValueError("bad magic")
+                    buckets = array("d")
+                    buckets.fromfile(f, count)
+                    values = array("d")
+                    values.fromfile(f, count * width)
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable price rollup {resolution}: {e}")
+                continue
+            
+            rollup = self.rollups[resolution]
+            for i, bucket in enumerate(buckets):
+                rollup[int(bucket)] = values[i * width:(i + 1) * width].tolist()
+            self.rolled_until[resolution] = rolled_until
+    
+    @staticmethod
+    def read_chunk(path: str) -> Dict[str, array]:
+        """Read a chunk file back into columns"""
+        with open(path, "rb") as f:
+            magic, count = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Not a price history chunk: {path}")
+            result = {"timestamp": array("d")}
+            result["timestamp"].fromfile(f, count)
+            for name in COLUMNS:
+                result[name] = array("d")
+                result[name].fromfile(f, count)
+        return result
+    
+    def load(self) -> int:
+        """Rebuild the ring buffer and rollups from persisted candles and chunks"""
+        if not os.path.isdir(self.data_dir):
+            return 0
+        
+        # Chunks only add the samples newer than the persisted candles
+        self.load_rollups()
+        loaded = 0
+        for filename in sorted(os.listdir(self.data_dir)):
+            if not (filename.startswith("chunk_") and filename.endswith(".bin")):
+                continue
+            try:
+                chunk = self.read_chunk(os.path.join(self.data_dir, filename))
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable price history chunk {filename}: {e}")
+                continue
+            
+            for i, timestamp in enumerate(chunk["timestamp"]):
+                self.append(timestamp, {name: chunk[name][i] for name in COLUMNS})
+                loaded += 1
+            # Roll up each chunk before later ones push it out of the ring buffer
+            self.roll_up()
+        
+        # Everything loaded is already on disk
+        self.persisted_seq = self.count
+        return loaded
+    
+    async def restore(self) -> int:
+        """load() in a worker thread, keeping samples appended meanwhile"""
+        restored = PriceHistoryStore(self.data_dir, self.capacity, self.chunk_size)
+        loaded = await asyncio.to_thread(restored.load)
+        
+        live = [self._sample(seq) for seq in range(self._oldest_seq(), self.count)]
+        self.timestamps, self.columns, self.count = restored.timestamps, restored.columns, restored.count
+        self.persisted_seq, self.rolled_seq = restored.persisted_seq, restored.rolled_seq
+        self.rollups, self.rolled_until = restored.rollups, restored.rolled_until
+        for timestamp, values in live:
+            self.append(timestamp, dict(zip(COLUMNS, values)))
+        return loaded
+    
+    def _flush_due(self) -> bool:
+        return self.count - max(self.persisted_seq, self._oldest_seq()) >= self.chunk_size
+    
+    def _persist(self, rollups: Dict[str, tuple], force: bool = False):
+        """Write chunks, then the rollups and prune (runs in a worker thread)"""
+        with self.persist_lock:
+            if self.flush(force=force) or force:
+                self.save_rollups(rollups)
+                self.prune()
+    
+    # ==================== QUERIES ====================
+    
+    def get_samples(self, limit: int = 100, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Most recent raw samples, oldest first"""
+        start = max(self._oldest_seq(), self.count - limit)
+        result = []
+        for seq in range(start, self.count):
+            timestamp, values = self._sample(seq)
+            if since is not None and timestamp < since:
+                continue
+            sample = {"timestamp": timestamp}
+            sample.update(zip(COLUMNS, values))
+            result.append(sample)
+        return result
+    
+    def get_candles(
+        self,
+        resolution: str = "1m",
+        column: str = "carbon_price",
+        limit: int = 100,
+        since: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Most recent OHLC candles for a column, oldest first"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        
+        base = COLUMNS.index(column) * 4
+        buckets = self.rollups[resolution]
+        result = []
+        for bucket in reversed(buckets):
+            if len(result) >= limit or (since is not None and bucket < since):
+                break
+            candle = buckets[bucket]
+            result.append({
+                "timestamp": bucket,
+                "open": candle[base],
+                "high": candle[base + 1],
+                "low": candle[base + 2],
+                "close": candle[base + 3],
+            })
+        result.reverse()
+        return result
+    
+    # ==================== BACKGROUND TASK ====================
+    
+    async def run(self, interval: float = 5):
+        """Periodically roll up new samples and persist full chunks"""
+        self.running = True
+        loaded = await self.restore()
+        if loaded:
+            print(f"📈 Loaded {loaded} price history samples")
+        
+        while self.running:
+            await asyncio.sleep(interval)
+            if not self.running:
+                break
+            try:
+                self.roll_up()
+                if self._flush_due():
+                    # File I/O off the event loop
+                    await asyncio.to_thread(self._persist, self.rollup_snapshot())
+            except Exception as e:
+                print(f"❌ Price history rollup failed: {e}")
+    
+    async def stop(self):
+        """Stop the background task and persist pending samples"""
+        self.running = False
+        self.roll_up()
+        # Waits for a write the background task may have in progress
+        await asyncio.to_thread(self._persist, self.rollup_snapshot(), True)
+
+
+# Global instance
+_history_store = None
+
+def get_price_history_store() -> PriceHistoryStore:
+    """Get or create price history store instance"""
+    global _history_store
+    if _history_store is None:
+        _history_store = PriceHistoryStore()
+    return _history_store
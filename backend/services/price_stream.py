@@ -0,0 +1,130 @@
+"""
+Live price streaming service
+Fans out market snapshots to connected clients as Server-Sent Events
+"""
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional, AsyncIterator
+
+from .binance_price_service import MarketSnapshot
+
+
+def diff_market_data(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return only the fields of current that differ from previous
+    
+    Nested dictionaries (e.g. crypto_influence) are diffed one level deep so
+    that a single changed sub-field does not resend the whole object.
+    """
+    if previous is None:
+        return dict(current)
+    
+    changes = {}
+    for key, value in current.items():
+        old_value = previous.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            nested = {k: v for k, v in value.items() if old_value.get(k) != v}
+            if nested:
+                changes[key] = nested
+        elif old_value != value:
+            changes[key] = value
+    return changes
+
+
+class PriceSubscriber:
+    """A connected client with its own bounded message queue"""
+    
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+    
+    def drop(self):
+        """Disconnect a slow consumer, discarding anything still queued"""
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # Wake up the stream so it notices it has been dropped
+        self.queue.put_nowait(None)
+
+
+class PriceBroadcaster:
+    """Fan out each published market snapshot to every subscriber"""
+    
+    def __init__(self, queue_size: Optional[int] = None, heartbeat_interval: Optional[float] = None):
+        self.queue_size = queue_size or int(os.getenv("PRICE_STREAM_QUEUE_SIZE", "16"))
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv("PRICE_STREAM_HEARTBEAT", "15"))
+        self.subscribers = set()
+        self.last_snapshot: Optional[MarketSnapshot] = None
+        self.dropped_subscribers = 0
+    
+    def subscribe(self) -> PriceSubscriber:
+        """Register a new client; it starts with the latest full snapshot"""
+        subscriber = PriceSubscriber(self.queue_size)
+        if self.last_snapshot is not None:
+            subscriber.queue.put_nowait(("snapshot", self.last_snapshot.version, dict(self.last_snapshot.data)))
+        self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: PriceSubscriber):
+        """Remove a client"""
+        self.subscribers.discard(subscriber)
+    
+    def publish(self, snapshot: MarketSnapshot):
+        """Queue the changed fields of a new snapshot for every subscriber"""
+        previous = self.last_snapshot.data if self.last_snapshot else None
+        self.last_snapshot = snapshot
+        
+        changes = diff_market_data(previous, snapshot.data)
+        if not changes:
+            return
+        
+        message = ("update", snapshot.version, changes)
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it rather than buffering without bound
+                self.unsubscribe(subscriber)
+                subscriber.drop()
+                self.dropped_subscribers += 1
+                print("⚠️  Dropped slow price stream subscriber")
+    
+    async def stream(self, subscriber: PriceSubscriber) -> AsyncIterator[str]:
+        """Yield Server-Sent Events for a subscriber until it disconnects"""
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing idle connections
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if message is None or subscriber.dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                
+                event, version, data = message
+                yield f"id: {version}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Current subscriber counts"""
+        return {
+            "subscribers": len(self.subscribers),
+            "dropped_subscribers": self.dropped_subscribers,
+            "last_version": self.last_snapshot.version if self.last_snapshot else None,
+        }
+
+
+# Global instance
+_price_broadcaster = None
+
+def get_price_broadcaster() -> PriceBroadcaster:
+    """Get or create price broadcaster instance"""
+    global _price_broadcaster
+    if _price_broadcaster is None:
+        _price_broadcaster = PriceBroadcaster()
+    return _price_broadcaster
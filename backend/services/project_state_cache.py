@@ -0,0 +1,144 @@
+"""
+On-chain project state cache
+Keeps view-function results for registry projects locally; entries are
+dropped when the event listener (or a local write) reports a change
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+
+class ProjectStateCache:
+    """Project id -> on-chain state, with batched, single-flight loading"""
+    
+    def __init__(self, ttl: Optional[float] = None, concurrency: Optional[int] = None):
+        # Events are the primary invalidation; the TTL only bounds staleness
+        # if an event is missed
+        self.ttl = ttl or float(os.getenv("APTOS_PROJECT_CACHE_TTL", "300"))
+        self.concurrency = concurrency or int(os.getenv("APTOS_VIEW_CONCURRENCY", "16"))
+        # Shared by all callers, so it bounds the view calls of the process
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        
+        self.entries: Dict[str, tuple] = {}  # project_id -> (expires_at, state)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.generations: Dict[str, int] = {}  # bumped on invalidation
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "view_calls": 0,
+        }
+    
+    def invalidate(self, project_id: str):
+        """Forget a project's state (it changed on chain)"""
+        self.entries.pop(project_id, None)
+        # Later readers must not join a lookup that started before the change
+        self.in_flight.pop(project_id, None)
+        self.generations[project_id] = self.generations.get(project_id, 0) + 1
+        self.metrics["invalidations"] += 1
+    
+    def clear(self):
+        """Forget every cached project"""
+        for project_id in list(self.entries):
+            self.invalidate(project_id)
+    
+    def _cached(self, project_id: str) -> Optional[Any]:
+        entry = self.entries.get(project_id)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            del self.entries[project_id]
+            return None
+        return state
+    
+    async def _load(
+        self,
+        project_id: str,
+        fetch: Callable[[str], Awaitable[Any]],
+        future: asyncio.Future
+    ):
+        generation = self.generations.get(project_id, 0)
+        try:
+            async with self.semaphore:
+                self.metrics["view_calls"] += 1
+                state = await fetch(project_id)
+            # Do not cache a result that an invalidation raced past
+            if state is not None and self.generations.get(project_id, 0) == generation:
+                self.entries[project_id] = (time.monotonic() + self.ttl, state)
+            future.set_result(state)
+        except Exception as e:
+            print(f"Error getting project {project_id}: {e}")
+            future.set_result(None)
+        except BaseException:
+            # Cancelled: callers sharing this lookup must not wait forever
+            if not future.done():
+                future.set_result(None)
+            raise
+        finally:
+            if self.in_flight.get(project_id) is future:
+                del self.in_flight[project_id]
+    
+    async def get_many(
+        self,
+        project_ids: List[str],
+        fetch: Callable[[str], Awaitable[Any]]
+    ) -> Dict[str, Optional[Any]]:
+        """
+        State for many projects at once
+        
+        Cached projects are answered locally; the rest are fetched with
+        concurrent view calls (one per project, bounded by concurrency), and
+        lookups already in flight for another caller are shared.
+        """
+        results: Dict[str, Optional[Any]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        loads = []
+        loop = asyncio.get_running_loop()
+        
+        for project_id in dict.fromkeys(project_ids):
+            state = self._cached(project_id)
+            if state is not None:
+                self.metrics["hits"] += 1
+                results[project_id] = state
+                continue
+            
+            pending = self.in_flight.get(project_id)
+            if pending is not None:
+                self.metrics["coalesced"] += 1
+                waiting[project_id] = pending
+                continue
+            
+            self.metrics["misses"] += 1
+            future = loop.create_future()
+            self.in_flight[project_id] = future
+            waiting[project_id] = future
+            loads.append(self._load(project_id, fetch, future))
+        
+        if loads:
+            await asyncio.gather(*loads)
+        for project_id, future in waiting.items():
+            results[project_id] = await asyncio.shield(future)
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self.metrics["hits"] + self.metrics["misses"] + self.metrics["coalesced"]
+        return {
+            **self.metrics,
+            "hit_rate": round(self.metrics["hits"] / lookups, 4) if lookups else None,
+            "entries": len(self.entries),
+        }
+
+
+# Global instance
+_project_state_cache = None
+
+def get_project_state_cache() -> ProjectStateCache:
+    """Get or create project state cache instance"""
+    global _project_state_cache
+    if _project_state_cache is None:
+        _project_state_cache = ProjectStateCache()
+    return _project_state_cache
@@ -0,0 +1,231 @@
+"""
+Raster band-math engine for satellite imagery
+Computes NDVI, EVI and canopy cover from multi-band scenes window by window,
+using memory-mapped / windowed reads so a full scene is never loaded into RAM
+"""
+import os
+from decimal import Decimal
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import rasterio
+    from rasterio.windows import Window
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+
+# Default band order (0-based) for Sentinel-2 scenes stacked as B02, B04, B08
+SENTINEL2_BANDS = {"blue": 0, "red": 1, "nir": 2}
+
+# Sentinel-2 L2A reflectance is stored as integers scaled by 10000
+SENTINEL2_SCALE = 1.0 / 10000
+
+# EVI coefficients (MODIS/Sentinel convention)
+EVI_G, EVI_C1, EVI_C2, EVI_L = 2.5, 6.0, 7.5, 1.0
+
+
+class NpyRasterSource:
+    """
+    Multi-band scene stored as a C-ordered (bands, rows, cols) .npy file
+    
+    Every read memory-maps only the rows of the requested window and copies
+    the window out, so the mapping (and its resident pages) is released
+    straight away instead of accumulating over the whole scene.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            self.offset = f.tell()
+        if len(shape) != 3 or fortran_order:
+            raise ValueError(f"Expected a C-ordered (bands, rows, cols) array in {path}, got shape {shape}")
+        self.dtype = dtype
+        self.band_count, self.height, self.width = shape
+    
+    def read(self, band: int, row: int, col: int, rows: int, cols: int) -> "np.ndarray":
+        """Read one band window"""
+        row_bytes = self.width * self.dtype.itemsize
+        stripe = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            offset=self.offset + (band * self.height + row) * row_bytes,
+            shape=(rows, self.width)
+        )
+        window = np.array(stripe[:, col:col + cols])
+        del stripe
+        return window
+    
+    def close(self):
+        pass
+
+
+class RasterioRasterSource:
+    """GeoTIFF (or any GDAL format) read with rasterio windowed reads"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.dataset = rasterio.open(path)
+        self.band_count = self.dataset.count
+        self.height = self.dataset.height
+        self.width = self.dataset.width
+    
+    def read(self, band: int, row: int, col: int, rows: int, cols: int) -> "np.ndarray":
+        """Read one band window (rasterio bands are 1-based)"""
+        return self.dataset.read(band + 1, window=Window(col, row, cols, rows))
+    
+    def close(self):
+        self.dataset.close()
+
+
+def open_raster(path: str):
+    """Open a multi-band scene for windowed reading"""
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy is required for raster analysis: pip install numpy")
+    if path.endswith(".npy"):
+        return NpyRasterSource(path)
+    if RASTERIO_AVAILABLE:
+        return RasterioRasterSource(path)
+    raise ImportError(f"rasterio is required to read {path}: pip install rasterio")
+
+
+def iter_windows(height: int, width: int, tile_size: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (row, col, rows, cols) windows covering the scene"""
+    for row in range(0, height, tile_size):
+        for col in range(0, width, tile_size):
+            yield row, col, min(tile_size, height - row), min(tile_size, width - col)
+
+
+def compute_vegetation_indices(
+    source,
+    bands: Optional[Dict[str, int]] = None,
+    scale: float = SENTINEL2_SCALE,
+    tile_size: int = 1024,
+    canopy_threshold: float = 0.6,
+    nodata: Optional[float] = 0
+) -> Dict[str, Any]:
+    """
+    Compute scene-wide NDVI/EVI statistics and canopy cover
+    
+    Each window is processed independently in float32 and reduced to running
+    sums, so memory use is bounded by the window size, not the scene size.
+    
+    Args:
+        source: Raster source from open_raster
+        bands: Band indices for "blue", "red" and "nir"
+        scale: Multiplier converting stored values to reflectance
+        tile_size: Window edge length in pixels
+        canopy_threshold: NDVI at or above which a pixel counts as canopy
+        nodata: Stored value marking missing pixels (None to disable)
+    """
+    bands = bands or SENTINEL2_BANDS
+    scale = np.float32(scale)
+    
+    valid_pixels = 0
+    canopy_pixels = 0
+    ndvi_sum = 0.0
+    ndvi_sq_sum = 0.0
+    evi_sum = 0.0
+    evi_pixels = 0
+    
+    for row, col, rows, cols in iter_windows(source.height, source.width, tile_size):
+        blue_raw = source.read(bands["blue"], row, col, rows, cols)
+        red_raw = source.read(bands["red"], row, col, rows, cols)
+        nir_raw = source.read(bands["nir"], row, col, rows, cols)
+        
+        blue = blue_raw.astype(np.float32) * scale
+        red = red_raw.astype(np.float32) * scale
+        nir = nir_raw.astype(np.float32) * scale
+        
+        denominator = nir + red
+        valid = denominator > 0
+        if nodata is not None:
+            valid &= (red_raw != nodata) & (nir_raw != nodata)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndvi = (nir - red) / denominator
+            evi_denominator = nir + EVI_C1 * red - EVI_C2 * blue + EVI_L
+            evi = EVI_G * (nir - red) / evi_denominator
+        
+        ndvi_valid = ndvi[valid]
+        valid_pixels += ndvi_valid.size
+        ndvi_sum += float(ndvi_valid.sum(dtype=np.float64))
+        ndvi_sq_sum += float(np.square(ndvi_valid, dtype=np.float64).sum())
+        canopy_pixels += int(np.count_nonzero(ndvi_valid >= canopy_threshold))
+        
+        # EVI is only meaningful within [-1, 1]; values outside come from
+        # near-zero denominators (water, clouds, shadows)
+        evi_valid = evi[valid & (evi >= -1) & (evi <= 1)]
+        evi_pixels += evi_valid.size
+        evi_sum += float(evi_valid.sum(dtype=np.float64))
+    
+    total_pixels = source.height * source.width
+    mean_ndvi = ndvi_sum / valid_pixels if valid_pixels else 0.0
+    ndvi_variance = max(0.0, ndvi_sq_sum / valid_pixels - mean_ndvi ** 2) if valid_pixels else 0.0
+    
+    return {
+        "ndvi": round(mean_ndvi, 4),
+        "ndvi_std": round(ndvi_variance ** 0.5, 4),
+        "evi": round(evi_sum / evi_pixels, 4) if evi_pixels else 0.0,
+        "canopy_cover": round(canopy_pixels / valid_pixels, 4) if valid_pixels else 0.0,
+        "valid_pixel_fraction": round(valid_pixels / total_pixels, 4) if total_pixels else 0.0,
+        "pixels": total_pixels,
+    }
+
+
+def estimate_biomass(ndvi: float, canopy_cover: float, area: float) -> float:
+    """
+    Rough above-ground biomass (tons) from NDVI and canopy cover
+    
+    Linear approximation spanning 80-150 t/ha between sparse (NDVI 0.2) and
+    dense (NDVI 0.8) canopy; replace with a site-calibrated allometric model.
+    """
+    density = min(1.0, max(0.0, (ndvi - 0.2) / 0.6))
+    biomass_per_ha = 80 + 70 * density * max(canopy_cover, density)
+    return round(area * biomass_per_ha, 2)
+
+
+def analyze_scene(path: str, area: float, tile_size: int = 1024, bands: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Run the band-math pipeline on a scene file (blocking; run in a thread from async code)"""
+    source = open_raster(path)
+    try:
+        indices = compute_vegetation_indices(source, bands=bands, tile_size=tile_size)
+    finally:
+        source.close()
+    indices["biomass_estimate"] = estimate_biomass(indices["ndvi"], indices["canopy_cover"], area)
+    return indices
+
+
+def find_scene(latitude: float, longitude: float, scene_dir: Optional[str] = None, tile_degrees: float = 0.01) -> Optional[str]:
+    """
+    Locate a local scene covering the given coordinates
+    
+    Scenes are looked up in scene_dir by tile, named "<lat>_<lon>.npy" (or
+    ".tif") using the south-west tile corner with as many decimals as
+    tile_degrees has (at least two, e.g. "1.23_-4.56" for 0.01 degree tiles).
+    """
+    scene_dir = scene_dir or os.getenv("SATELLITE_SCENE_DIR")
+    if not scene_dir or latitude is None or longitude is None:
+        return None
+    
+    decimals = max(2, -Decimal(str(tile_degrees)).normalize().as_tuple().exponent)
+    tile_lat = (latitude // tile_degrees) * tile_degrees
+    tile_lon = (longitude // tile_degrees) * tile_degrees
+    name = f"{tile_lat:.{decimals}f}_{tile_lon:.{decimals}f}"
+    for extension in (".npy", ".tif", ".tiff"):
+        path = os.path.join(scene_dir, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
@@ -0,0 +1,234 @@
+"""
+Bulk carbon credit recalculation
+Re-estimates credits for every project in keyset-paginated chunks
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import Project
+from .carbon_calculator import calculate_carbon_credits, calculate_carbon_credits_batch, NUMPY_AVAILABLE
+
+# Vegetation index assumed when a project has no satellite analysis yet
+DEFAULT_VEGETATION_INDEX = 0.78
+# Largest chunk (projects per read and bulk UPDATE) a run accepts
+MAX_CHUNK_SIZE = 50_000
+
+
+def _load_checkpoint(checkpoint_path: Optional[str]) -> Dict[str, Any]:
+    """Read the last committed position, if any"""
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            return json.load(f)
+    return {"last_id": 0, "processed": 0}
+
+
+def _save_checkpoint(checkpoint_path: Optional[str], checkpoint: Dict[str, Any]):
+    """Atomically record the last committed position"""
+    if not checkpoint_path:
+        return
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _calculate_chunk(rows) -> list:
+    """Total carbon tons for a chunk of (id, area, project_type, satellite_result) rows"""
+    areas = [row.area for row in rows]
+    indices = [
+        (row.satellite_analysis_result or {}).get("vegetation_index", DEFAULT_VEGETATION_INDEX)
+        for row in rows
+    ]
+    types = [row.project_type for row in rows]
+    
+    if NUMPY_AVAILABLE:
+        return calculate_carbon_credits_batch(areas, indices, types)["total_carbon_tons"].tolist()
+    
+    return [
+        calculate_carbon_credits(area, index, project_type)["total_carbon_tons"]
+        for area, index, project_type in zip(areas, indices, types)
+    ]
+
+
+def recalculate_all_projects(
+    db: Session,
+    chunk_size: int = 5000,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Recalculate estimated_carbon_credits for all projects
+    
+    Projects are read in primary-key order with keyset pagination, calculated
+    a chunk at a time and written back with one bulk UPDATE per chunk, each
+    chunk in its own transaction. After every commit the last processed id is
+    written to checkpoint_path so an interrupted run can resume from there.
+    """
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    checkpoint = _load_checkpoint(checkpoint_path) if resume else {"last_id": 0, "processed": 0}
+    last_id = checkpoint["last_id"]
+    processed = checkpoint["processed"]
+    
+    total = db.execute(select(Project.id).order_by(Project.id.desc()).limit(1)).scalar() or 0
+    start_time = time.perf_counter()
+    run_processed = 0
+    
+    while True:
+        rows = db.execute(
+            select(
+                Project.id,
+                Project.area,
+                Project.project_type,
+                Project.satellite_analysis_result
+            )
+            .where(Project.id > last_id)
+            .order_by(Project.id)
+            .limit(chunk_size)
+        ).all()
+        
+        if not rows:
+            break
+        
+        credits = _calculate_chunk(rows)
+        
+        try:
+            db.execute(
+                update(Project),
+                [
+                    {"id": row.id, "estimated_carbon_credits": value}
+                    for row, value in zip(rows, credits)
+                ]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        last_id = rows[-1].id
+        processed += len(rows)
+        run_processed += len(rows)
+        checkpoint = {"last_id": last_id, "processed": processed}
+        _save_checkpoint(checkpoint_path, checkpoint)
+        
+        if progress:
+            elapsed = time.perf_counter() - start_time
+            progress({
+                "processed": processed,
+                "last_id": last_id,
+                "max_id": total,
+                "projects_per_second": round(run_processed / elapsed, 1) if elapsed else None,
+            })
+    
+    elapsed = time.perf_counter() - start_time
+    
+    # A finished run starts from scratch next time
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    
+    return {
+        "processed": processed,
+        "elapsed_seconds": round(elapsed, 3),
+        "projects_per_second": round(run_processed / elapsed, 1) if elapsed else None,
+    }
+
+
+class RecalculationJob:
+    """Tracks a single background recalculation run for the API"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status: Dict[str, Any] = {"state": "idle"}
+    
+    def claim(self) -> bool:
+        """Reserve the job for one run (False if a run is already claimed or running)"""
+        if not self.lock.acquire(blocking=False):
+            return False
+        self.status = {"state": "starting"}
+        return True
+    
+    def run(
+        self,
+        session_factory,
+        chunk_size: int = 5000,
+        checkpoint_path: Optional[str] = None,
+        claimed: bool = False
+    ):
+        """Run the recalculation (blocking); only one run at a time (claimed: claim() already succeeded)"""
+        if not claimed and not self.claim():
+            raise RuntimeError("Recalculation already running")
+        
+        db = session_factory()
+        try:
+            self.status = {"state": "running", "processed": 0}
+            
+            def report(update_info: Dict[str, Any]):
+                self.status = {"state": "running", **update_info}
+            
+            result = recalculate_all_projects(
+                db,
+                chunk_size=chunk_size,
+                checkpoint_path=checkpoint_path,
+                progress=report
+            )
+            self.status = {"state": "completed", **result}
+        except Exception as e:
+            self.status = {**self.status, "state": "failed", "error": str(e)}
+            print(f"❌ Recalculation failed: {e}")
+        finally:
+            db.close()
+            self.lock.release()
+    
+    @property
+    def running(self) -> bool:
+        return self.lock.locked()
+
+
+# Global instance
+_recalculation_job = None
+
+def get_recalculation_job() -> RecalculationJob:
+    """Get or create recalculation job instance"""
+    global _recalculation_job
+    if _recalculation_job is None:
+        _recalculation_job = RecalculationJob()
+    return _recalculation_job
+
+
+if __name__ == "__main__":
+    # Command line entry point: python -m services.recalculation_service
+    import argparse
+    from database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Recalculate carbon credits for all projects")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--checkpoint", default="recalculation.checkpoint.json",
+                        help="Checkpoint file used to resume an interrupted run")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+    
+    def print_progress(info: Dict[str, Any]):
+        print(f"   {info['processed']:,} projects (id {info['last_id']}/{info['max_id']}), "
+              f"{info['projects_per_second']} projects/s")
+    
+    print("🔄 Recalculating carbon credits...")
+    session = SessionLocal()
+    try:
+        result = recalculate_all_projects(
+            session,
+            chunk_size=args.chunk_size,
+            checkpoint_path=args.checkpoint,
+            resume=not args.restart,
+            progress=print_progress
+        )
+    finally:
+        session.close()
+    print(f"✅ Recalculated {result['processed']:,} projects in {result['elapsed_seconds']}s "
+          f"({result['projects_per_second']} projects/s)")
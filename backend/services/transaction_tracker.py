@@ -0,0 +1,162 @@
+"""
+Pending transaction tracker
+Blockchain endpoints record transactions as "pending" right after submission;
+this background worker polls every outstanding hash and moves the rows to
+"confirmed" or "failed" once the chain has settled them
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy import select
+
+from models import BlockchainTransaction
+from .blockchain_service import verify_transaction
+
+
+class TransactionTracker:
+    """Batch-polls pending BlockchainTransaction rows until they settle"""
+    
+    def __init__(
+        self,
+        session_factory=None,  # AsyncSession factory
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        expiry: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = interval or float(os.getenv("TX_CONFIRMATION_INTERVAL", "2"))
+        self.batch_size = batch_size or int(os.getenv("TX_CONFIRMATION_BATCH_SIZE", "200"))
+        self.concurrency = concurrency or int(os.getenv("TX_CONFIRMATION_CONCURRENCY", "16"))
+        self.expiry = expiry or float(os.getenv("TX_PENDING_EXPIRY", "600"))
+        
+        self.wakeup = asyncio.Event()
+        self.running = False
+        self.metrics = {
+            "polls": 0,
+            "checked": 0,
+            "confirmed": 0,
+            "failed": 0,
+            "expired": 0,
+        }
+    
+    def notify(self):
+        """Poll right away instead of waiting for the next interval (e.g. after a submission)"""
+        self.wakeup.set()
+    
+    async def _check(self, semaphore: asyncio.Semaphore, transaction_hash: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await verify_transaction(transaction_hash)
+            except Exception as e:
+                return {"transaction_hash": transaction_hash, "status": "pending", "error": str(e)}
+    
+    async def poll_once(self) -> Dict[str, int]:
+        """Check every pending transaction, a batch at a time, and record the outcome"""
+        counts = {"checked": 0, "confirmed": 0, "failed": 0, "expired": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_id = 0
+        
+        while True:
+            # Keyset pagination, so transactions that stay pending do not starve later ones
+            async with self.session_factory() as db:
+                pending = (await db.execute(
+                    select(BlockchainTransaction.id, BlockchainTransaction.transaction_hash, BlockchainTransaction.created_at)
+                    .where(BlockchainTransaction.status == "pending", BlockchainTransaction.id > last_id)
+                    .order_by(BlockchainTransaction.id)
+                    .limit(self.batch_size)
+                )).all()
+            if not pending:
+                break
+            last_id = pending[-1].id
+            await self._settle_batch(semaphore, pending, counts)
+            
+            if len(pending) < self.batch_size:
+                break
+        
+        self.metrics["polls"] += 1
+        for key, value in counts.items():
+            self.metrics[key] += value
+        return counts
+    
+    async def _settle_batch(self, semaphore: asyncio.Semaphore, pending: list, counts: Dict[str, int]):
+        """Look up one batch of hashes concurrently, then commit the settled rows"""
+        # No session is held while the node is queried
+        results = await asyncio.gather(*(
+            self._check(semaphore, transaction.transaction_hash) for transaction in pending
+        ))
+        
+        expired_before = datetime.utcnow() - timedelta(seconds=self.expiry)
+        settled = {}
+        for transaction, result in zip(pending, results):
+            counts["checked"] += 1
+            status = result.get("status")
+            if status in ("confirmed", "failed"):
+                settled[transaction.id] = result
+            elif transaction.created_at and transaction.created_at < expired_before:
+                settled[transaction.id] = {"status": "failed", "expired": True}
+        if not settled:
+            return
+        
+        async with self.session_factory() as db:
+            try:
+                # Rows settled meanwhile (e.g. by the event listener) are left alone
+                rows = (await db.scalars(select(BlockchainTransaction).where(
+                    BlockchainTransaction.id.in_(settled), BlockchainTransaction.status == "pending"
+                ))).all()
+                for transaction in rows:
+                    result = settled[transaction.id]
+                    transaction.status = result["status"]
+                    if result.get("expired"):
+                        counts["expired"] += 1
+                        print(f"⚠️  Transaction {transaction.transaction_hash} still pending after {self.expiry:.0f}s, marking failed")
+                        continue
+                    # Mock results carry no receipt; keep what was recorded at submission
+                    for field in ("block_number", "gas_used", "network_fee"):
+                        if result.get(field) is not None:
+                            setattr(transaction, field, result[field])
+                    counts[result["status"]] += 1
+                    if result["status"] == "failed":
+                        print(f"❌ Transaction {transaction.transaction_hash} failed: {result.get('vm_status')}")
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+    
+    async def run(self):
+        """Poll pending transactions until stopped"""
+        self.running = True
+        while self.running:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"❌ Transaction confirmation poll failed: {e}")
+            
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+    
+    def stop(self):
+        """Stop the background worker"""
+        self.running = False
+        self.wakeup.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Confirmation counters"""
+        return {**self.metrics, "running": self.running}
+
+
+# Global instance
+_transaction_tracker = None
+
+def get_transaction_tracker() -> TransactionTracker:
+    """Get or create transaction tracker instance"""
+    global _transaction_tracker
+    if _transaction_tracker is None:
+        from database import AsyncSessionLocal
+        _transaction_tracker = TransactionTracker(AsyncSessionLocal)
+    return _transaction_tracker
@@ -1,14 +1,15 @@
 """
 Verification service for multi-stage verification process
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from models import Verification
 from typing import Optional
 
 
-def create_verification_record(
-    db: Session,
+async def create_verification_record(
+    db: AsyncSession,
     project_id: int,
     verification_type: str,
     verifier_name: str,
@@ -30,13 +31,13 @@ def create_verification_record(
         notes=notes
     )
     db.add(verification)
-    db.commit()
-    db.refresh(verification)
+    await db.commit()
+    await db.refresh(verification)
     return verification
 
 
-def update_verification_status(
-    db: Session,
+async def update_verification_status(
+    db: AsyncSession,
     verification_id: int,
     status: str,
     notes: Optional[str] = None
@@ -49,9 +50,7 @@ def update_verification_status(
     - approved
     - rejected
     """
-    verification = db.query(Verification).filter(
-        Verification.id == verification_id
-    ).first()
+    verification = await db.get(Verification, verification_id)
     
     if not verification:
         raise ValueError("Verification not found")
@@ -63,8 +62,8 @@ def update_verification_status(
     if status == "approved":
         verification.verified_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(verification)
+    await db.commit()
+    await db.refresh(verification)
     return verification
 
 
@@ -110,18 +109,18 @@ def get_verification_checklist(verification_type: str) -> dict:
     return checklists.get(verification_type, {})
 
 
-def validate_verification_requirements(
-    db: Session,
+async def validate_verification_requirements(
+    db: AsyncSession,
     project_id: int,
     verification_type: str
 ) -> dict:
     """
     Validate if project meets requirements for verification type
     """
-    verifications = db.query(Verification).filter(
+    verifications = (await db.scalars(select(Verification).where(
         Verification.project_id == project_id,
         Verification.status == "approved"
-    ).all()
+    ))).all()
     
     approved_types = [v.verification_type for v in verifications]
     
@@ -0,0 +1,29 @@
+"""
+Shared test fixtures
+Run from backend/: python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Modules are imported the way main.py imports them (models, services.x)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py builds its engines at import: keep them off the working database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+from database import Base  # noqa: E402
+import models  # noqa: E402,F401  (registers the tables)
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory database"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
@@ -0,0 +1,115 @@
+import pytest
+
+from models import Project, ProcessedEvent, DeadLetterEvent
+from services.aptos_event_listener import (
+    AptosEventListener, handle_project_created, handle_project_deleted
+)
+
+
+class StaticEventSource:
+    """Events held in memory per event type"""
+    
+    def __init__(self, events=None):
+        self.events_by_type = events or {}
+    
+    def describe(self) -> str:
+        return "static"
+    
+    async def head(self, event_type: str) -> int:
+        return len(self.events_by_type.get(event_type, []))
+    
+    async def events(self, event_type: str, start: int, limit: int):
+        return self.events_by_type.get(event_type, [])[start:start + limit]
+
+
+def make_event(sequence_number: int, version: int, **data):
+    return {'sequence_number': str(sequence_number), 'version': str(version), 'data': data}
+
+
+def make_listener(session_factory, retry_window: float = 600, source=None) -> AptosEventListener:
+    listener = AptosEventListener(source or StaticEventSource(), session_factory, page_size=50, rpc_rate=0)
+    listener.retry_window = retry_window
+    listener.register_projector('project_created', handle_project_created)
+    listener.register_projector('project_deleted', handle_project_deleted)
+    listener.load_cursors()
+    return listener
+
+
+@pytest.mark.asyncio
+async def test_delete_before_create_waits_for_the_project(session_factory):
+    listener = make_listener(session_factory)
+    deleted = make_event(0, 20, project_id="REG-1")
+    created = make_event(0, 10, project_id="REG-1", name="Mangrove Bay", carbon_credits=1000)
+    
+    # The delete poller runs ahead of the create poller
+    assert await listener.process_page('project_deleted', [deleted]) == 0
+    assert listener.next_sequence['project_deleted'] == 0
+    assert listener.metrics['project_deleted']['waiting'] == 1
+    
+    assert await listener.process_page('project_created', [created]) == 1
+    assert await listener.process_page('project_deleted', [deleted]) == 1
+    assert listener.metrics['project_deleted']['waiting'] == 0
+    
+    db = session_factory()
+    try:
+        project = db.query(Project).filter(Project.chain_project_id == "REG-1").one()
+        assert project.status == "deleted"
+        assert db.query(DeadLetterEvent).count() == 0
+        assert db.query(ProcessedEvent).count() == 2
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_delete_of_unknown_project_is_dead_lettered_after_the_retry_window(session_factory):
+    listener = make_listener(session_factory, retry_window=0)
+    
+    assert await listener.process_page('project_deleted', [make_event(0, 20, project_id="REG-404")]) == 1
+    
+    db = session_factory()
+    try:
+        assert db.query(DeadLetterEvent).one().event_type == "project_deleted"
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_version_above_32_bits_is_recorded(session_factory):
+    listener = make_listener(session_factory)
+    version = 3_000_000_000
+    
+    await listener.process_page('project_created', [make_event(0, version, project_id="REG-2")])
+    
+    db = session_factory()
+    try:
+        assert db.query(ProcessedEvent).one().version == version
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_restart_resumes_from_the_persisted_cursor(session_factory):
+    created = [
+        make_event(n, 100 + n, project_id=f"REG-{n}", name=f"Project {n}", carbon_credits=10)
+        for n in range(180)
+    ]
+    source = StaticEventSource({'project_created': created[:120]})
+    
+    listener = make_listener(session_factory, source=source)
+    assert await listener.catch_up('project_created') == 120
+    assert listener.metrics['project_created']['catchup_events_per_second'] > 0
+    
+    # More events arrive while the process is down
+    source.events_by_type['project_created'] = created
+    restarted = make_listener(session_factory, source=source)
+    assert restarted.next_sequence['project_created'] == 120
+    assert await restarted.catch_up('project_created') == 60
+    assert restarted.next_sequence['project_created'] == 180
+    assert restarted.metrics['project_created']['processed'] == 60
+    
+    db = session_factory()
+    try:
+        assert db.query(ProcessedEvent).count() == 180
+        assert db.query(Project).count() == 180
+    finally:
+        db.close()
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.aptos_rpc import AptosRpcClient, AptosRpcError
+
+
+def client_for(handler, urls, **kwargs) -> AptosRpcClient:
+    return AptosRpcClient(urls, timeout=5, transport=httpx.MockTransport(handler), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_no_nodes_configured():
+    client = client_for(lambda request: httpx.Response(200, json={}), [])
+    with pytest.raises(AptosRpcError, match="no nodes configured") as error:
+        await client.account_sequence_number("0x1")
+    assert not error.value.retryable
+    await client.close()
+
+
+def node_of(request: httpx.Request) -> str:
+    return request.url.host
+
+
+@pytest.mark.asyncio
+async def test_failover_on_server_error():
+    def handler(request):
+        if node_of(request) == "a":
+            return httpx.Response(503, json={"message": "overloaded"})
+        return httpx.Response(200, json={"sequence_number": "7"})
+    
+    client = client_for(handler, ["http://a", "http://b"], hedge_delay=0)
+    assert await client.account_sequence_number("0x1") == 7
+    assert client.metrics["failovers"] == 1
+    assert not client.nodes[0].healthy
+    # The failed node is now ranked last
+    assert [node.url for node in client._ranked_nodes()] == ["http://b", "http://a"]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_failover_on_connection_error():
+    def handler(request):
+        if node_of(request) == "a":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"sequence_number": "3"})
+    
+    client = client_for(handler, ["http://a", "http://b"], hedge_delay=0)
+    assert await client.account_sequence_number("0x1") == 3
+    assert client.metrics["failovers"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried():
+    seen = []
+    
+    def handler(request):
+        seen.append(node_of(request))
+        return httpx.Response(404, json={"message": "account not found"})
+    
+    client = client_for(handler, ["http://a", "http://b"], hedge_delay=0)
+    with pytest.raises(AptosRpcError) as error:
+        await client.account_sequence_number("0x1")
+    assert error.value.status_code == 404
+    assert seen == ["a"]
+    assert client.nodes[0].healthy
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_read_uses_faster_node():
+    async def handler(request):
+        if node_of(request) == "a":
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"data": {"coin": {"value": "42"}}})
+    
+    client = client_for(handler, ["http://a", "http://b"], hedge_delay=0.02)
+    start = time.perf_counter()
+    assert await client.account_balance("0x1") == 42
+    assert time.perf_counter() - start < 0.5
+    assert client.metrics["hedged"] == 1
+    assert client.metrics["hedge_wins"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    seen = []
+    
+    def handler(request):
+        seen.append(node_of(request))
+        return httpx.Response(200, json={"data": {"coin": {"value": "5"}}})
+    
+    client = client_for(handler, ["http://a", "http://b"], hedge_delay=0.5)
+    assert await client.account_balance("0x1") == 5
+    assert seen == ["a"]
+    assert client.metrics["hedged"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_committed_transactions_are_cached():
+    calls = []
+    
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(200, json={"type": "pending_transaction", "hash": "0xabc"})
+        return httpx.Response(200, json={"type": "user_transaction", "hash": "0xabc", "success": True})
+    
+    client = client_for(handler, ["http://a"])
+    assert (await client.transaction_by_hash("0xabc"))["type"] == "pending_transaction"
+    assert (await client.transaction_by_hash("0xabc"))["type"] == "user_transaction"
+    assert (await client.transaction_by_hash("0xabc"))["success"]
+    assert len(calls) == 2
+    assert client.metrics["tx_cache_hits"] == 1
+    await client.close()
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.aptos_rpc import AptosRpcError
+from services.aptos_sequence import SequenceNumberManager, outcome_unknown
+
+
+class Chain:
+    """Account sequence number as the node reports it"""
+    
+    def __init__(self, number: int = 0):
+        self.number = number
+    
+    async def fetch(self) -> int:
+        return self.number
+
+
+@pytest.mark.asyncio
+async def test_too_new_number_is_reused_under_steady_load():
+    chain = Chain(10)
+    manager = SequenceNumberManager(chain.fetch, expiration_ttl=600)
+    first, second, third = await manager.reserve_many(3)
+    
+    await manager.failed(first, Exception("SEQUENCE_NUMBER_TOO_NEW"))
+    await manager.submitted(second)  # accepted, parked behind the gap
+    await manager.submitted(third)
+    
+    # Submissions are recent, so the counter is not reset: the gap is filled
+    assert await manager.reserve() == first
+    assert await manager.reserve() == 13
+
+
+@pytest.mark.asyncio
+async def test_accepted_numbers_that_expired_are_reused():
+    chain = Chain(0)
+    manager = SequenceNumberManager(chain.fetch, expiration_ttl=0.05)
+    numbers = await manager.reserve_many(3)
+    for number in numbers:
+        await manager.submitted(number)
+    chain.number = 1  # only the first one committed
+    
+    await asyncio.sleep(0.1)
+    await manager.resync()
+    assert await manager.reserve_many(2) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_unknown_outcome_is_not_reused_before_it_expires():
+    chain = Chain(0)
+    manager = SequenceNumberManager(chain.fetch, expiration_ttl=600)
+    first, second = await manager.reserve_many(2)
+    await manager.failed(first, httpx.ReadTimeout("timed out"))
+    await manager.submitted(second)
+    
+    assert await manager.reserve() == 2
+    assert manager.get_stats()["unknown_outcome"] == 1
+
+
+def test_outcome_classification():
+    assert outcome_unknown(asyncio.TimeoutError())
+    assert outcome_unknown(httpx.ConnectError("refused"))
+    assert outcome_unknown(AptosRpcError(503, "busy"))
+    assert not outcome_unknown(AptosRpcError(400, "bad request"))
+    assert not outcome_unknown(ValueError("SEQUENCE_NUMBER_TOO_NEW"))
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from services.binance_price_service import BinancePriceService, DEFAULT_SYMBOLS
+
+STUB_LATENCY = 0.3
+
+
+class StubBinanceHandler(BaseHTTPRequestHandler):
+    """Slow local stand-in for the Binance REST API"""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        time.sleep(STUB_LATENCY)
+        url = urlparse(self.path)
+        symbols = json.loads(parse_qs(url.query).get("symbols", ["[]"])[0])
+        if url.path.endswith("/ticker/price"):
+            body = [{"symbol": symbol, "price": "100.0"} for symbol in symbols]
+        else:
+            body = [{"symbol": symbol, "lastPrice": "100.0", "priceChangePercent": "1.5"} for symbol in symbols]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBinanceHandler)
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def service_for(server) -> BinancePriceService:
+    host, port = server.server_address
+    return BinancePriceService(base_url=f"http://{host}:{port}/api/v3", timeout=5)
+
+
+async def max_loop_stall(work) -> float:
+    """Run work while a heartbeat ticks every 10 ms; the longest gap between ticks"""
+    gaps = []
+    done = asyncio.Event()
+    
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+    
+    ticker = asyncio.create_task(heartbeat())
+    try:
+        await work
+    finally:
+        done.set()
+        await ticker
+    return max(gaps)
+
+
+@pytest.mark.asyncio
+async def test_requests_do_not_block_the_event_loop(stub_server):
+    service = service_for(stub_server)
+    try:
+        requests = asyncio.gather(*(service.get_multiple_prices() for _ in range(4)), service.get_ticker_stats())
+        stall = await max_loop_stall(requests)
+        assert stall < STUB_LATENCY / 2
+        assert service.price_cache == {symbol: 100.0 for symbol in DEFAULT_SYMBOLS}
+    finally:
+        await service.close()
+
+
+@pytest.mark.asyncio
+async def test_sequential_requests_reuse_one_connection(stub_server):
+    service = service_for(stub_server)
+    try:
+        for _ in range(3):
+            await service.get_multiple_prices()
+        assert len(stub_server.connections) == 1
+    finally:
+        await service.close()
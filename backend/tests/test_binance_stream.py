@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from services.binance_price_service import BinancePriceService, DEFAULT_SYMBOLS
+from services.binance_stream import BinanceTickerStream
+
+
+def ticker(symbol: str, price: float) -> str:
+    return json.dumps({"stream": f"{symbol.lower()}@ticker", "data": {
+        "e": "24hrTicker", "s": symbol, "c": str(price), "p": "1", "P": "1.5", "h": "1", "l": "1", "v": "1"
+    }})
+
+
+class ScriptedTransport:
+    """Fake stream server: each connection plays the next script (an exception or a list of messages)"""
+    
+    def __init__(self, stream, scripts):
+        self.stream = stream
+        self.scripts = list(scripts)
+        self.connections = 0
+    
+    async def messages(self, url: str):
+        self.connections += 1
+        if not self.scripts:
+            self.stream.stop()
+            return
+        script = self.scripts.pop(0)
+        if isinstance(script, Exception):
+            raise script
+        for message in script:
+            yield message
+
+
+def make_stream(scripts, **kwargs):
+    service = BinancePriceService()
+    polls = []
+    
+    async def rest_down():
+        raise ConnectionError("REST unavailable")
+    
+    async def record_poll(interval, duration=None):
+        polls.append((stream.failures, duration))
+    
+    service.refresh_snapshot = rest_down
+    service.poll_snapshots = record_poll
+    stream = BinanceTickerStream(service, DEFAULT_SYMBOLS, url="ws://fake", poll_interval=1, **kwargs)
+    stream.transport = ScriptedTransport(stream, scripts)
+    return service, stream, polls
+
+
+@pytest.mark.asyncio
+async def test_reconnects_with_backoff_and_polls_meanwhile():
+    refused = ConnectionError("refused")
+    prices = [ticker(symbol, 100 + i) for i, symbol in enumerate(DEFAULT_SYMBOLS)]
+    service, stream, polls = make_stream(
+        [refused, refused, prices, refused], max_failures=5, base_backoff=1, max_backoff=60
+    )
+    
+    await stream.run()
+    
+    assert stream.transport.connections == 5
+    # Backoff doubles per consecutive failure, with equal jitter, and a
+    # connection that delivered messages resets it
+    failures = [failure for failure, _ in polls]
+    assert failures == [1, 2, 1, 2]
+    for failure, delay in polls:
+        ceiling = 2 ** (failure - 1)
+        assert ceiling / 2 <= delay <= ceiling
+    
+    assert service.snapshot is not None
+    assert service.snapshot.data["crypto_influence"]["apt_price"] == 103
+
+
+@pytest.mark.asyncio
+async def test_unavailable_stream_polls_for_the_full_ceiling():
+    refused = ConnectionError("refused")
+    _, stream, polls = make_stream([refused] * 3, max_failures=2, base_backoff=1, max_backoff=30)
+    
+    await stream.run()
+    
+    assert [delay for _, delay in polls][1:] == [30, 30]
+
+
+@pytest.mark.asyncio
+async def test_partial_stream_does_not_publish():
+    service, stream, _ = make_stream([[ticker("BTCUSDT", 50000)]])
+    
+    await stream.run()
+    
+    assert service.snapshot is None
+    assert service.ticker_cache["BTCUSDT"]["price"] == 50000
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from services.price_history_store import PriceHistoryStore
+
+
+def fill(store: PriceHistoryStore, count: int, start: float, step: float = 600):
+    for i in range(count):
+        store.append(start + i * step, {"carbon_price": 40 + i % 7, "btc_price": 45000.0})
+
+
+@pytest.mark.asyncio
+async def test_rollups_outlive_pruned_chunks(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    fill(store, 500, time.time() - 400_000)
+    await store.stop()
+    hourly = store.get_candles("1h", limit=1000)
+    
+    store.retention_days = 0
+    assert store.prune() > 0
+    
+    restored = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    assert await restored.restore() == 0  # no raw samples left
+    assert restored.get_candles("1h", limit=1000) == hourly
+
+
+@pytest.mark.asyncio
+async def test_reload_does_not_fold_samples_twice(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    fill(store, 500, time.time() - 400_000)
+    await store.stop()
+    
+    restored = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    restored.append(time.time(), {"carbon_price": 99.0})  # arrives while loading
+    assert await restored.restore() == 500
+    assert restored.count == 501
+    for resolution in ("1m", "1h", "1d"):
+        assert restored.get_candles(resolution, limit=5000) == store.get_candles(resolution, limit=5000)
+
+
+def test_rollup_snapshot_does_not_share_candles(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), capacity=100, chunk_size=10)
+    store.append(3600.0, {"carbon_price": 40.0})
+    store.roll_up()
+    snapshot = store.rollup_snapshot()
+    
+    store.append(3601.0, {"carbon_price": 50.0})
+    store.roll_up()
+    _, candles = snapshot["1h"]
+    assert candles[0][1][1] == 40.0  # high as of the snapshot
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_a_background_write(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    fill(store, 250, time.time() - 200_000)
+    store.roll_up()
+    
+    store.persist_lock.acquire()  # a background write in progress
+    stopping = asyncio.create_task(store.stop())
+    await asyncio.sleep(0.05)
+    assert not stopping.done()
+    store.persist_lock.release()
+    await stopping
+    
+    restored = PriceHistoryStore(str(tmp_path), capacity=1000, chunk_size=100)
+    assert await restored.restore() == 250
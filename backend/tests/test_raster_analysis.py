@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from services.raster_analysis import (
+    SENTINEL2_SCALE, EVI_G, EVI_C1, EVI_C2, EVI_L, compute_vegetation_indices, find_scene, open_raster
+)
+
+
+def test_find_scene_names_tiles_with_two_decimals(tmp_path):
+    (tmp_path / "1.23_-4.57.npy").touch()
+    assert find_scene(1.234, -4.561, str(tmp_path)) == str(tmp_path / "1.23_-4.57.npy")
+
+
+@pytest.mark.parametrize("tile_degrees,latitude,name", [
+    (0.005, 1.2371, "1.235_4.560"),
+    (0.001, 1.2371, "1.237_4.560"),
+    (0.0025, 1.2371, "1.2350_4.5600"),
+])
+def test_find_scene_keeps_small_tiles_apart(tmp_path, tile_degrees, latitude, name):
+    for other in ("1.23_4.56", "1.235_4.560", "1.237_4.560", "1.2350_4.5600"):
+        (tmp_path / f"{other}.npy").touch()
+    assert find_scene(latitude, 4.5601, str(tmp_path), tile_degrees=tile_degrees) == str(tmp_path / f"{name}.npy")
+
+
+def direct_indices(scene: np.ndarray, canopy_threshold: float = 0.6):
+    """Whole-scene NumPy reference for compute_vegetation_indices"""
+    blue, red, nir = (scene[band].astype(np.float64) * SENTINEL2_SCALE for band in range(3))
+    valid = ((nir + red) > 0) & (scene[1] != 0) & (scene[2] != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndvi = (nir - red) / (nir + red)
+        evi = EVI_G * (nir - red) / (nir + EVI_C1 * red - EVI_C2 * blue + EVI_L)
+    ndvi = ndvi[valid]
+    evi = evi[valid & (evi >= -1) & (evi <= 1)]
+    return {
+        "ndvi": ndvi.mean(),
+        "ndvi_std": ndvi.std(),
+        "evi": evi.mean(),
+        "canopy_cover": np.count_nonzero(ndvi >= canopy_threshold) / ndvi.size,
+        "valid_pixel_fraction": ndvi.size / (scene.shape[1] * scene.shape[2]),
+    }
+
+
+@pytest.fixture
+def scene_path(tmp_path):
+    rng = np.random.default_rng(7)
+    height, width = 300, 457  # windows do not divide the scene evenly
+    scene = np.empty((3, height, width), dtype=np.uint16)
+    scene[0] = rng.integers(100, 1500, (height, width))   # blue
+    scene[1] = rng.integers(100, 3000, (height, width))   # red
+    scene[2] = rng.integers(500, 6000, (height, width))   # nir
+    scene[1:, :10, :10] = 0  # nodata corner
+    path = tmp_path / "scene.npy"
+    np.save(path, scene)
+    return path, scene
+
+
+@pytest.mark.parametrize("tile_size", [64, 100, 1024])
+def test_tiled_indices_match_a_direct_computation(scene_path, tile_size):
+    path, scene = scene_path
+    expected = direct_indices(scene)
+    
+    source = open_raster(str(path))
+    try:
+        result = compute_vegetation_indices(source, tile_size=tile_size)
+    finally:
+        source.close()
+    
+    assert result["pixels"] == scene.shape[1] * scene.shape[2]
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value, abs=1e-4), key
+
+
+def test_window_reads_match_the_scene(scene_path):
+    path, scene = scene_path
+    source = open_raster(str(path))
+    assert (source.read(2, 37, 101, 50, 60) == scene[2, 37:87, 101:161]).all()
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from services.recalculation_service import RecalculationJob, recalculate_all_projects, MAX_CHUNK_SIZE
+
+
+def test_job_is_claimed_once(session_factory):
+    job = RecalculationJob()
+    assert job.claim()
+    assert not job.claim()
+    assert job.status["state"] == "starting"
+    
+    job.run(session_factory, chunk_size=100, claimed=True)
+    assert job.status["state"] == "completed"
+    assert not job.running
+    assert job.claim()
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1, MAX_CHUNK_SIZE + 1])
+def test_invalid_chunk_size_is_rejected(session_factory, chunk_size):
+    db = session_factory()
+    try:
+        with pytest.raises(ValueError):
+            recalculate_all_projects(db, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1, MAX_CHUNK_SIZE + 1])
+def test_endpoint_validates_chunk_size(chunk_size):
+    import main
+    
+    response = TestClient(main.app).post(f"/api/analysis/recalculate?chunk_size={chunk_size}")
+    assert response.status_code == 422
+    assert not main.get_recalculation_job().running